@@ -0,0 +1,100 @@
+"""Per-frame memory allocation report for the gesture loop
+
+Replays a recording through MouseAndKeyboard (sync mode, no window) with
+tracemalloc running, and reports how much memory each frame allocates at its
+peak on top of what was already live, after a warm-up period. In steady state
+this should be near zero: frame, RGB and display buffers are all reused.
+
+    python -m benchmarks.allocation_report recording.mp4
+"""
+import argparse
+import tracemalloc
+
+from frame_sources import open_source
+from main import MouseAndKeyboard
+from output_sinks import RecordingOutputSink
+
+
+class TracedSource:
+    """Wraps a frame source and marks the start of every frame for tracemalloc"""
+
+    def __init__(self, source):
+        self.source = source
+        self.finite = source.finite
+        self.frame_start = 0
+
+    def read(self, image=None):
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self.frame_start = tracemalloc.get_traced_memory()[0]
+        return self.source.read(image)
+
+    def frame_timestamp(self):
+        return self.source.frame_timestamp()
+
+    def frame_results(self):
+        return self.source.frame_results()
+
+    def release(self):
+        self.source.release()
+
+
+class TracedMouseAndKeyboard(MouseAndKeyboard):
+    """Records the peak allocation of every frame once rendering is done"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.frame_peaks = []
+        self.frame_blocks = []
+
+    def render_frame(self, packet):
+        combined_img = super().render_frame(packet)
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            self.frame_peaks.append(peak - self.source.frame_start)
+        return combined_img
+
+
+def run_report(recording, warmup=30, frames=300):
+    app = TracedMouseAndKeyboard(output=RecordingOutputSink())
+    app.source = TracedSource(open_source(recording, app.window_width, app.window_height))
+
+    try:
+        app.run_sync(app.source, display=False, max_frames=warmup)
+        tracemalloc.start()
+        measured = app.run_sync(app.source, display=False, max_frames=frames)
+        tracemalloc.stop()
+    finally:
+        app.source.release()
+
+    peaks = sorted(app.frame_peaks)
+    if not peaks:
+        return {"frames": 0}
+    return {
+        "frames": measured,
+        "mean_bytes": sum(peaks) / len(peaks),
+        "p50_bytes": peaks[len(peaks) // 2],
+        "max_bytes": peaks[-1],
+        "frame_bytes": app.combined_img.nbytes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame allocation report")
+    parser.add_argument("recording", help="Recorded video file or landmark stream")
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    report = run_report(args.recording, args.warmup, args.frames)
+    if not report["frames"]:
+        print("Recording too short to measure")
+        return
+    print(f"Frames measured: {report['frames']}")
+    print(f"Peak allocation per frame: mean {report['mean_bytes'] / 1024:.1f} KiB, "
+          f"p50 {report['p50_bytes'] / 1024:.1f} KiB, max {report['max_bytes'] / 1024:.1f} KiB")
+    print(f"(one combined display frame is {report['frame_bytes'] / 1024:.1f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
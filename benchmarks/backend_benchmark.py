@@ -0,0 +1,168 @@
+"""Compare hand landmark backends on accuracy and CPU latency
+
+Every backend runs on the same mirrored frames of a recorded video. The
+landmarks are compared with a reference: a landmark recording or .jsonl
+stream made from the same video (`main.py --source video.mp4 --record ref`),
+or else the output of --reference-backend. Hands are matched by handedness.
+
+    python -m benchmarks.backend_benchmark recording.mp4 --reference recording.landmarks
+    python -m benchmarks.backend_benchmark recording.mp4 --backends mediapipe_lite tasks --task-model hand_landmarker.task
+
+Reports per backend: frames where the number of hands agrees with the
+reference, mean and p95 landmark error in pixels, and p50/p95 wall time plus
+average CPU time (all threads) per frame.
+"""
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from landmark_array import hand_points
+from landmark_backends import BACKENDS, create_backend
+from landmark_recording import LandmarkRecording, is_landmark_recording
+from landmark_stream import read_landmark_stream
+
+
+def load_frames(path, max_frames=None):
+    """Mirrored RGB frames of a video, as the inference stage sees them"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video file: {path}")
+    frames = []
+    while max_frames is None or len(frames) < max_frames:
+        success, image = cap.read()
+        if not success:
+            break
+        frames.append(cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB))
+    cap.release()
+    return frames
+
+
+def load_reference(path):
+    """Per-frame results of a landmark recording or .jsonl stream"""
+    if is_landmark_recording(path):
+        return [results for _, results in LandmarkRecording(path)]
+    return [results for _, results in read_landmark_stream(path)]
+
+
+def hands_by_label(results):
+    """{handedness label: (21, 3) landmarks} of one frame"""
+    if not results.multi_hand_landmarks:
+        return {}
+    return {handedness.classification[0].label: hand_points(hand)
+            for hand, handedness in zip(results.multi_hand_landmarks, results.multi_handedness)}
+
+
+def run_backend(backend, frames, warmup=5):
+    """Run a backend on every frame, returns (results, wall seconds, cpu seconds) of the timed frames"""
+    outputs = []
+    wall = []
+    cpu_start = None
+    for index, frame in enumerate(frames):
+        if index == warmup:
+            cpu_start = time.process_time()
+        start = time.perf_counter()
+        outputs.append(backend.process(frame))
+        if index >= warmup:
+            wall.append(time.perf_counter() - start)
+    cpu = time.process_time() - cpu_start if cpu_start is not None else 0.0
+    return outputs, np.array(wall), cpu
+
+
+def compare(outputs, reference, frame_size):
+    """Hand count agreement and landmark errors (pixels) against the reference"""
+    scale = np.array(frame_size, dtype=np.float32)
+    frames = min(len(outputs), len(reference))
+    agree = 0
+    errors = []
+    for found, expected in zip(outputs[:frames], reference[:frames]):
+        found, expected = hands_by_label(found), hands_by_label(expected)
+        agree += len(found) == len(expected)
+        for label in found.keys() & expected.keys():
+            offsets = (found[label][:, :2] - expected[label][:, :2]) * scale
+            errors.append(np.hypot(offsets[:, 0], offsets[:, 1]))
+    errors = np.concatenate(errors) if errors else np.zeros(0)
+    return {
+        "agreement": agree / frames if frames else 0.0,
+        "error_px": float(errors.mean()) if len(errors) else None,
+        "error_px_p95": float(np.percentile(errors, 95)) if len(errors) else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hand landmark backend accuracy and latency")
+    parser.add_argument("video", help="Recorded (unmirrored) camera video")
+    parser.add_argument("--reference", default=None,
+                        help="Landmark recording or .jsonl stream of the same video (default: --reference-backend output)")
+    parser.add_argument("--reference-backend", choices=sorted(BACKENDS), default="mediapipe_full")
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=sorted(BACKENDS))
+    parser.add_argument("--task-model", default="hand_landmarker.task", help="Model bundle of the 'tasks' backend")
+    parser.add_argument("--max-frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=5, help="Frames left out of the latency figures")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    def settings(name):
+        return {"model_path": args.task_model} if name == "tasks" else {}
+
+    frames = load_frames(args.video, args.max_frames)
+    frame_size = (frames[0].shape[1], frames[0].shape[0]) if frames else (1, 1)
+    reference = load_reference(args.reference) if args.reference else None
+
+    reports = []
+    for name in args.backends:
+        try:
+            backend = create_backend(name, **settings(name))
+        except (FileNotFoundError, RuntimeError) as e:
+            reports.append({"backend": name, "error": str(e)})
+            continue
+        try:
+            outputs, wall, cpu = run_backend(backend, frames, args.warmup)
+        finally:
+            backend.close()
+        if reference is None and name == args.reference_backend:
+            reference = outputs
+        timed = max(len(wall), 1)
+        reports.append({
+            "backend": name,
+            "frames": len(outputs),
+            "detected": sum(1 for results in outputs if results.multi_hand_landmarks) / max(len(outputs), 1),
+            "wall_ms_p50": float(np.percentile(wall, 50)) * 1000 if len(wall) else None,
+            "wall_ms_p95": float(np.percentile(wall, 95)) * 1000 if len(wall) else None,
+            "cpu_ms": cpu / timed * 1000,
+            "outputs": outputs,
+        })
+
+    if reference is None:
+        # The reference backend was not among --backends
+        backend = create_backend(args.reference_backend, **settings(args.reference_backend))
+        try:
+            reference, _, _ = run_backend(backend, frames, args.warmup)
+        finally:
+            backend.close()
+
+    for report in reports:
+        if "outputs" in report:
+            report.update(compare(report.pop("outputs"), reference, frame_size))
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    source = args.reference or f"{args.reference_backend} output"
+    print(f"{len(frames)} frames of {os.path.basename(args.video)}, reference: {source}")
+    for report in reports:
+        if "error" in report:
+            print(f"{report['backend']:>15}: unavailable ({report['error']})")
+            continue
+        error = (f"error {report['error_px']:.1f} px (p95 {report['error_px_p95']:.1f})"
+                 if report["error_px"] is not None else "error n/a")
+        print(f"{report['backend']:>15}: {report['wall_ms_p50']:6.1f} ms p50, {report['wall_ms_p95']:6.1f} ms p95, "
+              f"{report['cpu_ms']:6.1f} ms CPU/frame, hands in {100 * report['detected']:.0f}% of frames, "
+              f"count agrees {100 * report['agreement']:.0f}%, {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Summarize capture to OS event latency per gesture type
+
+Takes CSV files written by `main.py --event-trace PATH` during live runs, or
+recordings to replay headlessly (video files, .jsonl landmark streams or
+binary landmark recordings).
+
+    python -m benchmarks.event_latency live_session.csv
+    python -m benchmarks.event_latency recording.mp4 --mode threaded --realtime
+"""
+import argparse
+import json
+
+import numpy as np
+
+from benchmarks.replay_benchmark import run_benchmark
+from event_latency import EventLatencyTracer, format_summary, load_latencies, summarize
+from main import MouseAndKeyboard
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency distribution per gesture type")
+    parser.add_argument("inputs", nargs="+", help="Event trace CSV files or recordings to replay")
+    parser.add_argument("--mode", choices=MouseAndKeyboard.MODES, default=MouseAndKeyboard.MODE_SYNC,
+                        help="Pipeline mode for replayed recordings (default: sync)")
+    parser.add_argument("--realtime", action="store_true",
+                        help="Pace replayed video files at their frame rate")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    # Pool the records of every input
+    latencies = {}
+    for path in args.inputs:
+        if path.endswith(".csv"):
+            found = load_latencies(path)
+        else:
+            tracer = EventLatencyTracer(capacity=None)
+            run_benchmark(path, args.mode, realtime=args.realtime, event_tracer=tracer)
+            found = tracer.latencies()
+        for gesture, values in found.items():
+            latencies[gesture] = np.concatenate((latencies[gesture], values)) if gesture in latencies else values
+
+    summary = summarize(latencies)
+    print(json.dumps(summary, indent=2) if args.json else format_summary(summary))
+
+
+if __name__ == "__main__":
+    main()
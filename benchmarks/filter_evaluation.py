@@ -0,0 +1,202 @@
+"""Compare cursor filters on replayed landmarks: jitter at rest and lag in motion
+
+Every filter is run through VirtualMouse on the same frames and its cursor
+path is compared with a reference path:
+
+- for a synthetic session (--synthetic SECONDS) the reference is the
+  noiseless trajectory the landmarks were generated from;
+- for recordings it is the raw cursor path smoothed without delay
+  (centred moving average), the best estimate of where the hand really was.
+
+Jitter is the RMS distance to the reference on frames where the reference has
+settled at rest, lag is the time shift that best aligns the filtered path with the
+reference on frames where it moves.
+
+    python -m benchmarks.filter_evaluation --synthetic 60
+    python -m benchmarks.filter_evaluation sessions/*.landmarks --filter one_euro:min_cutoff=0.5,beta=0.02 kalman
+"""
+import argparse
+import json
+
+import numpy as np
+
+from cursor_filters import ExponentialFilter, create_filter
+from landmark_array import INDEX_TIP
+from landmark_recording import LandmarkRecording, is_landmark_recording
+from landmark_stream import ReplayHandedness, ReplayHandLandmarks, ReplayResults, read_landmark_stream
+from output_sinks import RecordingOutputSink
+from virtual_mouse import VirtualMouse
+
+WINDOW_WIDTH = 1000
+WINDOW_HEIGHT = 400
+DEFAULT_FRAME_SIZE = (640, 480)
+DEFAULT_FILTERS = ["exponential", "one_euro", "kalman"]
+
+
+def parse_filter(spec):
+    """Parse 'name' or 'name:key=value,key=value' into (name, settings)"""
+    name, _, options = spec.partition(":")
+    settings = {}
+    for option in filter(None, options.split(",")):
+        key, value = option.split("=")
+        settings[key] = float(value)
+    return name, settings
+
+
+def load_frames(path):
+    """Return (frame_size, [(timestamp, results), ...]) for a recording or .jsonl stream"""
+    if is_landmark_recording(path):
+        recording = LandmarkRecording(path)
+        return recording.frame_size or DEFAULT_FRAME_SIZE, list(recording)
+    return DEFAULT_FRAME_SIZE, list(read_landmark_stream(path))
+
+
+def synthetic_session(seconds, fps=30.0, noise=0.002, seed=0):
+    """Right hand pausing and moving between random targets, with landmark noise
+
+    Returns (noisy frames, clean frames), both as [(timestamp, results), ...].
+    """
+    rng = np.random.default_rng(seed)
+    count = int(seconds * fps)
+    times = np.arange(count) / fps
+
+    # Alternate 1s pauses and 0.4s minimum-jerk moves
+    path = np.empty((count, 2))
+    position = np.array([0.5, 0.5])
+    start, i = position, 0
+    while i < count:
+        hold = min(count - i, int(fps))
+        path[i:i + hold] = position
+        i += hold
+        target = rng.uniform(0.15, 0.85, 2)
+        move = min(count - i, int(0.4 * fps))
+        s = np.arange(1, move + 1) / (0.4 * fps)
+        ease = 10 * s ** 3 - 15 * s ** 4 + 6 * s ** 5
+        start, position = position, target
+        path[i:i + move] = start + ease[:, None] * (target - start)
+        i += move
+
+    def frames(points):
+        result = []
+        for t, point in zip(times, points):
+            hand = np.zeros((21, 3), dtype=np.float32)
+            hand[:, :2] = point
+            result.append((float(t), ReplayResults([ReplayHandLandmarks(hand)], [ReplayHandedness("Right")])))
+        return result
+
+    noisy = path + rng.normal(0.0, noise, path.shape)
+    return frames(noisy), frames(path)
+
+
+def cursor_path(frames, frame_size, cursor_filter):
+    """Replay the right hand through VirtualMouse, returns (timestamps, (n, 2) positions)"""
+    output = RecordingOutputSink()
+    mouse = VirtualMouse(None, None, None, WINDOW_WIDTH, WINDOW_HEIGHT, output)
+    mouse.cursor_filter = cursor_filter
+    w, h = frame_size
+
+    timestamps = []
+    for timestamp, results in frames:
+        if not results.multi_hand_landmarks:
+            continue
+        for idx, handedness in enumerate(results.multi_handedness):
+            if handedness.classification[0].label == "Right":
+                hand = mouse.hand.fill(results.multi_hand_landmarks[idx])
+                mouse.move_mouse(hand.pixel(INDEX_TIP, w, h), frame_size, timestamp)
+                timestamps.append(timestamp)
+                break
+    positions = np.array([args for name, args in output.events if name == "move_to"], dtype=np.float64)
+    return np.array(timestamps), positions.reshape(-1, 2)
+
+
+def zero_phase_smooth(positions, window=7):
+    """Centred moving average, used as the reference path for recordings"""
+    if len(positions) < window:
+        return positions.copy()
+    kernel = np.ones(window) / window
+    padded = np.pad(positions, ((window // 2, window // 2), (0, 0)), mode="edge")
+    return np.stack([np.convolve(padded[:, axis], kernel, mode="valid") for axis in range(2)], axis=1)
+
+
+def evaluate(timestamps, positions, reference, rest_speed=50.0, settle=0.3, max_lag=0.3):
+    """Return (jitter in pixels, lag in ms) of a cursor path against the reference
+
+    Jitter only counts frames where the reference has been at rest for settle
+    seconds, so a filter still catching up after a move is not counted twice.
+    """
+    if len(timestamps) < 3:
+        return float("nan"), float("nan")
+    speed = np.zeros(len(timestamps))
+    dt = np.maximum(np.diff(timestamps), 1e-6)
+    speed[1:] = np.hypot(*np.diff(reference, axis=0).T) / dt
+    at_rest = speed < rest_speed
+
+    # Time since the reference came to rest
+    rest_start = np.where(at_rest, -np.inf, timestamps)
+    rest_start[0] = timestamps[0]
+    settled = at_rest & (timestamps - np.maximum.accumulate(rest_start) >= settle)
+
+    jitter = float("nan")
+    if settled.any():
+        jitter = float(np.sqrt(np.mean(np.sum((positions[settled] - reference[settled]) ** 2, axis=1))))
+
+    moving = ~at_rest
+    lag = float("nan")
+    if moving.any():
+        # Shift the reference later in time until it best matches the filtered path
+        errors = []
+        lags = np.arange(0.0, max_lag, 0.001)
+        for shift in lags:
+            shifted_x = np.interp(timestamps[moving] - shift, timestamps, reference[:, 0])
+            shifted_y = np.interp(timestamps[moving] - shift, timestamps, reference[:, 1])
+            errors.append(np.mean((positions[moving, 0] - shifted_x) ** 2 + (positions[moving, 1] - shifted_y) ** 2))
+        lag = 1000 * float(lags[int(np.argmin(errors))])
+    return jitter, lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cursor filter jitter and lag on replayed landmarks")
+    parser.add_argument("recordings", nargs="*", help="Binary landmark recordings or .jsonl landmark streams")
+    parser.add_argument("--synthetic", type=float, default=None, metavar="SECONDS",
+                        help="Evaluate on a generated session with a known noiseless trajectory")
+    parser.add_argument("--filter", nargs="+", default=DEFAULT_FILTERS, dest="filters",
+                        help="Filters as name or name:key=value,... (default: %(default)s)")
+    parser.add_argument("--rest-speed", type=float, default=50.0,
+                        help="Reference speed (pixels/s) below which the cursor counts as at rest")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+    if not args.recordings and args.synthetic is None:
+        parser.error("give landmark recordings or --synthetic SECONDS")
+
+    # (name, frame_size, frames, reference path)
+    sessions = []
+    if args.synthetic is not None:
+        noisy, clean = synthetic_session(args.synthetic)
+        _, reference = cursor_path(clean, DEFAULT_FRAME_SIZE, ExponentialFilter(smoothening=1))
+        sessions.append((f"synthetic {args.synthetic:g}s", DEFAULT_FRAME_SIZE, noisy, reference))
+    for path in args.recordings:
+        frame_size, frames = load_frames(path)
+        _, raw = cursor_path(frames, frame_size, ExponentialFilter(smoothening=1))
+        sessions.append((path, frame_size, frames, zero_phase_smooth(raw)))
+
+    report = []
+    for name, frame_size, frames, reference in sessions:
+        for spec in ["raw"] + args.filters:
+            if spec == "raw":
+                cursor_filter = ExponentialFilter(smoothening=1)
+            else:
+                filter_name, settings = parse_filter(spec)
+                cursor_filter = create_filter(filter_name, **settings)
+            timestamps, positions = cursor_path(frames, frame_size, cursor_filter)
+            jitter, lag = evaluate(timestamps, positions, reference, args.rest_speed)
+            report.append({"session": name, "filter": spec, "jitter_px": jitter, "lag_ms": lag})
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for row in report:
+        print(f"{row['session']:<24} {row['filter']:<36} jitter {row['jitter_px']:6.2f}px  lag {row['lag_ms']:5.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
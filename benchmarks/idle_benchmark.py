@@ -0,0 +1,168 @@
+"""CPU time per minute with and without the idle low-power mode
+
+Runs the threaded pipeline headlessly on a simulated 30 fps camera showing
+an empty scene (no hands) and reports the process CPU time (all threads)
+per minute of wall time:
+
+    active         idle mode off, full-rate detection on every frame
+    idle, still    idle mode on, nothing moves: only the motion check runs
+    idle, motion   idle mode on, something without hands moves: motion-gated probes
+
+    python -m benchmarks.idle_benchmark --seconds 30
+    python -m benchmarks.idle_benchmark --scene empty_room.mp4   # loop a recording of the empty scene
+"""
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+
+from main import MouseAndKeyboard
+from output_sinks import RecordingOutputSink
+
+
+class SimulatedCamera:
+    """Frame source that behaves like a live camera
+
+    read() blocks until the next frame is due, frames that are not read in
+    time are skipped, and the source ends after duration seconds. The CPU
+    time used after warmup seconds is measured.
+    """
+
+    finite = True
+
+    def __init__(self, frames, fps=30.0, duration=30.0, warmup=5.0):
+        self.frames = frames
+        self.fps = fps
+        self.duration = duration
+        self.warmup = warmup
+        self.started_at = None
+        self.last_index = -1
+        self.cpu_start = None
+        self.measured_at = None
+        self.cpu_seconds = None
+        self.wall_seconds = None
+        self._timestamp = None
+
+    def read(self, image=None):
+        now = time.perf_counter()
+        if self.started_at is None:
+            self.started_at = now
+        elapsed = now - self.started_at
+        if self.cpu_start is None and elapsed >= self.warmup:
+            self.cpu_start = time.process_time()
+            self.measured_at = now
+        if elapsed >= self.duration:
+            if self.cpu_seconds is None and self.cpu_start is not None:
+                self.cpu_seconds = time.process_time() - self.cpu_start
+                self.wall_seconds = now - self.measured_at
+            return False, None
+
+        # Wait for the next frame like a camera driver does
+        index = max(self.last_index + 1, int(elapsed * self.fps))
+        delay = self.started_at + index / self.fps - now
+        if delay > 0:
+            time.sleep(delay)
+        self.last_index = index
+        frame = self.frames[index % len(self.frames)]
+        if image is None or image.shape != frame.shape:
+            image = frame.copy()
+        else:
+            np.copyto(image, frame)
+        self._timestamp = time.time()
+        return True, image
+
+    def frame_timestamp(self):
+        return self._timestamp
+
+    def frame_results(self):
+        return None
+
+    def release(self):
+        pass
+
+
+def empty_scene(count=30, size=(480, 640), seed=0):
+    """A still, noisy gray scene (sensor noise differs from frame to frame)"""
+    rng = np.random.default_rng(seed)
+    background = np.full(size + (3,), 110, dtype=np.int16)
+    background[size[0] // 2:] += 30
+    return [np.clip(background + rng.normal(0, 2, background.shape), 0, 255).astype(np.uint8) for _ in range(count)]
+
+
+def moving_scene(frames):
+    """The scene with a dark shape crossing it, like someone walking by"""
+    moving = []
+    height, width = frames[0].shape[:2]
+    for i, frame in enumerate(frames * 4):
+        frame = frame.copy()
+        x = int((i / (len(frames) * 4)) * (width + 160)) - 160
+        cv2.rectangle(frame, (x, height // 4), (x + 160, height), (40, 40, 50), -1)
+        moving.append(frame)
+    return moving
+
+
+def load_scene(path, max_frames=300):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < max_frames:
+        success, image = cap.read()
+        if not success:
+            break
+        frames.append(image)
+    cap.release()
+    if not frames:
+        raise IOError(f"Cannot read frames from {path}")
+    return frames
+
+
+def run_scenario(frames, idle_after, seconds, warmup):
+    app = MouseAndKeyboard(output=RecordingOutputSink())
+    app.headless = True
+    if idle_after is not None:
+        app.enable_idle_mode(idle_after)
+    source = SimulatedCamera(frames, duration=seconds, warmup=warmup)
+    rendered = app.run_threaded(source, display=False)
+    app.hands.close()
+    report = {
+        "cpu_seconds_per_minute": 60 * source.cpu_seconds / source.wall_seconds if source.wall_seconds else None,
+        "frames_per_second": rendered / seconds,
+    }
+    if app.idle is not None:
+        report.update(app.idle.stats())
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU time per minute, idle versus active")
+    parser.add_argument("--scene", default=None, help="Video of the empty scene to loop (default: synthetic)")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Length of every scenario")
+    parser.add_argument("--idle-after", type=float, default=2.0, help="Seconds without hands before going idle")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    still = load_scene(args.scene) if args.scene else empty_scene()
+    # CPU is measured once the idle scenarios have settled into their state
+    warmup = args.idle_after + 1.0
+    scenarios = {
+        "active": (still, None),
+        "idle, still": (still, args.idle_after),
+        "idle, motion": (moving_scene(still), args.idle_after),
+    }
+    reports = {name: run_scenario(frames, idle_after, args.seconds, warmup)
+               for name, (frames, idle_after) in scenarios.items()}
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    for name, report in reports.items():
+        line = (f"{name:>13}: {report['cpu_seconds_per_minute']:5.1f} CPU s/min, "
+                f"{report['frames_per_second']:5.1f} frames/s")
+        if "probes" in report:
+            line += f", {report['probes']} probes in {report['idle_frames']} idle frames"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Per-frame cost of landmark handling before and after LandmarkArray
+
+"before" is the original per-attribute path: get_finger_positions building
+two dicts (called twice per frame) plus detect_click. "after" converts the
+hand once into a LandmarkArray and runs the same logic on it, and is split
+into the conversion ("fill") and the gesture queries on the filled array.
+
+The conversion still reads every landmark attribute from the protobuf once:
+MediaPipe hands out no buffer to copy in bulk, and reading the 63
+attributes is most of the per-frame cost on either path. What LandmarkArray
+saves is the repeated reads, the dicts and every allocation after the fill.
+
+    python -m benchmarks.landmark_microbenchmark
+"""
+import argparse
+import math
+import time
+import tracemalloc
+
+import numpy as np
+
+from landmark_array import LandmarkArray, INDEX_TIP, THUMB_TIP
+from landmark_stream import ReplayLandmark
+
+
+class AttributeHand:
+    """Hand with per-landmark attribute access only (like a MediaPipe protobuf)"""
+
+    def __init__(self, points):
+        self.landmark = [ReplayLandmark(*point) for point in points]
+
+
+def make_hand(points):
+    """Build a MediaPipe NormalizedLandmarkList when MediaPipe is installed"""
+    try:
+        from mediapipe.framework.formats import landmark_pb2
+    except ImportError:
+        return AttributeHand(points), "attribute objects"
+    hand = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in points:
+        hand.landmark.add(x=x, y=y, z=z)
+    return hand, "MediaPipe protobuf"
+
+
+def legacy_finger_positions(hand_landmarks, img_shape):
+    h, w, _ = img_shape
+    landmarks = {
+        'thumb': (int(hand_landmarks.landmark[4].x * w), int(hand_landmarks.landmark[4].y * h)),
+        'index': (int(hand_landmarks.landmark[8].x * w), int(hand_landmarks.landmark[8].y * h)),
+        'middle': (int(hand_landmarks.landmark[12].x * w), int(hand_landmarks.landmark[12].y * h)),
+        'ring': (int(hand_landmarks.landmark[16].x * w), int(hand_landmarks.landmark[16].y * h))
+    }
+    is_finger_up = {
+        'thumb': hand_landmarks.landmark[4].x > hand_landmarks.landmark[3].x,
+        'index': hand_landmarks.landmark[8].y < hand_landmarks.landmark[6].y,
+        'middle': hand_landmarks.landmark[12].y < hand_landmarks.landmark[10].y,
+        'ring': hand_landmarks.landmark[16].y < hand_landmarks.landmark[14].y
+    }
+    return landmarks, is_finger_up
+
+
+def legacy_frame(hand_landmarks, img_shape):
+    """Mouse and keyboard landmark work per frame, as originally written"""
+    landmarks, _ = legacy_finger_positions(hand_landmarks, img_shape)
+    _, up = legacy_finger_positions(hand_landmarks, img_shape)
+    left_click = up['thumb'] and up['index'] and not up['middle'] and not up['ring']
+    right_click = not up['thumb'] and up['index'] and up['middle'] and not up['ring']
+    click_hold = not up['thumb'] and up['index'] and up['middle'] and up['ring']
+    index_tip = hand_landmarks.landmark[8]
+    thumb_tip = hand_landmarks.landmark[4]
+    pinch = math.sqrt((thumb_tip.x - index_tip.x) ** 2 + (thumb_tip.y - index_tip.y) ** 2) < 0.05
+    return landmarks['index'], left_click, right_click, click_hold, pinch
+
+
+def array_frame(hand_landmarks, img_shape, hand):
+    """The same work on a LandmarkArray filled once per frame"""
+    hand.fill(hand_landmarks)
+    return array_queries(img_shape, hand)
+
+
+def array_queries(img_shape, hand):
+    """The gesture queries of array_frame on an already filled LandmarkArray"""
+    h, w, _ = img_shape
+    landmarks = hand.finger_tip_pixels(w, h)
+    state = hand.finger_state()
+    pinch = hand.distance(THUMB_TIP, INDEX_TIP) < 0.05
+    return landmarks[1], state == 3, state == 6, state == 14, pinch
+
+
+def measure(fn, iterations):
+    """Return (microseconds per frame, peak transient bytes allocated per frame)"""
+    for _ in range(100):
+        fn()
+    # Best of a few repeats, to keep scheduler noise out of the numbers
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    per_frame_us = 1e6 * best / iterations
+
+    tracemalloc.start()
+    peak = 0
+    for _ in range(100):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        fn()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    return per_frame_us, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Landmark handling microbenchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    hand_landmarks, kind = make_hand(rng.random((21, 3)).tolist())
+    img_shape = (480, 640, 3)
+    hand = LandmarkArray()
+    filled = LandmarkArray().fill(hand_landmarks)
+
+    print(f"Hand landmarks: {kind}, {args.iterations} iterations")
+    for name, fn in (
+        ("before", lambda: legacy_frame(hand_landmarks, img_shape)),
+        ("after", lambda: array_frame(hand_landmarks, img_shape, hand)),
+        ("  fill", lambda: hand.fill(hand_landmarks)),
+        ("  queries", lambda: array_queries(img_shape, filled)),
+    ):
+        per_frame_us, peak = measure(fn, args.iterations)
+        print(f"  {name:<9} {per_frame_us:7.2f} us/frame, {peak:5d} bytes peak allocation/frame")
+
+
+if __name__ == "__main__":
+    main()
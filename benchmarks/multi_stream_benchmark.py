@@ -0,0 +1,54 @@
+"""Measure how multi-stream inference throughput scales with the number of streams
+
+The same recording is replayed as 1, 2, ... N streams (one inference process
+each, unpaced) and the total frames/sec is compared with N times the single
+stream rate. Scaling stays close to linear while there are free cores.
+
+    python -m benchmarks.multi_stream_benchmark recording.mp4 --max-streams 8
+"""
+import argparse
+import json
+import os
+
+from multi_stream import MultiStreamCoordinator
+
+
+def run_scaling(recording, stream_counts, max_frames=None):
+    """Return one report dict per stream count"""
+    reports = []
+    for count in stream_counts:
+        coordinator = MultiStreamCoordinator([recording] * count, realtime=False, max_frames=max_frames)
+        coordinator.start()
+        coordinator.run()
+        fps = coordinator.total_frames / coordinator.elapsed if coordinator.elapsed else 0.0
+        reports.append({"streams": count, "frames": coordinator.total_frames,
+                        "seconds": coordinator.elapsed, "fps": fps})
+
+    single_fps = reports[0]["fps"] / reports[0]["streams"] if reports and reports[0]["fps"] else 0.0
+    for report in reports:
+        report["efficiency"] = report["fps"] / (report["streams"] * single_fps) if single_fps else 0.0
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-stream inference scaling benchmark")
+    parser.add_argument("recording", help="Recorded video file (or landmark stream) replayed by every stream")
+    parser.add_argument("--max-streams", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-frames", type=int, default=300, help="Frames per stream (default: 300)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    # Powers of two up to max-streams, and max-streams itself
+    counts = sorted({min(2 ** i, args.max_streams) for i in range(args.max_streams.bit_length() + 1)})
+    reports = run_scaling(args.recording, counts, args.max_frames)
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    print(f"{os.cpu_count()} cores")
+    for report in reports:
+        print(f"{report['streams']:>3} streams: {report['fps']:7.1f} fps total "
+              f"({report['frames']} frames in {report['seconds']:.1f}s), scaling efficiency {100 * report['efficiency']:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
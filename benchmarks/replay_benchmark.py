@@ -0,0 +1,115 @@
+"""Replay a fixed recording through the gesture loop and report performance
+
+Runs headless: no window is opened and OS events go to a recording sink, so
+it works on a Linux box without a desktop.
+
+    python -m benchmarks.replay_benchmark recording.mp4
+    python -m benchmarks.replay_benchmark session.jsonl --mode threaded --json
+"""
+import argparse
+import json
+import time
+
+from event_latency import EventLatencyTracer, format_summary
+from frame_sources import open_source
+from main import MouseAndKeyboard
+from output_sinks import RecordingOutputSink
+from pipeline import StageLatency
+
+
+def run_benchmark(recording, mode=MouseAndKeyboard.MODE_SYNC, max_frames=None, screen_size=(1920, 1080),
+                  realtime=False, roi=False, adaptive_skip=None, event_tracer=None):
+    """Replay a recording and return a report dict
+
+    When an EventLatencyTracer is given it is filled with the latency of
+    every event and its summary is added to the report.
+    """
+    output = RecordingOutputSink(screen_size)
+    app = MouseAndKeyboard(output=output)
+    # Keep every sample so percentiles cover the whole run
+    app.latency = StageLatency(window=None)
+    if roi:
+        app.enable_roi_tracking()
+    if adaptive_skip:
+        app.enable_adaptive_skipping(adaptive_skip)
+    if event_tracer is not None:
+        app.enable_event_tracing(event_tracer)
+    source = open_source(recording, app.window_width, app.window_height, realtime=realtime)
+
+    start = time.perf_counter()
+    try:
+        if mode == MouseAndKeyboard.MODE_SYNC:
+            frames = app.run_sync(source, display=False, max_frames=max_frames)
+        else:
+            frames = app.run_threaded(source, display=False, max_frames=max_frames)
+    finally:
+        source.release()
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "recording": str(recording),
+        "mode": mode,
+        "frames": frames,
+        "seconds": elapsed,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": app.latency.percentiles(),
+        "events": dict(output.event_counts()),
+    }
+    if app.roi_tracker is not None:
+        report["roi"] = app.roi_tracker.stats()
+    if app.scheduler is not None:
+        report["inferred_frames"] = app.scheduler.inferred_frames
+        report["predicted_frames"] = app.scheduler.predicted_frames
+    if app.event_tracer is not None:
+        report["event_latency_ms"] = app.event_tracer.summary()
+    return report
+
+
+def format_report(report):
+    lines = [
+        f"Recording: {report['recording']} ({report['mode']})",
+        f"Frames: {report['frames']} in {report['seconds']:.2f}s -> {report['fps']:.1f} fps",
+        "Stage latency (ms):",
+    ]
+    for stage, values in report["latency_ms"].items():
+        lines.append(f"  {stage:<10} " + "  ".join(f"p{percent} {ms:7.2f}" for percent, ms in values.items()))
+    lines.append("Events:")
+    for name, count in sorted(report["events"].items()):
+        lines.append(f"  {name:<16} {count}")
+    if "predicted_frames" in report:
+        lines.append(f"Adaptive skipping: {report['inferred_frames']} inferred, "
+                     f"{report['predicted_frames']} predicted frames")
+    if "roi" in report:
+        roi = report["roi"]
+        lines.append(f"ROI: hit rate {100 * roi['roi_hit_rate']:.1f}%, {roi['fallbacks']} fallbacks, "
+                     f"{roi['saved_ms']:.0f} ms net inference saved")
+    if "event_latency_ms" in report:
+        lines.append("Capture to OS event latency (ms):")
+        lines.extend("  " + line for line in format_summary(report["event_latency_ms"]).splitlines())
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the gesture loop on a recording")
+    parser.add_argument("recording", help="Recorded video file or .jsonl landmark stream")
+    parser.add_argument("--mode", choices=MouseAndKeyboard.MODES, default=MouseAndKeyboard.MODE_SYNC,
+                        help="Pipeline mode, sync is deterministic (default: sync)")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--realtime", action="store_true",
+                        help="Pace video files at their frame rate, like a camera (useful with --mode threaded)")
+    parser.add_argument("--roi", action="store_true", help="Enable region-of-interest hand tracking")
+    parser.add_argument("--adaptive-skip", type=float, default=None, metavar="TARGET_FPS",
+                        help="Enable adaptive inference frame skipping")
+    parser.add_argument("--event-latency", action="store_true",
+                        help="Report capture to OS event latency per gesture type")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.recording, args.mode, args.max_frames, realtime=args.realtime, roi=args.roi,
+                           adaptive_skip=args.adaptive_skip,
+                           event_tracer=EventLatencyTracer() if args.event_latency else None)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
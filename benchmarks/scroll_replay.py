@@ -0,0 +1,275 @@
+"""Replay scroll gestures and report the wheel events they produce
+
+A landmark stream (a binary recording, or by default a synthetic session
+of flicks and slow drags, moving the cursor with an open hand in between)
+is replayed through VirtualMouse twice:
+
+    replay     synchronous sink, the scroller ticked with the frame timestamps
+    realtime   frames played at their recorded pace into an AsyncOutputSink,
+               the scroller ticked by its output thread
+
+and the report gives, per run, the wheel batches sent, their peak rate, the
+clicks per direction, how long scrolling went on after each release
+(inertia), and the wheel events one scroll call per frame would have sent.
+Every run is then checked: no batches faster than --max-rate, and after
+every release the batches shrink and stop within the time the decay allows.
+A failed check is printed and the exit status is 1.
+
+    python -m benchmarks.scroll_replay
+    python -m benchmarks.scroll_replay sessions/scroll.landmarks --max-rate 15 --decay 0.5
+"""
+import argparse
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+from hand_tracking import MOUSE, HandIdentityTracker
+from landmark_recording import LandmarkRecording, replay_gestures
+from landmark_stream import ReplayHandedness, ReplayHandLandmarks, ReplayResults
+from output_sinks import AsyncOutputSink, RecordingOutputSink
+from virtual_keyboard import VirtualKeyboard
+from virtual_mouse import VirtualMouse
+
+WINDOW_WIDTH = 1000
+WINDOW_HEIGHT = 400
+FPS = 30.0
+
+
+class TimedRecordingSink(RecordingOutputSink):
+    """Recording sink that also keeps when every event arrived"""
+
+    def __init__(self, clock=time.perf_counter):
+        super().__init__()
+        self.clock = clock
+        self.times = []
+
+    def _record(self, name, *args):
+        super()._record(name, *args)
+        self.times.append(self.clock())
+
+
+def hand_pose(x, y, scrolling, size=0.25):
+    """Landmarks of an upright right hand with its wrist at (x, y)
+
+    While scrolling thumb, index and middle are up (the scroll gesture),
+    otherwise the hand is open, thumb, index, middle and ring up (moving the
+    cursor, which must not scroll).
+    """
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[1:4, :2] = [(0.08, -0.05), (0.14, -0.1), (0.18, -0.16)]
+    points[4, :2] = (0.25, -0.2)
+    for base, finger_x, up in ((5, 0.1, True), (9, 0.03, True), (13, -0.04, not scrolling), (17, -0.1, False)):
+        points[base:base + 4, 0] = finger_x
+        points[base:base + 4, 1] = (-0.35, -0.47, -0.55, -0.62) if up else (-0.35, -0.43, -0.37, -0.31)
+    points[:, :2] = points[:, :2] * size + (x, y)
+    return points
+
+
+def synthetic_session(flicks=4, noise=0.0015, seed=0):
+    """(timestamp, results) frames: open hand, grab, flick up and let go, then a slow drag down"""
+    rng = np.random.default_rng(seed)
+    poses = []
+    for _ in range(flicks):
+        poses += [(0.5, 0.8, False)] * 20
+        poses += [(0.5, 0.8, True)] * 8
+        poses += [(0.5, 0.8 - 0.3 * (i + 1) / 8, True) for i in range(8)]
+        poses += [(0.5, 0.5, False)] * 40
+        poses += [(0.5, 0.5, True)] * 8
+        poses += [(0.5, 0.5 + 0.3 * (i + 1) / 45, True) for i in range(45)]
+        poses += [(0.5, 0.8, False)] * 40
+    frames = []
+    for i, (x, y, scrolling) in enumerate(poses):
+        points = hand_pose(x, y, scrolling)
+        points[:, :2] += rng.normal(0, noise, (21, 2))
+        frames.append((i / FPS, ReplayResults([ReplayHandLandmarks(points)], [ReplayHandedness("Right")])))
+    return frames
+
+
+def make_mouse(output, settings):
+    mouse = VirtualMouse(None, None, None, WINDOW_WIDTH, WINDOW_HEIGHT, output)
+    mouse.scroller.max_rate = settings["max_rate"]
+    mouse.scroller.decay = settings["decay"]
+    mouse.scroll_gain = settings["gain"]
+    return mouse
+
+
+def per_frame_events(frames):
+    """Wheel events a scroll call per frame would send: moving frames of the scroll gesture"""
+    mouse = VirtualMouse(None, None, None, WINDOW_WIDTH, WINDOW_HEIGHT, RecordingOutputSink())
+    tracker = HandIdentityTracker()
+    count = 0
+    for timestamp, results in frames:
+        hand = tracker.update(results).get(MOUSE)
+        if hand is None:
+            continue
+        mouse.hand.fill(results.multi_hand_landmarks[hand.index])
+        if "scroll" in mouse.gestures.update(mouse.hand):
+            count += 1
+    return count
+
+
+class ScrollWatcher:
+    """Notes when the scroll gesture is grabbed and released, and the speed it was let go at"""
+
+    def __init__(self, mouse):
+        self.mouse = mouse
+        self.scrolling = False
+        self.grabs = []
+        self.releases = []
+        self.release_speeds = []
+
+    def update(self, timestamp):
+        scrolling = self.mouse.scroll_anchor is not None
+        if scrolling != self.scrolling:
+            (self.grabs if scrolling else self.releases).append(timestamp)
+            if not scrolling:
+                self.release_speeds.append(math.hypot(*self.mouse.scroller.velocity))
+        self.scrolling = scrolling
+
+
+def scroll_report(times, events, watcher):
+    scrolls = [(t, args) for t, (name, args) in zip(times, events) if name == "scroll"]
+    gaps = np.diff([t for t, _ in scrolls]) if len(scrolls) > 1 else np.array([])
+    # Inertia: from every release to the last batch before the next grab
+    coasts = []
+    for release, speed in zip(watcher.releases, watcher.release_speeds):
+        next_grab = min([grab for grab in watcher.grabs if grab > release], default=float("inf"))
+        sent = [(t, args) for t, args in scrolls if release <= t < next_grab]
+        coasts.append({
+            "release_speed": speed,
+            "seconds": max(t for t, _ in sent) - release if sent else 0.0,
+            "batch_clicks": [abs(args[0]) + abs(args[1]) for _, args in sent],
+        })
+    return {
+        "batches": len(scrolls),
+        "clicks_up": sum(max(args[1], 0) for _, args in scrolls),
+        "clicks_down": sum(max(-args[1], 0) for _, args in scrolls),
+        "clicks_horizontal": sum(abs(args[0]) for _, args in scrolls),
+        "peak_rate": float(1.0 / gaps.min()) if len(gaps) else 0.0,
+        "coast_seconds": float(np.mean([coast["seconds"] for coast in coasts])) if coasts else 0.0,
+        "coasts": coasts,
+    }
+
+
+def check_run(run, settings, min_speed=2.0, rate_tolerance=0.0, slack=0.0):
+    """Problems with a run's wheel batches, an empty list when it behaved
+
+    rate_tolerance is the share the peak rate may exceed max_rate by and
+    slack the seconds a coast may overrun its decay by (timer jitter of a
+    realtime run).
+    """
+    problems = []
+    if run["peak_rate"] > settings["max_rate"] * (1.0 + rate_tolerance):
+        problems.append(f"peak rate {run['peak_rate']:.1f}/s over the cap of {settings['max_rate']:g}/s")
+    tick = 1.0 / settings["max_rate"]
+    for i, coast in enumerate(run["coasts"]):
+        speed = coast["release_speed"]
+        if speed < min_speed:
+            continue
+        clicks = coast["batch_clicks"]
+        # The velocity only decays, so a batch never carries more than the
+        # previous one plus the rounding carried over (a click per axis)
+        if any(later > earlier + 2 for earlier, later in zip(clicks, clicks[1:])):
+            problems.append(f"release {i}: batches grow while coasting {clicks}")
+        # The coast ends once the decayed speed falls below min_speed
+        limit = settings["decay"] * math.log(speed / min_speed) + 2 * tick + slack
+        if coast["seconds"] > limit:
+            problems.append(f"release {i}: coasted {coast['seconds']:.2f}s, the decay allows {limit:.2f}s")
+        # and travels the integral of the decaying speed, give or take the rounding
+        expected = speed * settings["decay"] * (1.0 - min_speed / speed)
+        if abs(sum(clicks) - expected) > max(2.0, 0.25 * expected):
+            problems.append(f"release {i}: coasted {sum(clicks)} clicks, the decay gives {expected:.1f}")
+    return problems
+
+
+def run_replay(frames, settings):
+    output = RecordingOutputSink()
+    mouse = make_mouse(output, settings)
+    keyboard = VirtualKeyboard(None, None, None, WINDOW_WIDTH, WINDOW_HEIGHT, output)
+    camera_img = np.zeros((480, 640, 3), dtype=np.uint8)
+    keyboard_img = np.zeros((WINDOW_HEIGHT, WINDOW_WIDTH, 3), dtype=np.uint8)
+    tracker = HandIdentityTracker()
+    watcher = ScrollWatcher(mouse)
+    times = []
+    for timestamp, results in frames:
+        count = len(output.events)
+        replay_gestures([(timestamp, results)], mouse, keyboard, camera_img, keyboard_img, tracker)
+        times += [timestamp] * (len(output.events) - count)
+        watcher.update(timestamp)
+    # Let the last coast finish
+    timestamp = frames[-1][0]
+    while mouse.scroller.active:
+        timestamp += 1.0 / FPS
+        count = len(output.events)
+        mouse.hand_lost(timestamp)
+        times += [timestamp] * (len(output.events) - count)
+    return scroll_report(times, output.events, watcher)
+
+
+def run_realtime(frames, settings):
+    recorder = TimedRecordingSink()
+    output = AsyncOutputSink(recorder)
+    mouse = make_mouse(output, settings)
+    keyboard = VirtualKeyboard(None, None, None, WINDOW_WIDTH, WINDOW_HEIGHT, output)
+    camera_img = np.zeros((480, 640, 3), dtype=np.uint8)
+    keyboard_img = np.zeros((WINDOW_HEIGHT, WINDOW_WIDTH, 3), dtype=np.uint8)
+    tracker = HandIdentityTracker()
+    watcher = ScrollWatcher(mouse)
+    start = time.perf_counter()
+    first = frames[0][0]
+    for timestamp, results in frames:
+        delay = start + (timestamp - first) - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        now = time.perf_counter()
+        replay_gestures([(now, results)], mouse, keyboard, camera_img, keyboard_img, tracker)
+        watcher.update(now)
+    while mouse.scroller.active:
+        time.sleep(0.05)
+    output.close()
+    return scroll_report(recorder.times, recorder.events, watcher)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wheel events produced by replayed scroll gestures")
+    parser.add_argument("recording", nargs="?", default=None, help="Binary landmark recording (default: synthetic)")
+    parser.add_argument("--max-rate", type=float, default=20.0, help="Wheel batches per second at most")
+    parser.add_argument("--decay", type=float, default=0.35, help="Inertia time constant in seconds")
+    parser.add_argument("--gain", type=float, default=30.0, help="Wheel clicks per frame height of hand travel")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    frames = list(LandmarkRecording(args.recording)) if args.recording else synthetic_session()
+    settings = {"max_rate": args.max_rate, "decay": args.decay, "gain": args.gain}
+    report = {
+        "frames": len(frames),
+        "per_frame_events": per_frame_events(frames),
+        "replay": run_replay(frames, settings),
+        "realtime": run_realtime(frames, settings),
+    }
+    # The realtime run is timed by the output thread, allow for its timer jitter
+    report["problems"] = ([f"replay: {problem}" for problem in check_run(report["replay"], settings)]
+                          + [f"realtime: {problem}" for problem in
+                             check_run(report["realtime"], settings, rate_tolerance=0.1, slack=0.1)])
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['frames']} frames, one scroll call per frame would send {report['per_frame_events']} "
+              f"wheel events")
+        for name in ("replay", "realtime"):
+            run = report[name]
+            print(f"{name:>9}: {run['batches']} batches (peak {run['peak_rate']:.1f}/s), {run['clicks_up']} clicks up, "
+                  f"{run['clicks_down']} down, {run['clicks_horizontal']} sideways, "
+                  f"coasting {run['coast_seconds']:.2f}s after release")
+        for problem in report["problems"]:
+            print(f"FAILED: {problem}")
+    if report["problems"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Measure cold start: time to first frame and to first landmark
+
+Every run is a fresh interpreter started by this script, timed from just
+before the process is spawned. The eager path imports MediaPipe up front and
+builds the hand model before the first frame (the previous startup); the
+deferred path is the one main.py uses, loading the model in the background.
+
+    python -m benchmarks.startup_benchmark recording.mp4 --runs 5
+    python -m benchmarks.startup_benchmark 0 --display   # the webcam, with the window
+
+Milestones: imports (main imported), source_open, window, first_frame,
+model_ready (first frame after the model is loaded) and first_landmark
+(first frame with a hand, only when the source shows one).
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+PATHS = ("eager", "deferred")
+MILESTONES = ("imports", "source_open", "window", "first_frame", "model_ready", "first_landmark")
+
+
+def child(path, spec, origin, display, max_frames):
+    """Start the app the way the chosen path does and print its milestones as JSON"""
+    from startup import StartupTimeline
+
+    timeline = StartupTimeline(origin)
+    if path == "eager":
+        import mediapipe  # noqa: F401
+    from frame_sources import open_source
+    from landmark_backends import DeferredBackend, create_backend
+    from main import MouseAndKeyboard
+    from output_sinks import RecordingOutputSink
+    timeline.mark("imports")
+
+    if path == "eager":
+        backend = create_backend("mediapipe_full")
+    else:
+        backend = DeferredBackend(lambda: create_backend("mediapipe_full"))
+    source = open_source(spec, 1000, 400, realtime=True)
+    app = MouseAndKeyboard(source=source, output=RecordingOutputSink(), backend=backend)
+    app.startup = timeline
+    app.headless = not display
+
+    app.open_source()
+    timeline.mark("source_open")
+    if display:
+        app.create_window()
+        timeline.mark("window")
+    try:
+        for _ in range(max_frames):
+            if app.run_sync(source, display=display, max_frames=1) == 0:
+                break
+            if "model_ready" in timeline.marks and "first_landmark" in timeline.marks:
+                break
+    finally:
+        source.release()
+        app.hands.close()
+    print(json.dumps(timeline.marks))
+
+
+def run_once(path, spec, display, max_frames):
+    command = [sys.executable, "-m", "benchmarks.startup_benchmark", spec, "--child", path,
+               "--max-frames", str(max_frames)]
+    if display:
+        command.append("--display")
+    origin = time.monotonic()
+    output = subprocess.run(command + ["--origin", repr(origin)], capture_output=True, text=True, check=True).stdout
+    # MediaPipe may log to stdout as well, the report is the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start time to first frame and first landmark")
+    parser.add_argument("source", help="Camera index or recorded video (played in real time)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per path, the median is reported")
+    parser.add_argument("--max-frames", type=int, default=300, help="Give up on the first landmark after this many frames")
+    parser.add_argument("--display", action="store_true", help="Open the window, as a real start does")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--child", choices=PATHS, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--origin", type=float, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.source, args.origin, args.display, args.max_frames)
+        return
+
+    report = {}
+    for path in PATHS:
+        runs = [run_once(path, args.source, args.display, args.max_frames) for _ in range(args.runs)]
+        report[path] = {milestone: statistics.median(run[milestone] for run in runs)
+                        for milestone in MILESTONES if all(milestone in run for run in runs)}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"median of {args.runs} runs, seconds since spawn")
+    print(f"{'':>10}" + "".join(f"{milestone:>16}" for milestone in MILESTONES))
+    for path, marks in report.items():
+        print(f"{path:>10}" + "".join(f"{marks[m]:16.2f}" if m in marks else f"{'-':>16}" for m in MILESTONES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""Train the learned finger-state classifier on labelled landmark recordings
+
+Every recording is labelled with the finger state it shows throughout,
+written LABEL=PATH. A label is a mouse gesture name (left_click,
+right_click, click_hold), "point" (index only), "none" (no finger up) or
+finger names joined with + (e.g. thumb+index).
+
+    python -m benchmarks.train_gesture_classifier left_click=rec/left.landmarks right_click=rec/right.landmarks \\
+        click_hold=rec/hold.landmarks point=rec/point.landmarks --output gestures.npz
+    python -m benchmarks.train_gesture_classifier --synthetic 1500
+
+--synthetic N generates N frames of every named state instead (or as well):
+a parametric hand with landmark noise, tilted up to --tilt degrees either
+way, half of them left hands. Training and held-out frames then come from
+the same generator, so the accuracy on them is a check of the pipeline and
+not a measure of how the classifier does on real hands.
+
+The frames are split into a training and a held-out set. The report gives
+the held-out accuracy of the classifier and of the rule-based
+LandmarkArray.finger_state (on left hands mirrored to look like right ones,
+as the classifier sees them), and the per-frame latency of both (single
+hand, and batched for the classifier). Run the app with the model using
+`py main.py --gesture-model gestures.npz`.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from gesture_classifier import GestureClassifier, landmark_features, train_classifier
+from landmark_array import FINGER_BITS, LandmarkArray
+from landmark_recording import HANDEDNESS_LABELS, LandmarkRecording
+from virtual_mouse import VirtualMouse
+
+NAMED_STATES = dict({gesture.name: gesture.pattern for gesture in VirtualMouse.GESTURES},
+                    point=FINGER_BITS['index'], none=0)
+
+
+def parse_state(label):
+    """Finger-state bitmask of a label"""
+    if label in NAMED_STATES:
+        return NAMED_STATES[label]
+    try:
+        return sum(FINGER_BITS[finger] for finger in label.split("+"))
+    except KeyError:
+        raise ValueError(f"Unknown label {label!r}, use {', '.join(NAMED_STATES)} or fingers like thumb+index")
+
+
+def load_samples(path, hand):
+    """Landmarks (frames, 21, 3) and left flags of the chosen hands in a recording"""
+    recording = LandmarkRecording(path)
+    handedness = np.asarray(recording.handedness)
+    if hand == "any":
+        present = handedness >= 0
+    else:
+        present = handedness == HANDEDNESS_LABELS.index(hand)
+    points = np.asarray(recording.landmarks)[present]
+    left = handedness[present] == HANDEDNESS_LABELS.index("Left")
+    return points, left
+
+
+# Knuckle x of index, middle, ring and pinky in synthetic_hand
+KNUCKLE_X = (0.1, 0.03, -0.04, -0.1)
+
+
+def synthetic_hand(state, rng, tilt=90.0, left=False, noise=0.012):
+    """(21, 3) landmarks of a hand showing a finger state, placed at random
+
+    An upright right hand about 0.35 frame heights tall, with landmark noise,
+    tilted by up to tilt degrees either way. A left hand is mirrored.
+    """
+    points = np.zeros((21, 3))
+    points[1:4, :2] = [(0.08, -0.05), (0.14, -0.1), (0.18, -0.16)]
+    points[4, :2] = (0.25, -0.2) if state & FINGER_BITS['thumb'] else (0.08, -0.22)
+    # Fingers outside the bitmask (the pinky) are up now and then, the rules ignore them too
+    bits = (FINGER_BITS['index'], FINGER_BITS['middle'], FINGER_BITS['ring'], None)
+    for base, finger_x, bit in zip((5, 9, 13, 17), KNUCKLE_X, bits):
+        up = state & bit if bit else rng.random() < 0.3
+        points[base:base + 4, 0] = finger_x
+        points[base:base + 4, 1] = (-0.35, -0.47, -0.55, -0.62) if up else (-0.35, -0.43, -0.37, -0.31)
+    points[:, :2] += rng.normal(0, noise, (21, 2))
+    points[:, 2] = rng.normal(0, 0.02, 21)
+
+    angle = np.radians(rng.uniform(-tilt, tilt))
+    c, s = np.cos(angle), np.sin(angle)
+    points[:, :2] = points[:, :2] @ np.array([[c, s], [-s, c]]) * rng.uniform(0.25, 0.45)
+    if left:
+        points[:, 0] *= -1
+    points[:, :2] += rng.uniform(0.3, 0.7, 2)
+    return points.astype(np.float32)
+
+
+def synthetic_samples(frames_per_state, tilt=90.0, seed=0):
+    """Landmarks, left flags and finger states of generated hands for every named state"""
+    rng = np.random.default_rng(seed)
+    states = np.repeat(sorted(set(NAMED_STATES.values())), frames_per_state)
+    left = rng.random(len(states)) < 0.5
+    points = np.stack([synthetic_hand(state, rng, tilt, is_left) for state, is_left in zip(states, left)])
+    return points, left, states.astype(np.int64)
+
+
+def filled_hand(hand_points, left=False):
+    """LandmarkArray of the landmarks, a left hand mirrored to look like a right one"""
+    hand = LandmarkArray()
+    np.copyto(hand.points, hand_points)
+    if left:
+        hand.points[:, 0] = 1.0 - hand.points[:, 0]
+    return hand
+
+
+def time_per_frame(function, items, repeat=3):
+    """Best mean seconds per call of function over items"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            function(item)
+        best = min(best, (time.perf_counter() - start) / len(items))
+    return best
+
+
+def evaluate(classifier, points, left, states, latency_frames=2000):
+    """Accuracy and latency report of the classifier against the rule-based finger states
+
+    The rules only know right hands, so they are scored on the left hands
+    mirrored, like the classifier's features.
+    """
+    hands = [filled_hand(hand_points, is_left) for hand_points, is_left in zip(points, left)]
+    rule_states = np.array([hand.finger_state() for hand in hands])
+    predicted = classifier.predict(points, left)
+
+    batch_start = time.perf_counter()
+    classifier.predict(points, left)
+    batch_seconds = (time.perf_counter() - batch_start) / len(points)
+
+    per_state = {}
+    for state in np.unique(states):
+        selected = states == state
+        per_state[int(state)] = {
+            "frames": int(selected.sum()),
+            "classifier_accuracy": float((predicted[selected] == state).mean()),
+            "rule_accuracy": float((rule_states[selected] == state).mean()),
+        }
+    return {
+        "frames": len(points),
+        "classifier_accuracy": float((predicted == states).mean()),
+        "rule_accuracy": float((rule_states == states).mean()),
+        "classifier_ms": 1000 * time_per_frame(classifier.finger_state, hands[:latency_frames]),
+        "classifier_batched_ms": 1000 * batch_seconds,
+        "rule_ms": 1000 * time_per_frame(LandmarkArray.finger_state, hands[:latency_frames]),
+        "states": per_state,
+    }
+
+
+def state_name(state):
+    fingers = [finger for finger, bit in FINGER_BITS.items() if state & bit]
+    return "+".join(fingers) if fingers else "none"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the finger-state classifier on labelled recordings")
+    parser.add_argument("recordings", nargs="*", metavar="LABEL=PATH", help="Labelled binary landmark recordings")
+    parser.add_argument("--synthetic", type=int, default=None, metavar="FRAMES",
+                        help="Also train on FRAMES generated hands of every named state")
+    parser.add_argument("--tilt", type=float, default=90.0, help="Largest tilt of the generated hands in degrees")
+    parser.add_argument("--output", default="gestures.npz", help="Where to write the model weights")
+    parser.add_argument("--hand", choices=("any",) + HANDEDNESS_LABELS, default="any",
+                        help="Which hands of the recordings to use, left hands are mirrored")
+    parser.add_argument("--hidden", type=int, default=32, help="Hidden layer size, 0 for softmax regression")
+    parser.add_argument("--epochs", type=int, default=400)
+    parser.add_argument("--test-fraction", type=float, default=0.25, help="Share of frames held out for the report")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+    if not args.recordings and args.synthetic is None:
+        parser.error("give labelled recordings or --synthetic FRAMES")
+
+    all_points, all_left, all_states = [], [], []
+    if args.synthetic is not None:
+        points, left, states = synthetic_samples(args.synthetic, args.tilt, args.seed)
+        all_points.append(points)
+        all_left.append(left)
+        all_states.append(states)
+    for entry in args.recordings:
+        label, separator, path = entry.partition("=")
+        if not separator:
+            parser.error(f"{entry}: recordings are given as LABEL=PATH")
+        points, left = load_samples(path, args.hand)
+        all_points.append(points)
+        all_left.append(left)
+        all_states.append(np.full(len(points), parse_state(label), dtype=np.int64))
+    points = np.concatenate(all_points)
+    left = np.concatenate(all_left)
+    states = np.concatenate(all_states)
+    if len(points) == 0:
+        parser.error("The recordings hold no hands")
+
+    order = np.random.default_rng(args.seed).permutation(len(points))
+    held_out = int(len(points) * args.test_fraction)
+    test, train = order[:held_out], order[held_out:]
+
+    start = time.perf_counter()
+    classifier = train_classifier(landmark_features(points[train], left[train]), states[train],
+                                  hidden=args.hidden, epochs=args.epochs, seed=args.seed)
+    training_seconds = time.perf_counter() - start
+    classifier.save(args.output)
+    # Evaluate the saved weights, as the app loads them
+    classifier = GestureClassifier.load(args.output)
+    report = evaluate(classifier, points[test], left[test], states[test]) if held_out else {}
+    report.update(training_frames=len(train), training_seconds=training_seconds, output=args.output)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"trained on {len(train)} frames in {training_seconds:.1f}s, wrote {args.output}")
+    if not held_out:
+        return
+    print(f"held-out frames: {report['frames']}")
+    if args.synthetic is not None:
+        print("(generated hands: a pipeline check, not the accuracy on real hands)")
+    print(f"{'':>22}{'accuracy':>10}{'ms/frame':>10}")
+    print(f"{'rule-based':>22}{report['rule_accuracy']:10.3f}{report['rule_ms']:10.4f}")
+    print(f"{'classifier':>22}{report['classifier_accuracy']:10.3f}{report['classifier_ms']:10.4f}")
+    print(f"{'classifier, batched':>22}{'':>10}{report['classifier_batched_ms']:10.4f}")
+    for state, stats in report["states"].items():
+        print(f"  {state_name(state):<22} {stats['frames']:6d} frames, classifier {stats['classifier_accuracy']:.3f}, "
+              f"rule-based {stats['rule_accuracy']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
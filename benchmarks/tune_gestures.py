@@ -0,0 +1,101 @@
+"""Re-evaluate gesture settings offline on binary landmark recordings
+
+Every combination of the given settings is replayed through VirtualMouse and
+VirtualKeyboard without running MediaPipe, and the resulting event counts
+are reported per combination. The mouse gestures keep their own hold and
+release frame counts (see VirtualMouse.GESTURES) unless --hold-frames or
+--release-frames are given, and those app defaults ("app") are always one of
+the combinations tried.
+
+    python -m benchmarks.tune_gestures sessions/*.landmarks --pinch-threshold 0.04 0.05 0.06
+    python -m benchmarks.tune_gestures sessions/*.landmarks --hold-frames 1 2 3 --release-frames 1 2
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from cursor_filters import ExponentialFilter
+from landmark_recording import LandmarkRecording, replay_gestures
+from output_sinks import RecordingOutputSink
+from virtual_keyboard import VirtualKeyboard
+from virtual_mouse import VirtualMouse
+
+WINDOW_WIDTH = 1000
+WINDOW_HEIGHT = 400
+DEFAULT_FRAME_SIZE = (640, 480)
+
+
+def evaluate(sessions, settings):
+    """Replay every session with one combination of settings
+
+    sessions is a list of (frame_size, frames) where frames is a list of
+    (timestamp, results). Returns (event counts, frames replayed, seconds).
+    """
+    output = RecordingOutputSink()
+    frames_replayed = 0
+    start = time.perf_counter()
+    for frame_size, frames in sessions:
+        mouse = VirtualMouse(None, None, None, WINDOW_WIDTH, WINDOW_HEIGHT, output)
+        keyboard = VirtualKeyboard(None, None, None, WINDOW_WIDTH, WINDOW_HEIGHT, output)
+        mouse.cursor_filter = ExponentialFilter(smoothening=settings["smoothening"])
+        mouse.double_click_threshold = settings["double_click_threshold"]
+        keyboard.click_cooldown = settings["click_cooldown"]
+        keyboard.pinch_threshold = settings["pinch_threshold"]
+        for gesture in mouse.gestures.gestures:
+            changes = {name: settings[name] for name in ("hold_frames", "release_frames")
+                       if settings[name] is not None}
+            if changes:
+                mouse.gestures.configure(gesture.name, **changes)
+
+        camera_img = np.zeros((frame_size[1], frame_size[0], 3), dtype=np.uint8)
+        keyboard_img = np.zeros((WINDOW_HEIGHT, WINDOW_WIDTH, 3), dtype=np.uint8)
+        frames_replayed += replay_gestures(frames, mouse, keyboard, camera_img, keyboard_img)
+    return output.event_counts(), frames_replayed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune gesture settings on landmark recordings")
+    parser.add_argument("recordings", nargs="+", help="Binary landmark recording directories")
+    parser.add_argument("--click-cooldown", type=float, nargs="+", default=[0.2])
+    parser.add_argument("--double-click-threshold", type=float, nargs="+", default=[0.3])
+    parser.add_argument("--smoothening", type=float, nargs="+", default=[2])
+    parser.add_argument("--pinch-threshold", type=float, nargs="+", default=[0.05])
+    parser.add_argument("--hold-frames", type=int, nargs="+", default=None,
+                        help="Frames a mouse gesture must be seen before it turns on (default: each gesture's own)")
+    parser.add_argument("--release-frames", type=int, nargs="+", default=None,
+                        help="Frames a mouse gesture must be missed before it turns off (default: each gesture's own)")
+    args = parser.parse_args()
+
+    # Decode every recording once, then reuse it for all combinations
+    sessions = []
+    recorded_seconds = 0.0
+    for path in args.recordings:
+        recording = LandmarkRecording(path)
+        sessions.append((recording.frame_size or DEFAULT_FRAME_SIZE, list(recording)))
+        if len(recording) > 1:
+            recorded_seconds += float(recording.timestamps[-1] - recording.timestamps[0])
+
+    grid = {
+        "click_cooldown": args.click_cooldown,
+        "double_click_threshold": args.double_click_threshold,
+        "smoothening": args.smoothening,
+        "pinch_threshold": args.pinch_threshold,
+        # None keeps every gesture's own frame counts, the app's behaviour
+        "hold_frames": [None] + (args.hold_frames or []),
+        "release_frames": [None] + (args.release_frames or []),
+    }
+    for values in itertools.product(*grid.values()):
+        settings = dict(zip(grid.keys(), values))
+        counts, frames, seconds = evaluate(sessions, settings)
+        speedup = recorded_seconds / seconds if seconds > 0 else 0.0
+        print(", ".join(f"{name}={'app' if value is None else value}" for name, value in settings.items()))
+        print(f"  {frames} frames in {seconds:.2f}s ({speedup:.0f}x real time)")
+        for name, count in sorted(counts.items()):
+            if name != "move_to":
+                print(f"  {name:<16} {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Cursor smoothing filters
+
+Every filter works on a 2-vector (x, y) NumPy array, keeps O(1) state and is
+called as filter(position, timestamp). The timestamp (seconds) lets the
+filters adapt to the real frame interval; when it is None a frame interval
+of 1 / reference_fps is assumed.
+"""
+import math
+
+import numpy as np
+
+
+class ExponentialFilter:
+    """prev + (target - prev) / smoothening, scaled to the actual frame interval"""
+
+    def __init__(self, smoothening=2.0, reference_fps=30.0):
+        self.smoothening = smoothening
+        self.reference_fps = reference_fps
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.last_time = None
+
+    def __call__(self, position, timestamp=None):
+        position = np.asarray(position, dtype=np.float64)
+        if self.value is None:
+            self.value = position.copy()
+            self.last_time = timestamp
+            return self.value
+
+        alpha = 1.0 / self.smoothening
+        if timestamp is not None and self.last_time is not None:
+            # Same decay per second whatever the frame rate
+            frames = max(0.0, timestamp - self.last_time) * self.reference_fps
+            alpha = 1.0 - (1.0 - alpha) ** frames
+        self.last_time = timestamp
+        self.value += alpha * (position - self.value)
+        return self.value
+
+
+class OneEuroFilter:
+    """One Euro filter: low jitter when still, low lag when moving fast
+
+    min_cutoff (Hz) sets the smoothing at rest, beta how quickly the cutoff
+    rises with speed (in pixels per second).
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0, reference_fps=30.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reference_fps = reference_fps
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.derivative = np.zeros(2)
+        self.last_time = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, position, timestamp=None):
+        position = np.asarray(position, dtype=np.float64)
+        if self.value is None:
+            self.value = position.copy()
+            self.last_time = timestamp
+            return self.value
+
+        dt = 1.0 / self.reference_fps
+        if timestamp is not None and self.last_time is not None and timestamp > self.last_time:
+            dt = timestamp - self.last_time
+        self.last_time = timestamp
+
+        derivative = (position - self.value) / dt
+        self.derivative += self._alpha(self.d_cutoff, dt) * (derivative - self.derivative)
+
+        # Cutoff per axis, rising with speed
+        cutoff = self.min_cutoff + self.beta * np.abs(self.derivative)
+        tau = 1.0 / (2 * np.pi * cutoff)
+        alpha = 1.0 / (1.0 + tau / dt)
+        self.value += alpha * (position - self.value)
+        return self.value
+
+
+class KalmanFilter:
+    """Constant-velocity Kalman filter, run independently on x and y
+
+    process_noise is the acceleration variance (pixels^2 / s^4) and
+    measurement_noise the landmark jitter variance (pixels^2).
+    """
+
+    def __init__(self, process_noise=5e5, measurement_noise=25.0, reference_fps=30.0):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.reference_fps = reference_fps
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.velocity = np.zeros(2)
+        # Covariance entries per axis: [[p00, p01], [p01, p11]]
+        self.p00 = np.zeros(2)
+        self.p01 = np.zeros(2)
+        self.p11 = np.zeros(2)
+        self.last_time = None
+
+    def __call__(self, position, timestamp=None):
+        position = np.asarray(position, dtype=np.float64)
+        if self.value is None:
+            self.value = position.copy()
+            self.p00[:] = self.measurement_noise
+            self.p11[:] = self.measurement_noise * self.reference_fps ** 2
+            self.last_time = timestamp
+            return self.value
+
+        dt = 1.0 / self.reference_fps
+        if timestamp is not None and self.last_time is not None and timestamp > self.last_time:
+            dt = timestamp - self.last_time
+        self.last_time = timestamp
+
+        # Predict
+        self.value += self.velocity * dt
+        q = self.process_noise
+        p00 = self.p00 + dt * (2 * self.p01 + dt * self.p11) + q * dt ** 4 / 4
+        p01 = self.p01 + dt * self.p11 + q * dt ** 3 / 2
+        p11 = self.p11 + q * dt ** 2
+
+        # Update with the measured position
+        innovation = position - self.value
+        s = p00 + self.measurement_noise
+        k0 = p00 / s
+        k1 = p01 / s
+        self.value += k0 * innovation
+        self.velocity += k1 * innovation
+        self.p00 = (1 - k0) * p00
+        self.p01 = (1 - k0) * p01
+        self.p11 = p11 - k1 * p01
+        return self.value
+
+
+FILTERS = {
+    "exponential": ExponentialFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+
+def create_filter(name, **settings):
+    """Create a cursor filter by name (see FILTERS)"""
+    if name not in FILTERS:
+        raise ValueError(f"Unknown cursor filter: {name}")
+    return FILTERS[name](**settings)
@@ -0,0 +1,103 @@
+import bisect
+
+import numpy as np
+
+
+class CursorCalibration:
+    """Precomputed map from camera pixels to screen pixels
+
+    The active region of the camera frame (the frame minus frame_reduction
+    pixels on every side) is stretched over the whole virtual desktop, the
+    bounding box of every monitor. The mapping is an affine transform
+    computed once, so each frame costs a single multiply-add and a clip to
+    the last pixel of the desktop. When the monitors leave parts of the
+    bounding box uncovered (different heights, offset monitors), a point
+    landing there is moved to the nearest monitor.
+    """
+
+    def __init__(self, frame_size, topology, frame_reduction=50):
+        self.frame_size = tuple(frame_size)
+        self.topology = topology
+        self.frame_reduction = frame_reduction
+
+        x, y, width, height = topology.bounds
+        self.scale, self.offset = self._affine((frame_reduction, frame_reduction),
+                                               self._active_size(), (x, y), (width, height))
+        self.lower = np.array([x, y], dtype=np.float64)
+        self.upper = np.array([x + width - 1, y + height - 1], dtype=np.float64)
+        self._target = np.empty(2)
+        # Only layouts with dead corners need the per-monitor clamp
+        self._clamp_to_monitors = not topology.covers_bounds()
+
+    def _active_size(self):
+        frame = np.array(self.frame_size, dtype=np.float64)
+        return np.maximum(frame - 2 * self.frame_reduction, 1.0)
+
+    @staticmethod
+    def _affine(src_origin, src_size, dst_origin, dst_size):
+        """scale and offset mapping the src rectangle onto the dst rectangle"""
+        scale = np.asarray(dst_size, dtype=np.float64) / src_size
+        offset = np.asarray(dst_origin, dtype=np.float64) - np.asarray(src_origin, dtype=np.float64) * scale
+        return scale, offset
+
+    def matches(self, frame_size, topology, frame_reduction):
+        """Whether this calibration is still valid for the given frame and screens"""
+        return (self.frame_size == tuple(frame_size) and self.topology == topology
+                and self.frame_reduction == frame_reduction)
+
+    def apply(self, point):
+        """Map a camera pixel (x, y) to a screen position, clamped to the desktop
+
+        The returned array is reused by the next call.
+        """
+        target = self._target
+        np.multiply(point, self.scale, out=target)
+        np.add(target, self.offset, out=target)
+        np.minimum(target, self.upper, out=target)
+        np.maximum(target, self.lower, out=target)
+        if self._clamp_to_monitors:
+            x, y = target
+            if self.topology.monitor_at(x, y) is None:
+                target[0], target[1] = self.topology.clamp(x, y)
+        return target
+
+
+class ZonedCursorCalibration(CursorCalibration):
+    """Camera active region split into one zone per monitor
+
+    Monitors are ordered left to right and each gets a vertical strip of the
+    active region as wide as its share of the total monitor width. A strip
+    maps onto its whole monitor, so monitors of different sizes or heights
+    are fully reachable and the cursor never lands between them.
+    """
+
+    def __init__(self, frame_size, topology, frame_reduction=50):
+        super().__init__(frame_size, topology, frame_reduction)
+
+        monitors = sorted(topology.monitors, key=lambda m: (m.x, m.y))
+        active = self._active_size()
+        total_width = sum(m.width for m in monitors)
+
+        # Camera x where each zone ends, and the affine map of each zone
+        self.zone_edges = []
+        self.zones = []
+        left = float(frame_reduction)
+        for monitor in monitors:
+            zone_width = active[0] * monitor.width / total_width
+            scale, offset = self._affine((left, frame_reduction), (zone_width, active[1]),
+                                         (monitor.x, monitor.y), (monitor.width, monitor.height))
+            lower = np.array([monitor.x, monitor.y], dtype=np.float64)
+            upper = np.array([monitor.right - 1, monitor.bottom - 1], dtype=np.float64)
+            self.zones.append((scale, offset, lower, upper))
+            left += zone_width
+            self.zone_edges.append(left)
+
+    def apply(self, point):
+        zone = min(bisect.bisect_right(self.zone_edges, point[0]), len(self.zones) - 1)
+        scale, offset, lower, upper = self.zones[zone]
+        target = self._target
+        np.multiply(point, scale, out=target)
+        np.add(target, offset, out=target)
+        np.minimum(target, upper, out=target)
+        np.maximum(target, lower, out=target)
+        return target
@@ -0,0 +1,176 @@
+"""End-to-end latency of the OS events produced by gestures
+
+Every frame handed to the gesture handlers is stamped with the time it was
+captured (FramePacket.captured_at, taken when the camera read returned).
+When a handler sends an event, the capture time of the frame that caused it
+and the time of the call are kept with the event; once the event has really
+been passed to the OS (after the output thread, when one is used) a record
+(gesture, captured_at, detected_at, sent_at) goes into a bounded buffer.
+"""
+import csv
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Gesture type of each output sink call
+GESTURE_TYPES = {
+    "click": "left_click",
+    "double_click": "double_click",
+    "right_click": "right_click",
+    "mouse_down": "hold",
+    "mouse_up": "release",
+    "tap_key": "key_press",
+    "tap_special_key": "key_press",
+    "hotkey": "key_press",
+    "move_to": "move",
+    "scroll": "scroll",
+}
+
+
+class EventLatencyTracer:
+    """Bounded buffer of per-event latency records
+
+    Cursor moves are only traced with trace_moves, they would otherwise push
+    every discrete event out of the buffer.
+    """
+
+    def __init__(self, capacity=4096, trace_moves=False):
+        self.records = deque(maxlen=capacity)
+        self.trace_moves = trace_moves
+        self._frame = threading.local()
+
+    def begin_frame(self, captured_at):
+        """Stamp the events sent from this thread with the frame's capture time"""
+        self._frame.captured_at = captured_at
+
+    def context(self, name):
+        """Return the trace context of an event being sent now, or None"""
+        gesture = GESTURE_TYPES.get(name)
+        captured_at = getattr(self._frame, "captured_at", None)
+        if gesture is None or captured_at is None or (gesture == "move" and not self.trace_moves):
+            return None
+        return gesture, captured_at, time.perf_counter()
+
+    def record(self, context, sent_at=None):
+        """Keep the record of an event that has been passed to the OS"""
+        if context is None:
+            return
+        gesture, captured_at, detected_at = context
+        self.records.append((gesture, captured_at, detected_at, sent_at or time.perf_counter()))
+
+    def latencies(self):
+        """Return {gesture: (n, 3) array} of capture->detect, detect->sent and total ms"""
+        grouped = {}
+        for gesture, captured_at, detected_at, sent_at in list(self.records):
+            grouped.setdefault(gesture, []).append(
+                (detected_at - captured_at, sent_at - detected_at, sent_at - captured_at))
+        return {gesture: 1000 * np.array(rows) for gesture, rows in grouped.items()}
+
+    def summary(self, percents=(50, 95, 99)):
+        return summarize(self.latencies(), percents)
+
+    def summary_text(self):
+        return format_summary(self.summary())
+
+    def export_csv(self, path):
+        """Write the records as CSV (times in seconds), returns the record count"""
+        records = list(self.records)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["gesture", "captured_at", "detected_at", "sent_at"])
+            for gesture, captured_at, detected_at, sent_at in records:
+                writer.writerow([gesture, f"{captured_at:.6f}", f"{detected_at:.6f}", f"{sent_at:.6f}"])
+        return len(records)
+
+
+def load_latencies(path):
+    """Read an exported CSV into the same form as EventLatencyTracer.latencies"""
+    grouped = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            captured_at, detected_at, sent_at = (float(row[key]) for key in ("captured_at", "detected_at", "sent_at"))
+            grouped.setdefault(row["gesture"], []).append(
+                (detected_at - captured_at, sent_at - detected_at, sent_at - captured_at))
+    return {gesture: 1000 * np.array(rows) for gesture, rows in grouped.items()}
+
+
+def summarize(latencies, percents=(50, 95, 99)):
+    """Return {gesture: {"count", "total": {percent: ms}, "vision_p50", "output_p50"}}"""
+    report = {}
+    for gesture, values in sorted(latencies.items()):
+        report[gesture] = {
+            "count": len(values),
+            "total": dict(zip(percents, np.percentile(values[:, 2], percents).tolist())),
+            "max": float(values[:, 2].max()),
+            "vision_p50": float(np.median(values[:, 0])),
+            "output_p50": float(np.median(values[:, 1])),
+        }
+    return report
+
+
+def format_summary(report):
+    lines = []
+    for gesture, stats in report.items():
+        total = "  ".join(f"p{percent} {ms:7.2f}" for percent, ms in stats["total"].items())
+        lines.append(f"{gesture:<13} n={stats['count']:<5} {total}  max {stats['max']:7.2f}ms"
+                     f"  (capture->gesture {stats['vision_p50']:.2f}, gesture->OS {stats['output_p50']:.2f})")
+    return "\n".join(lines) if lines else "no events"
+
+
+class TracingOutputSink:
+    """Records the latency of every event sent to the wrapped sink
+
+    Use it around a sink called from the gesture thread. AsyncOutputSink
+    takes the tracer itself, so events are recorded once the output thread
+    has sent them.
+    """
+
+    def __init__(self, sink, tracer):
+        self.sink = sink
+        self.tracer = tracer
+
+    def _send(self, name, *args):
+        context = self.tracer.context(name)
+        getattr(self.sink, name)(*args)
+        self.tracer.record(context)
+
+    def screen_size(self):
+        return self.sink.screen_size()
+
+    def monitors(self):
+        return self.sink.monitors()
+
+    def move_to(self, x, y):
+        self._send("move_to", x, y)
+
+    def click(self):
+        self._send("click")
+
+    def double_click(self):
+        self._send("double_click")
+
+    def right_click(self):
+        self._send("right_click")
+
+    def mouse_down(self):
+        self._send("mouse_down")
+
+    def mouse_up(self):
+        self._send("mouse_up")
+
+    def scroll(self, dx, dy):
+        self._send("scroll", dx, dy)
+
+    def hotkey(self, *keys):
+        self._send("hotkey", *keys)
+
+    def tap_key(self, char):
+        self._send("tap_key", char)
+
+    def tap_special_key(self, name):
+        self._send("tap_special_key", name)
+
+    def close(self):
+        self.sink.close()
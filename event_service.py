@@ -0,0 +1,366 @@
+"""Publish gesture events to other processes over a Unix socket
+
+Every output sink call becomes one binary frame:
+
+    type (u8) | timestamp (f64, time.time()) | payload length (u16) | payload
+
+with a little-endian header of 11 bytes. The timestamp is when the vision
+loop queued the event, not when it was written to the socket. The payload
+of a cursor move is two float32 screen coordinates, a scroll two int32
+wheel clicks (x, y), key events carry UTF-8 text (hotkey names are joined
+with '+'), clicks have no payload.
+
+EventServer accepts any number of subscribers on the socket. Each one is fed
+through its own AsyncOutputSink, so a slow subscriber only holds up itself:
+its pending cursor moves are coalesced, and a subscriber that stops reading
+is disconnected once its socket buffer stays full for send_timeout seconds
+or its queue overflows. Subscribers that disconnect are removed. OS
+injection is just another subscriber of the BroadcastOutputSink.
+
+    python event_service.py /tmp/gestures.sock   # print the events of a running service
+"""
+import os
+import socket
+import stat
+import struct
+import sys
+import threading
+import time
+
+from output_sinks import AsyncOutputSink
+from screen_topology import Monitor
+
+HEADER = struct.Struct("<BdH")
+MOVE = struct.Struct("<ff")
+SCROLL = struct.Struct("<ii")
+
+# Frame type of each output sink call
+EVENT_TYPES = {
+    "move_to": 1,
+    "click": 2,
+    "double_click": 3,
+    "right_click": 4,
+    "mouse_down": 5,
+    "mouse_up": 6,
+    "tap_key": 7,
+    "tap_special_key": 8,
+    "hotkey": 9,
+    "scroll": 10,
+}
+EVENT_NAMES = {code: name for name, code in EVENT_TYPES.items()}
+
+
+def encode_event(name, args, timestamp=None):
+    """Encode one output sink call as a binary frame"""
+    if name == "move_to":
+        payload = MOVE.pack(*args)
+    elif name == "scroll":
+        payload = SCROLL.pack(*args)
+    elif name == "hotkey":
+        payload = "+".join(args).encode("utf-8")
+    elif args:
+        payload = args[0].encode("utf-8")
+    else:
+        payload = b""
+    return HEADER.pack(EVENT_TYPES[name], time.time() if timestamp is None else timestamp, len(payload)) + payload
+
+
+def decode_events(buffer):
+    """Decode the complete frames at the start of a bytearray
+
+    Returns a list of (timestamp, name, args) and removes the decoded bytes
+    from the buffer; an incomplete trailing frame is left in place.
+    """
+    events = []
+    offset = 0
+    while len(buffer) - offset >= HEADER.size:
+        code, timestamp, length = HEADER.unpack_from(buffer, offset)
+        end = offset + HEADER.size + length
+        if len(buffer) < end:
+            break
+        payload = bytes(buffer[offset + HEADER.size:end])
+        name = EVENT_NAMES[code]
+        if name == "move_to":
+            args = MOVE.unpack(payload)
+        elif name == "scroll":
+            args = SCROLL.unpack(payload)
+        elif name == "hotkey":
+            args = tuple(payload.decode("utf-8").split("+"))
+        elif payload:
+            args = (payload.decode("utf-8"),)
+        else:
+            args = ()
+        events.append((timestamp, name, args))
+        offset = end
+    del buffer[:offset]
+    return events
+
+
+class SocketEventSink:
+    """Output sink writing binary event frames to one subscriber connection
+
+    Sends give up after send_timeout seconds, so a subscriber that stops
+    reading stalls the output thread once, briefly, and is then closed.
+    """
+
+    def __init__(self, connection, send_timeout=0.05):
+        self.connection = connection
+        self.connection.settimeout(send_timeout)
+        self.closed = False
+
+    def send_at(self, timestamp, name, *args):
+        """Send one event stamped with timestamp, the current time when None"""
+        if self.closed:
+            return
+        try:
+            self.connection.sendall(encode_event(name, args, timestamp))
+        except OSError:
+            # The subscriber went away or its socket buffer stayed full (a
+            # timeout may have cut a frame short), BroadcastOutputSink drops it
+            self.closed = True
+
+    def _send(self, name, *args):
+        self.send_at(None, name, *args)
+
+    def move_to(self, x, y):
+        self._send("move_to", x, y)
+
+    def click(self):
+        self._send("click")
+
+    def double_click(self):
+        self._send("double_click")
+
+    def right_click(self):
+        self._send("right_click")
+
+    def mouse_down(self):
+        self._send("mouse_down")
+
+    def mouse_up(self):
+        self._send("mouse_up")
+
+    def scroll(self, dx, dy):
+        self._send("scroll", dx, dy)
+
+    def hotkey(self, *keys):
+        self._send("hotkey", *keys)
+
+    def tap_key(self, char):
+        self._send("tap_key", char)
+
+    def tap_special_key(self, name):
+        self._send("tap_special_key", name)
+
+    def close(self):
+        self.closed = True
+        self.connection.close()
+
+
+class BroadcastOutputSink:
+    """Output sink forwarding every event to a changing set of subscriber sinks
+
+    Subscribers are usually AsyncOutputSinks so none of them can stall the
+    vision loop. The screen geometry comes from geometry_sink when given (the
+    OS sink when events are also injected), otherwise from screen_size.
+    """
+
+    def __init__(self, geometry_sink=None, screen_size=(1920, 1080)):
+        self.geometry_sink = geometry_sink
+        self._screen_size = tuple(screen_size)
+        self._subscribers = []
+        # Subscribers removed as soon as their queue drops an event
+        self._drop_on_overflow = []
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def subscribe(self, sink, drop_on_overflow=False):
+        """Add a subscriber; with drop_on_overflow it is removed once its queue drops an event
+
+        Once the broadcast is closed the sink is closed instead and False is returned.
+        """
+        with self._lock:
+            if self.closed:
+                refused = True
+            else:
+                refused = False
+                self._subscribers = self._subscribers + [sink]
+                if drop_on_overflow:
+                    self._drop_on_overflow = self._drop_on_overflow + [sink]
+        if refused:
+            sink.close()
+        return not refused
+
+    def unsubscribe(self, sink, discard=False):
+        """Remove and close a subscriber, with discard its queued events are not sent"""
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not sink]
+            self._drop_on_overflow = [s for s in self._drop_on_overflow if s is not sink]
+        if discard:
+            # Closing waits for the output thread, which may be in a send that
+            # is timing out, so it is done off the publishing thread
+            threading.Thread(target=sink.close, kwargs={"discard": True}, name="unsubscribe", daemon=True).start()
+        else:
+            sink.close()
+
+    @property
+    def subscribers(self):
+        return list(self._subscribers)
+
+    def _publish(self, name, *args):
+        for sink in self._subscribers:
+            if getattr(sink, "closed", False):
+                self.unsubscribe(sink, discard=True)
+                continue
+            if getattr(sink, "dropped", 0) and any(s is sink for s in self._drop_on_overflow):
+                # The subscriber has missed events (maybe a mouse_up), better gone than wrong
+                self.unsubscribe(sink, discard=True)
+                continue
+            getattr(sink, name)(*args)
+
+    def screen_size(self):
+        if self.geometry_sink is not None:
+            return self.geometry_sink.screen_size()
+        return self._screen_size
+
+    def monitors(self):
+        if self.geometry_sink is not None:
+            return self.geometry_sink.monitors()
+        return [Monitor(0, 0, *self._screen_size)]
+
+    def move_to(self, x, y):
+        self._publish("move_to", x, y)
+
+    def click(self):
+        self._publish("click")
+
+    def double_click(self):
+        self._publish("double_click")
+
+    def right_click(self):
+        self._publish("right_click")
+
+    def mouse_down(self):
+        self._publish("mouse_down")
+
+    def mouse_up(self):
+        self._publish("mouse_up")
+
+    def scroll(self, dx, dy):
+        self._publish("scroll", dx, dy)
+
+    def hotkey(self, *keys):
+        self._publish("hotkey", *keys)
+
+    def tap_key(self, char):
+        self._publish("tap_key", char)
+
+    def tap_special_key(self, name):
+        self._publish("tap_special_key", name)
+
+    def close(self):
+        with self._lock:
+            # A subscriber accepted from now on would never be closed
+            self.closed = True
+        for sink in self.subscribers:
+            self.unsubscribe(sink)
+
+
+class EventServer:
+    """Accepts subscribers on a Unix socket and adds them to a BroadcastOutputSink"""
+
+    def __init__(self, path, broadcast, max_queue=256, send_timeout=0.05):
+        self.path = path
+        self.broadcast = broadcast
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self._closed = False
+        self._lock = threading.Lock()
+
+        try:
+            mode = os.stat(path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            # Only a stale socket of an earlier run is replaced
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(f"{path} exists and is not a socket")
+            os.unlink(path)
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.bind(path)
+        self.socket.listen()
+        self._thread = threading.Thread(target=self._accept, name="event-server", daemon=True)
+        self._thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self.socket.accept()
+            except OSError:
+                return  # server closed
+            with self._lock:
+                # close() may have run while accept() was returning
+                if self._closed:
+                    connection.close()
+                    return
+                sink = AsyncOutputSink(SocketEventSink(connection, self.send_timeout), self.max_queue)
+                self.broadcast.subscribe(sink, drop_on_overflow=True)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        try:
+            # Wakes the accept thread up
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.socket.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def start_service(path, inject=False, screen_size=(1920, 1080), max_queue=256):
+    """Create the broadcast sink and the server publishing it on path
+
+    With inject, events are also sent to the OS as one more subscriber, and
+    the cursor space is the real screen layout instead of screen_size.
+    """
+    geometry_sink = None
+    broadcast = BroadcastOutputSink(screen_size=screen_size)
+    if inject:
+        from output_sinks import OSOutputSink
+        geometry_sink = OSOutputSink()
+        broadcast.geometry_sink = geometry_sink
+        broadcast.subscribe(AsyncOutputSink(geometry_sink, max_queue))
+    return broadcast, EventServer(path, broadcast, max_queue)
+
+
+class EventSubscriber:
+    """Client side: connect to an EventServer and iterate over (timestamp, name, args)"""
+
+    def __init__(self, path):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(path)
+        self._buffer = bytearray()
+
+    def __iter__(self):
+        while True:
+            chunk = self.socket.recv(65536)
+            if not chunk:
+                return
+            self._buffer += chunk
+            yield from decode_events(self._buffer)
+
+    def close(self):
+        self.socket.close()
+
+
+if __name__ == "__main__":
+    subscriber = EventSubscriber(sys.argv[1] if len(sys.argv) > 1 else "/tmp/gestures.sock")
+    try:
+        for timestamp, name, args in subscriber:
+            print(f"{timestamp:.3f} {name} {' '.join(str(arg) for arg in args)}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        subscriber.close()
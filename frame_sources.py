@@ -0,0 +1,137 @@
+import os
+import time
+
+import cv2
+import numpy as np
+
+from landmark_recording import LandmarkRecording, is_landmark_recording
+from landmark_stream import read_landmark_stream
+
+
+class CameraSource:
+    """Live webcam frames"""
+
+    finite = False
+
+    def __init__(self, index=0, width=None, height=None):
+        self.cap = cv2.VideoCapture(index)
+        if width is not None:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height is not None:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        # Keep the driver from queueing stale frames
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self._timestamp = None
+
+    def read(self, image=None):
+        """Read the next frame, reusing image as the buffer when given"""
+        success, image = self.cap.read(image)
+        self._timestamp = time.time()
+        return success, image
+
+    def frame_timestamp(self):
+        """Wall clock time of the last frame"""
+        return self._timestamp
+
+    def frame_results(self):
+        """Camera frames have no precomputed hand results"""
+        return None
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource:
+    """Frames from a recorded (unmirrored) camera video
+
+    Timestamps are derived from the frame index and the video frame rate so
+    replays are deterministic. With realtime=True frames are paced at the
+    video frame rate instead of being read as fast as possible.
+    """
+
+    finite = True
+
+    def __init__(self, path, realtime=False):
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Cannot open video file: {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.realtime = realtime
+        self.frame_index = -1
+        self._started_at = None
+
+    def read(self, image=None):
+        success, image = self.cap.read(image)
+        if not success:
+            return False, None
+
+        self.frame_index += 1
+        if self.realtime:
+            if self._started_at is None:
+                self._started_at = time.perf_counter()
+            delay = self._started_at + self.frame_index / self.fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return True, image
+
+    def frame_timestamp(self):
+        return self.frame_index / self.fps
+
+    def frame_results(self):
+        return None
+
+    def release(self):
+        self.cap.release()
+
+
+class LandmarkStreamSource:
+    """Replays a serialized landmark stream without running hand detection
+
+    Accepts a JSON lines stream or a binary landmark recording. Frames are
+    blank images (of the recorded camera size when known), and the recorded
+    hand results are attached to each frame so the inference stage is skipped.
+    """
+
+    finite = True
+
+    def __init__(self, path, width, height):
+        if is_landmark_recording(path):
+            recording = LandmarkRecording(path)
+            if recording.frame_size is not None:
+                width, height = recording.frame_size
+            frames = iter(recording)
+        else:
+            frames = read_landmark_stream(path)
+        self.width = width
+        self.height = height
+        self._frames = iter(frames)
+        self._timestamp = None
+        self._results = None
+
+    def read(self, image=None):
+        try:
+            self._timestamp, self._results = next(self._frames)
+        except StopIteration:
+            return False, None
+        if image is None or image.shape != (self.height, self.width, 3):
+            return True, np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        image.fill(0)
+        return True, image
+
+    def frame_timestamp(self):
+        return self._timestamp
+
+    def frame_results(self):
+        return self._results
+
+    def release(self):
+        self._frames = iter(())
+
+
+def open_source(spec, width, height, realtime=False):
+    """Open a frame source from a camera index, a video file or a landmark stream"""
+    if spec is None or str(spec).isdigit():
+        return CameraSource(int(spec or 0), width, height)
+    if os.path.splitext(str(spec))[1].lower() == ".jsonl" or is_landmark_recording(spec):
+        return LandmarkStreamSource(spec, width, height)
+    return VideoFileSource(spec, realtime=realtime)
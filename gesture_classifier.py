@@ -0,0 +1,177 @@
+"""Learned finger states from normalized hand landmarks
+
+LandmarkArray.finger_state compares raw image coordinates (the thumb tip
+right of its IP joint, the other tips above their PIP joints), so it breaks
+as soon as the hand is tilted or turned. GestureClassifier predicts the same
+finger-state bitmask (see landmark_array.FINGER_BITS) from landmarks that are
+moved to the wrist, scaled by the palm length and rotated so the palm points
+up, with a tiny NumPy network: softmax regression, or one hidden ReLU layer.
+
+Models are trained offline on labelled landmark recordings with
+benchmarks.train_gesture_classifier and saved as a .npz file of a few
+kilobytes.
+"""
+import math
+
+import numpy as np
+
+from landmark_array import NUM_LANDMARKS, WRIST
+
+MIDDLE_MCP = 9
+NUM_FEATURES = NUM_LANDMARKS * 3
+
+
+def landmark_features(points, left=None):
+    """Normalized features of (hands, 21, 3) landmarks as a (hands, 63) float32 array
+
+    left optionally flags the hands to mirror, so a left hand looks like a
+    right one.
+    """
+    points = np.asarray(points, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+    centered = points - points[:, WRIST:WRIST + 1]
+    palm = centered[:, MIDDLE_MCP, :2]
+    length = np.maximum(np.hypot(palm[:, 0], palm[:, 1]), 1e-6)[:, None]
+    ux = palm[:, :1] / length
+    uy = palm[:, 1:] / length
+
+    # Rotate the wrist to middle knuckle direction onto (0, -1), straight up
+    x = centered[..., 0]
+    y = centered[..., 1]
+    features = np.empty_like(centered)
+    features[..., 0] = (x * -uy + y * ux) / length
+    features[..., 1] = (x * -ux - y * uy) / length
+    features[..., 2] = centered[..., 2] / length
+    if left is not None:
+        features[np.asarray(left, dtype=bool), :, 0] *= -1
+    return features.reshape(len(points), NUM_FEATURES)
+
+
+class GestureClassifier:
+    """Finger-state classifier, a drop-in for LandmarkArray.finger_state
+
+    states lists the finger-state bitmask of every output class. mean and
+    scale standardize the features; they are folded into the first layer
+    so inference is the layers' matrix products only. layers is a list of
+    (weights, bias) pairs with ReLU between them.
+    """
+
+    def __init__(self, states, mean, scale, layers):
+        self.states = np.asarray(states, dtype=np.int64)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.layers = [(np.asarray(w, dtype=np.float32), np.asarray(b, dtype=np.float32)) for w, b in layers]
+
+        first_w, first_b = self.layers[0]
+        folded_w = first_w / self.scale[:, None]
+        self._layers = [(folded_w, first_b - self.mean @ folded_w)] + self.layers[1:]
+
+        # Single-hand buffers: the normalization is one (21, 3) @ (3, 3) product
+        self._centered = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        self._features = np.zeros((1, NUM_FEATURES), dtype=np.float32)
+        self._rotation = np.zeros((3, 3), dtype=np.float32)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            count = int(data["layer_count"])
+            layers = [(data[f"w{i}"], data[f"b{i}"]) for i in range(count)]
+            return cls(data["states"], data["mean"], data["scale"], layers)
+
+    def save(self, path):
+        weights = {}
+        for i, (w, b) in enumerate(self.layers):
+            weights[f"w{i}"] = w
+            weights[f"b{i}"] = b
+        np.savez_compressed(path, states=self.states, mean=self.mean, scale=self.scale,
+                            layer_count=len(self.layers), **weights)
+
+    def scores(self, features):
+        """Class scores (logits) of a (hands, 63) feature array"""
+        out = features
+        last = len(self._layers) - 1
+        for i, (w, b) in enumerate(self._layers):
+            out = out @ w
+            out += b
+            if i < last:
+                np.maximum(out, 0, out=out)
+        return out
+
+    def predict(self, points, left=None):
+        """Finger-state bitmasks of (hands, 21, 3) landmarks, batched"""
+        return self.states[self.scores(landmark_features(points, left)).argmax(axis=1)]
+
+    def finger_state(self, hand, left=False):
+        """Finger-state bitmask of one filled LandmarkArray, same as predict on one hand"""
+        centered = self._centered
+        np.subtract(hand.points, hand.points[WRIST], out=centered)
+        x = centered.item(MIDDLE_MCP, 0)
+        y = centered.item(MIDDLE_MCP, 1)
+        length = max(math.hypot(x, y), 1e-6)
+        # Unit palm direction, divided once more by the palm length to scale
+        ux = x / length / length
+        uy = y / length / length
+        mirror = -1.0 if left else 1.0
+
+        rotation = self._rotation
+        rotation[0, 0] = -uy * mirror
+        rotation[1, 0] = ux * mirror
+        rotation[0, 1] = -ux
+        rotation[1, 1] = -uy
+        rotation[2, 2] = 1.0 / length
+        np.matmul(centered, rotation, out=self._features.reshape(NUM_LANDMARKS, 3))
+        return int(self.states[self.scores(self._features).argmax()])
+
+
+def train_classifier(features, states, hidden=32, epochs=400, learning_rate=0.01, l2=1e-4, seed=0):
+    """Fit a GestureClassifier on (samples, 63) features and their finger states
+
+    Full-batch Adam on the softmax cross-entropy; hidden=0 trains plain
+    softmax regression.
+    """
+    rng = np.random.default_rng(seed)
+    features = np.asarray(features, dtype=np.float64)
+    classes, targets = np.unique(states, return_inverse=True)
+    mean = features.mean(axis=0)
+    scale = features.std(axis=0) + 1e-6
+    x = (features - mean) / scale
+    onehot = np.eye(len(classes))[targets]
+
+    sizes = [x.shape[1]] + ([hidden] if hidden else []) + [len(classes)]
+    params = []
+    for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+        params.append(rng.normal(0, np.sqrt(2.0 / fan_in), (fan_in, fan_out)))
+        params.append(np.zeros(fan_out))
+    moments = [np.zeros_like(p) for p in params]
+    velocities = [np.zeros_like(p) for p in params]
+
+    for step in range(1, epochs + 1):
+        # Forward pass, keeping every layer's input for the backward pass
+        inputs = [x]
+        out = x
+        for i in range(0, len(params), 2):
+            out = out @ params[i] + params[i + 1]
+            if i + 2 < len(params):
+                out = np.maximum(out, 0)
+                inputs.append(out)
+        out -= out.max(axis=1, keepdims=True)
+        probabilities = np.exp(out)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+        grad = (probabilities - onehot) / len(x)
+        grads = [None] * len(params)
+        for i in range(len(params) - 2, -1, -2):
+            layer_input = inputs[i // 2]
+            grads[i] = layer_input.T @ grad + l2 * params[i]
+            grads[i + 1] = grad.sum(axis=0)
+            if i > 0:
+                grad = (grad @ params[i].T) * (layer_input > 0)
+
+        for p, g, m, v in zip(params, grads, moments, velocities):
+            m *= 0.9
+            m += 0.1 * g
+            v *= 0.999
+            v += 0.001 * g * g
+            p -= learning_rate * (m / (1 - 0.9 ** step)) / (np.sqrt(v / (1 - 0.999 ** step)) + 1e-8)
+
+    layers = [(params[i], params[i + 1]) for i in range(0, len(params), 2)]
+    return GestureClassifier(classes, mean, scale, layers)
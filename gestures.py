@@ -0,0 +1,115 @@
+"""Declarative gesture recognition with hold and release hysteresis
+
+A gesture is data: the finger states it needs (a bit pattern under a mask,
+see landmark_array.FINGER_BITS), optionally a landmark distance that must
+fall below a threshold, and how many frames it must be seen before it turns
+on (hold_frames) and missed before it turns off (release_frames). A
+distance gesture also turns off only once the distance grows past
+release_threshold.
+
+GestureRecognizer looks the frame's finger state up in a table built once
+from all patterns, so adding gestures adds table entries, not per-frame
+branches.
+"""
+from landmark_array import FINGER_BITS
+
+ALL_FINGERS = sum(FINGER_BITS.values())
+FINGER_STATES = ALL_FINGERS + 1
+
+
+class Gesture:
+    """One gesture definition
+
+    The finger state matches when state & mask == pattern; mask 0 accepts
+    any finger state. distance is an optional (landmark, landmark) pair.
+    """
+
+    def __init__(self, name, pattern=0, mask=ALL_FINGERS, distance=None, threshold=None, release_threshold=None,
+                 hold_frames=1, release_frames=1):
+        self.name = name
+        self.pattern = pattern
+        self.mask = mask
+        self.distance = distance
+        self.threshold = threshold
+        self.release_threshold = release_threshold if release_threshold is not None else threshold
+        self.hold_frames = hold_frames
+        self.release_frames = release_frames
+
+    def copy(self, **changes):
+        settings = dict(vars(self), **changes)
+        return Gesture(**settings)
+
+
+class GestureRecognizer:
+    """Runs a set of gestures on one hand, frame by frame
+
+    update(hand) takes a filled LandmarkArray and returns the set of
+    active gesture names; started and ended hold the names that turned on
+    and off on that frame.
+    """
+
+    def __init__(self, gestures):
+        self.gestures = [gesture.copy() for gesture in gestures]
+        self._build()
+        self.reset(block=False)
+
+    def _build(self):
+        # table[finger_state] lists the gestures whose bit pattern matches
+        self.table = [
+            tuple(i for i, g in enumerate(self.gestures) if state & g.mask == g.pattern)
+            for state in range(FINGER_STATES)
+        ]
+        self.by_name = {gesture.name: i for i, gesture in enumerate(self.gestures)}
+
+    def reset(self, block=True):
+        """Turn every gesture off
+
+        With block, a gesture that is being made when reset only turns on
+        after it has been released once (used when another hand takes over).
+        """
+        count = len(self.gestures)
+        self.on = [False] * count
+        self.frames = [0] * count  # consecutive frames matched while off, missed while on
+        self.blocked = [block] * count
+        self.active = set()
+        self.started = set()
+        self.ended = set()
+
+    def configure(self, name, **changes):
+        """Change a gesture's settings, e.g. configure("pinch", threshold=0.04)"""
+        i = self.by_name[name]
+        self.gestures[i] = self.gestures[i].copy(**changes)
+        self._build()
+
+    def setting(self, name, field):
+        return getattr(self.gestures[self.by_name[name]], field)
+
+    def update(self, hand, finger_state=None):
+        if finger_state is None:
+            finger_state = hand.finger_state()
+        matching = self.table[finger_state]
+        started = set()
+        ended = set()
+        for i, gesture in enumerate(self.gestures):
+            matched = i in matching
+            if matched and gesture.distance is not None:
+                # Hysteresis: an active gesture holds until the looser release threshold
+                limit = gesture.release_threshold if self.on[i] else gesture.threshold
+                matched = hand.distance(*gesture.distance) < limit
+
+            if self.blocked[i]:
+                self.blocked[i] = matched
+                continue
+            if matched != self.on[i]:
+                self.frames[i] += 1
+                if self.frames[i] >= (gesture.release_frames if self.on[i] else gesture.hold_frames):
+                    self.on[i] = matched
+                    self.frames[i] = 0
+                    (started if matched else ended).add(gesture.name)
+            else:
+                self.frames[i] = 0
+
+        self.started = started
+        self.ended = ended
+        self.active = {gesture.name for i, gesture in enumerate(self.gestures) if self.on[i]}
+        return self.active
@@ -0,0 +1,139 @@
+"""Stable hand identities across frames
+
+MediaPipe labels every hand as Left or Right on each frame on its own, and
+the label sometimes flips for a frame. HandIdentityTracker follows the hands
+by their palm centroid instead, keeps a persistent id for each, and decides
+its handedness by a score-weighted vote over the last detected frames
+(frames predicted by inference_scheduler do not vote). The role of a
+hand (which of mouse and keyboard it drives) follows the voted handedness,
+so a single flipped label no longer swaps the two.
+"""
+import math
+from collections import deque
+
+from landmark_array import hand_points
+
+MOUSE = "mouse"
+KEYBOARD = "keyboard"
+# Role of each handedness, as before: the right hand drives the mouse
+ROLES = {"Right": MOUSE, "Left": KEYBOARD}
+
+# Wrist and the four finger bases, their mean is the palm centroid
+PALM = [0, 5, 9, 13, 17]
+
+
+class TrackedHand:
+    """One hand followed across frames"""
+
+    def __init__(self, hand_id, centroid, vote_window):
+        self.id = hand_id
+        self.centroid = centroid
+        self.votes = deque(maxlen=vote_window)
+        self.label = None
+        self.role = None
+        self.index = None  # position in the current frame's results, None while missing
+        self.missing = 0
+        self.frames = 0
+
+    def vote(self, label, score):
+        """Add this frame's handedness and return the label with the highest total score"""
+        self.votes.append((label, score))
+        totals = {}
+        for voted, weight in self.votes:
+            totals[voted] = totals.get(voted, 0.0) + weight
+        self.label = max(totals, key=totals.get)
+        return self.label
+
+
+class HandIdentityTracker:
+    """Associates detected hands with tracks by nearest palm centroid
+
+    A detection joins the nearest track within max_distance (normalized
+    image units); the rest start new tracks with fresh ids. Tracks not seen
+    for more than max_missing frames are dropped. update() returns the
+    present hands by role.
+    """
+
+    def __init__(self, max_distance=0.2, vote_window=15, max_missing=5, roles=None):
+        self.max_distance = max_distance
+        self.vote_window = vote_window
+        self.max_missing = max_missing
+        self.roles = roles if roles is not None else ROLES
+
+        self.tracks = []
+        self.next_id = 1
+        # Roles of the hands present in the last frame
+        self.by_role = {}
+
+    def reset(self):
+        self.tracks = []
+        self.by_role = {}
+
+    def update(self, results):
+        """Match this frame's hands to the tracks, returns {role: TrackedHand}"""
+        # Extrapolated hands repeat the last detection, they are no new evidence
+        predicted = getattr(results, "predicted", False)
+        detections = []
+        if results.multi_hand_landmarks:
+            for index, (hand, handedness) in enumerate(zip(results.multi_hand_landmarks, results.multi_handedness)):
+                points = hand_points(hand)
+                centroid = (float(points[PALM, 0].mean()), float(points[PALM, 1].mean()))
+                category = handedness.classification[0]
+                detections.append((index, centroid, category.label, float(category.score)))
+
+        # Greedy nearest neighbour on all track/detection pairs, closest first
+        pairs = sorted(
+            (math.hypot(centroid[0] - track.centroid[0], centroid[1] - track.centroid[1]), t, d)
+            for t, track in enumerate(self.tracks)
+            for d, (_, centroid, _, _) in enumerate(detections)
+        )
+        matched_tracks = set()
+        matched_detections = {}
+        for distance, t, d in pairs:
+            if distance > self.max_distance:
+                break
+            if t in matched_tracks or d in matched_detections:
+                continue
+            matched_tracks.add(t)
+            matched_detections[d] = self.tracks[t]
+
+        for track in self.tracks:
+            track.index = None
+        for d, (index, centroid, label, score) in enumerate(detections):
+            track = matched_detections.get(d)
+            if track is None:
+                track = TrackedHand(self.next_id, centroid, self.vote_window)
+                self.next_id += 1
+                self.tracks.append(track)
+            track.centroid = centroid
+            track.index = index
+            track.missing = 0
+            track.frames += 1
+            if not predicted or track.label is None:
+                track.vote(label, score)
+
+        kept = []
+        for track in self.tracks:
+            if track.index is None:
+                track.missing += 1
+                if track.missing > self.max_missing:
+                    continue
+            kept.append(track)
+        self.tracks = kept
+
+        self.by_role = self._assign_roles([track for track in self.tracks if track.index is not None])
+        return self.by_role
+
+    def _assign_roles(self, present):
+        """Give each present hand the role of its voted handedness, older tracks first"""
+        by_role = {}
+        for track in sorted(present, key=lambda track: track.id):
+            role = self.roles.get(track.label)
+            if role in by_role:
+                # Both hands voted the same way, the newer one takes the free role
+                free = [r for r in self.roles.values() if r not in by_role]
+                role = free[0] if free else None
+            track.role = role
+            if role is not None:
+                by_role[role] = track
+        return by_role
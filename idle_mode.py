@@ -0,0 +1,141 @@
+"""Low-power detection while nobody is in front of the camera"""
+import cv2
+
+from landmark_stream import ReplayResults
+
+ACTIVE = "active"
+IDLE = "idle"
+
+
+class IdleController:
+    """Idle state machine gating hand detection
+
+    While ACTIVE every frame goes through full-resolution detection. Once no
+    hand has been seen for idle_after seconds the controller turns IDLE:
+    frames are only taken every probe_interval seconds, and one of them only
+    runs through detection (downscaled to probe_size on its longer side)
+    when a small grayscale thumbnail of it differs from the previously
+    checked one in more than motion_fraction of its pixels. The first probe
+    that finds a hand switches back to ACTIVE.
+    """
+
+    def __init__(self, idle_after=10.0, probe_interval=0.25, probe_size=320, motion_size=(64, 48),
+                 motion_pixel_threshold=16, motion_fraction=0.01):
+        self.idle_after = idle_after
+        self.probe_interval = probe_interval
+        self.probe_size = probe_size
+        self.motion_size = motion_size
+        self.motion_pixel_threshold = motion_pixel_threshold  # gray level change that counts as motion
+        self.motion_fraction = motion_fraction  # share of changed thumbnail pixels that wakes a probe
+
+        self.state = ACTIVE
+        self.last_hand_time = None
+        self.last_time = None
+        self.state_since = None
+
+        # Motion check buffers, allocated on the first idle frame
+        self._thumbnail = None
+        self._previous = None
+        self._gray = None
+        self._diff = None
+        self._probe_img = None
+        self._probe_rgb = None
+
+        # Counters and time spent in each state
+        self.idle_frames = 0
+        self.probes = 0
+        self.wakeups = 0
+        self.seconds = {ACTIVE: 0.0, IDLE: 0.0}
+
+    @property
+    def idle(self):
+        return self.state == IDLE
+
+    def frame_interval(self):
+        """Minimum time between two captured frames in the current state"""
+        return self.probe_interval if self.state == IDLE else 0.0
+
+    def _switch(self, state, timestamp):
+        if self.state_since is not None:
+            self.seconds[self.state] += timestamp - self.state_since
+        self.state = state
+        self.state_since = timestamp
+        self._previous = None
+
+    def observe(self, results, timestamp):
+        """Track when hands were last seen from full-rate detection results"""
+        self.last_time = timestamp
+        if self.state_since is None:
+            self.state_since = timestamp
+        if results.multi_hand_landmarks or self.last_hand_time is None:
+            self.last_hand_time = timestamp
+        elif timestamp - self.last_hand_time >= self.idle_after:
+            self._switch(IDLE, timestamp)
+
+    def motion(self, image):
+        """Whether a mirrored BGR frame moved since the previously checked one"""
+        if self._thumbnail is None:
+            self._thumbnail = cv2.resize(image, self.motion_size, interpolation=cv2.INTER_AREA)
+            self._gray = cv2.cvtColor(self._thumbnail, cv2.COLOR_BGR2GRAY)
+        else:
+            cv2.resize(image, self.motion_size, dst=self._thumbnail, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(self._thumbnail, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        if self._previous is None:
+            # Nothing to compare with yet: the first idle frame is always probed
+            self._previous = self._gray.copy()
+            self._diff = self._gray.copy()
+            return True
+        cv2.absdiff(self._gray, self._previous, dst=self._diff)
+        self._gray, self._previous = self._previous, self._gray
+        cv2.threshold(self._diff, self.motion_pixel_threshold, 255, cv2.THRESH_BINARY, dst=self._diff)
+        return cv2.countNonZero(self._diff) > self.motion_fraction * self._diff.size
+
+    def probe(self, hands, image, timestamp):
+        """Idle detection on a mirrored BGR frame, returns its results
+
+        Frames without motion are not inferred and report no hands.
+        """
+        self.idle_frames += 1
+        self.last_time = timestamp
+        if not self.motion(image):
+            return ReplayResults()
+
+        self.probes += 1
+        h, w = image.shape[:2]
+        scale = min(1.0, self.probe_size / max(w, h))
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        if self._probe_img is None or self._probe_img.shape[:2] != (size[1], size[0]):
+            self._probe_img = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+            self._probe_rgb = cv2.cvtColor(self._probe_img, cv2.COLOR_BGR2RGB)
+        else:
+            cv2.resize(image, size, dst=self._probe_img, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(self._probe_img, cv2.COLOR_BGR2RGB, dst=self._probe_rgb)
+
+        # Landmarks are normalized, so the probe's results hold for the full frame
+        results = hands.process(self._probe_rgb)
+        if results.multi_hand_landmarks:
+            self.wakeups += 1
+            self.last_hand_time = timestamp
+            self._switch(ACTIVE, timestamp)
+        return results
+
+    def stats(self, timestamp=None):
+        """Counters and seconds per state up to timestamp (default: the last frame seen)"""
+        timestamp = self.last_time if timestamp is None else timestamp
+        seconds = dict(self.seconds)
+        if timestamp is not None and self.state_since is not None:
+            seconds[self.state] += timestamp - self.state_since
+        return {
+            "state": self.state,
+            "active_seconds": seconds[ACTIVE],
+            "idle_seconds": seconds[IDLE],
+            "idle_frames": self.idle_frames,
+            "probes": self.probes,
+            "wakeups": self.wakeups,
+        }
+
+    def summary_text(self, timestamp=None):
+        stats = self.stats(timestamp)
+        return (f"{stats['state']} | active {stats['active_seconds']:.0f}s, idle {stats['idle_seconds']:.0f}s | "
+                f"{stats['probes']} probes in {stats['idle_frames']} idle frames, {stats['wakeups']} wakeups")
@@ -0,0 +1,98 @@
+import math
+
+import numpy as np
+
+from landmark_array import hand_points
+from landmark_stream import ReplayHandLandmarks, ReplayHandedness, ReplayResults
+
+
+class AdaptiveInferenceScheduler:
+    """Runs hand detection on every Nth frame and extrapolates in between
+
+    N follows the measured inference time: when one inference takes longer
+    than the frame budget (1 / target_fps), only every ceil(time / budget)th
+    frame is inferred. Landmarks for the other frames are predicted with a
+    constant-velocity model from the last two inferred frames, and the
+    predicted results are flagged so gestures only fire on inferred frames.
+    They carry the handedness scores of the last inference, and
+    HandIdentityTracker does not count them as handedness votes.
+    """
+
+    def __init__(self, target_fps=30.0, max_skip=4, smoothing=0.2):
+        self.frame_budget = 1.0 / target_fps
+        self.max_skip = max_skip
+        self.smoothing = smoothing  # weight of the newest sample in the inference time average
+
+        self.inference_time = None
+        self.interval = 1
+        self.frames_since_inference = 0
+
+        # Last two inferred frames: timestamps, (hands, 21, 3) landmarks and handedness
+        self.last_time = None
+        self.last_points = None
+        self.last_handedness = None
+        self.last_scores = None
+        self.velocity = None
+
+        # Counters
+        self.inferred_frames = 0
+        self.predicted_frames = 0
+
+    def should_infer(self):
+        """Whether the current frame has to go through hand detection"""
+        return self.last_time is None or self.frames_since_inference + 1 >= self.interval
+
+    def observe(self, results, timestamp, elapsed):
+        """Record the results and duration of an inference"""
+        self.inferred_frames += 1
+        self.frames_since_inference = 0
+
+        if self.inference_time is None:
+            self.inference_time = elapsed
+        else:
+            self.inference_time += self.smoothing * (elapsed - self.inference_time)
+        self.interval = max(1, min(self.max_skip, math.ceil(self.inference_time / self.frame_budget)))
+
+        if not results.multi_hand_landmarks:
+            self.last_time = timestamp
+            self.last_points = None
+            self.last_handedness = None
+            self.last_scores = None
+            self.velocity = None
+            return
+
+        points = np.stack([hand_points(hand) for hand in results.multi_hand_landmarks])
+        handedness = [h.classification[0].label for h in results.multi_handedness]
+        scores = [float(h.classification[0].score) for h in results.multi_handedness]
+
+        # Velocity only when the same hands were seen in the previous inference
+        self.velocity = None
+        if (self.last_points is not None and handedness == self.last_handedness
+                and timestamp > self.last_time):
+            self.velocity = (points - self.last_points) / (timestamp - self.last_time)
+
+        self.last_time = timestamp
+        self.last_points = points
+        self.last_handedness = handedness
+        self.last_scores = scores
+
+    def predict(self, timestamp):
+        """Extrapolate the last inferred landmarks to the given time"""
+        self.predicted_frames += 1
+        self.frames_since_inference += 1
+
+        if self.last_points is None:
+            return ReplayResults(predicted=True)
+
+        points = self.last_points
+        if self.velocity is not None:
+            points = points + self.velocity * (timestamp - self.last_time)
+        return ReplayResults(
+            [ReplayHandLandmarks(hand) for hand in points],
+            [ReplayHandedness(label, score) for label, score in zip(self.last_handedness, self.last_scores)],
+            predicted=True,
+        )
+
+    def summary_text(self):
+        return (f"inference every {self.interval} frame(s) | "
+                f"{self.inferred_frames} inferred, {self.predicted_frames} predicted")
@@ -0,0 +1,66 @@
+from bisect import bisect_left
+
+
+class KeyRect:
+    """Position and size of one key on the keyboard image"""
+
+    __slots__ = ("key", "x", "y", "width", "height")
+
+    def __init__(self, key, x, y, width, height):
+        self.key = key
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+
+class CompiledLayout:
+    """Key rectangles of one layout, shared by drawing and hit-testing
+
+    Rows are stored as y bands and every row keeps its key left edges sorted,
+    so finding the key under a point is two bisects: O(log rows + log keys).
+    """
+
+    def __init__(self, rows, start_x, start_y, key_width, button_height, button_margin):
+        self.rects = []
+        self._row_tops = []
+        self._row_bottoms = []
+        self._row_lefts = []
+        self._row_rights = []
+        self._row_rects = []
+
+        current_y = start_y
+        for row in rows:
+            current_x = start_x
+            row_rects = []
+            for key in row:
+                width = key_width(key)
+                row_rects.append(KeyRect(key, current_x, current_y, width, button_height))
+                current_x += width + button_margin
+
+            self.rects.extend(row_rects)
+            self._row_tops.append(current_y)
+            self._row_bottoms.append(current_y + button_height)
+            self._row_lefts.append([rect.x for rect in row_rects])
+            self._row_rights.append([rect.x + rect.width for rect in row_rects])
+            self._row_rects.append(row_rects)
+            current_y += button_height + button_margin
+
+    def hit_test(self, x, y):
+        """Return the KeyRect strictly containing the point, or None"""
+        # Last row starting above y, then last key starting left of x
+        row = bisect_left(self._row_tops, y) - 1
+        if row < 0 or y >= self._row_bottoms[row]:
+            return None
+        col = bisect_left(self._row_lefts[row], x) - 1
+        if col < 0 or x >= self._row_rights[row][col]:
+            return None
+        return self._row_rects[row][col]
+
+
+def compile_layouts(keys, key_width, start_x, start_y, button_height, button_margin):
+    """Compile every named layout (normal/shift/ctrl) once"""
+    return {
+        name: CompiledLayout(rows, start_x, start_y, key_width, button_height, button_margin)
+        for name, rows in keys.items()
+    }
@@ -0,0 +1,120 @@
+import math
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+# MediaPipe hand landmark indices
+WRIST = 0
+THUMB_IP = 3
+THUMB_TIP = 4
+INDEX_PIP = 6
+INDEX_TIP = 8
+MIDDLE_PIP = 10
+MIDDLE_TIP = 12
+RING_PIP = 14
+RING_TIP = 16
+
+# Fingers used by the gestures, in bit order: thumb, index, middle, ring
+FINGER_TIPS = np.array([THUMB_TIP, INDEX_TIP, MIDDLE_TIP, RING_TIP])
+_FINGER_TIPS_XY = np.stack([FINGER_TIPS * 3, FINGER_TIPS * 3 + 1], axis=1).reshape(-1)
+FINGER_BITS = {'thumb': 1, 'index': 2, 'middle': 4, 'ring': 8}
+# Bit of each finger in FINGER_TIPS order, the finger state is the dot product
+# of the up/down states with it (float32, so np.dot is a plain BLAS call)
+_FINGER_WEIGHTS = np.array(list(FINGER_BITS.values()), dtype=np.float32)
+
+# Finger up tests as flat (landmark * 3 + axis) indices, a finger is up when
+# flat[_UP_LOWER[i]] < flat[_UP_UPPER[i]]. The thumb compares x (tip to the
+# right of the IP joint), the others compare y (tip above the PIP joint).
+_UP_LOWER = np.array([THUMB_IP * 3, INDEX_TIP * 3 + 1, MIDDLE_TIP * 3 + 1, RING_TIP * 3 + 1])
+_UP_UPPER = np.array([THUMB_TIP * 3, INDEX_PIP * 3 + 1, MIDDLE_PIP * 3 + 1, RING_PIP * 3 + 1])
+
+
+class LandmarkArray:
+    """One hand's 21 landmarks in a preallocated (21, 3) float32 array
+
+    The array is refilled once per frame and every finger-state, distance and
+    pixel-position query works on it with NumPy operations writing into
+    buffers allocated up front, so the queries allocate no arrays. The fill
+    itself still reads the 63 coordinates one attribute at a time from a
+    MediaPipe protobuf (there is no buffer to copy in bulk), which is most of
+    the per-frame cost; only replayed hands are copied in one step.
+    """
+
+    def __init__(self):
+        self.points = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        self._flat = self.points.reshape(-1)
+
+        self._lower = np.zeros(len(_UP_LOWER), dtype=np.float32)
+        self._upper = np.zeros(len(_UP_UPPER), dtype=np.float32)
+        self._fingers_up = np.zeros(len(FINGER_TIPS), dtype=bool)
+        self._fingers_up_f32 = np.zeros(len(FINGER_TIPS), dtype=np.float32)
+        # Frame size per tip coordinate, the same shape as the tips: a
+        # broadcasting multiply would allocate an iterator buffer every frame
+        self._scale = np.zeros((len(FINGER_TIPS), 2), dtype=np.float32)
+        self._scale_size = None
+        self._tips = np.zeros((len(FINGER_TIPS), 2), dtype=np.float32)
+        self._tips_flat = self._tips.reshape(-1)
+        self.tip_pixels = np.zeros((len(FINGER_TIPS), 2), dtype=np.float32)
+
+    def fill(self, hand_landmarks):
+        """Copy a hand's landmarks into the array, once per frame"""
+        points = getattr(hand_landmarks, "array", None)
+        if points is not None:
+            # Replayed hands already carry an array
+            np.copyto(self.points, points)
+            return self
+
+        # One attribute read per coordinate, written straight into the buffer
+        # (a bulk np.fromiter or struct.pack_into of the same reads measured
+        # no faster and allocates more)
+        flat = self._flat
+        i = 0
+        for landmark in hand_landmarks.landmark:
+            flat[i] = landmark.x
+            flat[i + 1] = landmark.y
+            flat[i + 2] = landmark.z
+            i += 3
+        return self
+
+    def fingers_up(self):
+        """Up/down state of thumb, index, middle and ring as a bool array"""
+        # ndarray.take with a non-raising mode writes into out without an
+        # intermediate buffer (np.take with mode='raise' allocates one)
+        self._flat.take(_UP_LOWER, out=self._lower, mode='wrap')
+        self._flat.take(_UP_UPPER, out=self._upper, mode='wrap')
+        return np.less(self._lower, self._upper, out=self._fingers_up)
+
+    def finger_state(self):
+        """Finger up states packed into a bitmask (see FINGER_BITS)"""
+        np.copyto(self._fingers_up_f32, self.fingers_up())
+        return int(np.dot(self._fingers_up_f32, _FINGER_WEIGHTS))
+
+    def distance(self, a, b):
+        """Normalized 2D distance between two landmarks"""
+        # Two scalars are cheaper to read with item() than through any ufunc call
+        flat = self._flat
+        return math.hypot(flat.item(3 * a) - flat.item(3 * b), flat.item(3 * a + 1) - flat.item(3 * b + 1))
+
+    def finger_tip_pixels(self, width, height):
+        """Whole pixel positions of thumb, index, middle and ring tips as a float32 (4, 2) array"""
+        if self._scale_size != (width, height):
+            self._scale[:, 0] = width
+            self._scale[:, 1] = height
+            self._scale_size = (width, height)
+        self._flat.take(_FINGER_TIPS_XY, out=self._tips_flat, mode='wrap')
+        np.multiply(self._tips, self._scale, out=self.tip_pixels)
+        # Truncated like int() did, but kept as float32 so no casting buffer is needed
+        return np.trunc(self.tip_pixels, out=self.tip_pixels)
+
+    def pixel(self, index, width, height):
+        """Pixel position of one landmark"""
+        return int(self.points[index, 0] * width), int(self.points[index, 1] * height)
+
+
+def hand_points(hand_landmarks):
+    """A hand's landmarks as a (21, 3) float32 array, without copying when it already has one"""
+    points = getattr(hand_landmarks, "array", None)
+    if points is not None:
+        return points
+    return np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32)
@@ -0,0 +1,159 @@
+"""Hand landmark detectors behind one interface
+
+Every backend is called as backend.process(rgb_img) and returns the same
+results type whatever the model: a ReplayResults whose hands are
+ReplayHandLandmarks holding their 21 landmarks as a (21, 3) float32 array,
+with a ReplayHandedness each. The gesture handlers, recorders and trackers
+therefore never depend on the model that produced the landmarks.
+
+    mediapipe_lite  MediaPipe Hands, model_complexity=0 (faster, less accurate)
+    mediapipe_full  MediaPipe Hands, model_complexity=1 (the previous default)
+    tasks           MediaPipe Tasks HandLandmarker, needs a hand_landmarker.task model file
+
+DeferredBackend loads any of them in the background for a fast startup.
+
+benchmarks/backend_benchmark.py compares their accuracy and latency.
+"""
+import functools
+import os
+import time
+
+import numpy as np
+
+from landmark_array import LandmarkArray
+from landmark_stream import ReplayHandedness, ReplayHandLandmarks, ReplayResults
+from startup import BackgroundTask
+
+TASK_MODEL_URL = "https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/latest/hand_landmarker.task"
+
+
+class MediaPipeHandsBackend:
+    """MediaPipe Hands solution (model_complexity 0 or 1)"""
+
+    def __init__(self, model_complexity=1, max_num_hands=2, min_detection_confidence=0.7,
+                 min_tracking_confidence=0.7):
+        import mediapipe as mp
+
+        self.model_complexity = model_complexity
+        self.hands = mp.solutions.hands.Hands(
+            max_num_hands=max_num_hands,
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
+        self._hand = LandmarkArray()
+
+    def process(self, rgb_img):
+        detected = self.hands.process(rgb_img)
+        if not detected.multi_hand_landmarks:
+            return ReplayResults()
+        # fill copies the landmarks into one buffer; each hand keeps its own copy
+        return ReplayResults(
+            [ReplayHandLandmarks(self._hand.fill(hand).points.copy()) for hand in detected.multi_hand_landmarks],
+            [ReplayHandedness(h.classification[0].label, h.classification[0].score) for h in detected.multi_handedness],
+        )
+
+    def close(self):
+        self.hands.close()
+
+
+class HandLandmarkerBackend:
+    """MediaPipe Tasks HandLandmarker in video mode
+
+    The model bundle is not shipped with the mediapipe package, download it
+    from TASK_MODEL_URL.
+    """
+
+    def __init__(self, model_path="hand_landmarker.task", max_num_hands=2, min_detection_confidence=0.7,
+                 min_presence_confidence=0.7, min_tracking_confidence=0.7):
+        if not os.path.isfile(model_path):
+            raise FileNotFoundError(f"HandLandmarker model not found: {model_path} (download it from {TASK_MODEL_URL})")
+        import mediapipe as mp
+        from mediapipe.tasks.python import BaseOptions
+        from mediapipe.tasks.python.vision import HandLandmarker, HandLandmarkerOptions, RunningMode
+
+        self._mp = mp
+        self.landmarker = HandLandmarker.create_from_options(HandLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=RunningMode.VIDEO,
+            num_hands=max_num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_presence_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        ))
+        self._last_ms = -1
+
+    def process(self, rgb_img):
+        # Video mode needs strictly increasing timestamps
+        timestamp_ms = max(self._last_ms + 1, int(time.monotonic() * 1000))
+        self._last_ms = timestamp_ms
+        image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=rgb_img)
+        detected = self.landmarker.detect_for_video(image, timestamp_ms)
+        if not detected.hand_landmarks:
+            return ReplayResults()
+        return ReplayResults(
+            [ReplayHandLandmarks(np.array([(lm.x, lm.y, lm.z) for lm in hand], dtype=np.float32))
+             for hand in detected.hand_landmarks],
+            [ReplayHandedness(categories[0].category_name, categories[0].score) for categories in detected.handedness],
+        )
+
+    def close(self):
+        self.landmarker.close()
+
+
+class DeferredBackend:
+    """Creates and warms up a backend in a background thread
+
+    Until the backend is ready process() reports no hands, so the first
+    camera frames can be shown while MediaPipe is imported and its graph is
+    built. Errors raised while loading surface on the first call after.
+    """
+
+    def __init__(self, factory, warmup_shape=(480, 640, 3)):
+        self.backend = None
+        self._task = BackgroundTask(lambda: self._load(factory, warmup_shape), name="landmark-backend")
+
+    @staticmethod
+    def _load(factory, warmup_shape):
+        backend = factory()
+        # The first inference allocates the model's buffers, keep it off the first real frame
+        backend.process(np.zeros(warmup_shape, dtype=np.uint8))
+        return backend
+
+    @property
+    def ready(self):
+        return self.backend is not None or self._task.done
+
+    def wait(self, timeout=None):
+        """Block until the backend is loaded and return it"""
+        if self.backend is None:
+            self.backend = self._task.result(timeout)
+        return self.backend
+
+    def process(self, rgb_img):
+        if self.backend is None:
+            if not self._task.done:
+                return ReplayResults()
+            self.wait()
+        return self.backend.process(rgb_img)
+
+    def close(self):
+        try:
+            backend = self.wait()
+        except Exception:
+            return  # never loaded, nothing to free
+        backend.close()
+
+
+BACKENDS = {
+    "mediapipe_lite": functools.partial(MediaPipeHandsBackend, model_complexity=0),
+    "mediapipe_full": functools.partial(MediaPipeHandsBackend, model_complexity=1),
+    "tasks": HandLandmarkerBackend,
+}
+
+
+def create_backend(name, **settings):
+    """Create a landmark backend by name (see BACKENDS)"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown landmark backend: {name}")
+    return BACKENDS[name](**settings)
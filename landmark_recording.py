@@ -0,0 +1,146 @@
+"""Compact binary landmark recordings
+
+A recording is a directory holding memory-mappable .npy arrays:
+
+    landmarks.npy   float32 (frames, hands, 21, 3), NaN where no hand was seen
+    timestamps.npy  float64 (frames,)
+    handedness.npy  int8    (frames, hands), -1 none, 0 Left, 1 Right
+    scores.npy      float32 (frames, hands), handedness confidence
+    meta.json       camera frame size the landmarks were detected on
+
+Recordings replay straight into VirtualMouse and VirtualKeyboard without
+running MediaPipe.
+"""
+import json
+import os
+
+import numpy as np
+
+from hand_tracking import KEYBOARD, MOUSE, HandIdentityTracker
+from landmark_array import hand_points
+from landmark_stream import ReplayHandLandmarks, ReplayHandedness, ReplayResults
+
+HANDEDNESS_LABELS = ("Left", "Right")
+NUM_LANDMARKS = 21
+
+
+class LandmarkRecorder:
+    """Collects Hands.process results and writes them as a binary recording"""
+
+    def __init__(self, path, max_hands=2, chunk_frames=1024, frame_size=None):
+        self.path = path
+        self.max_hands = max_hands
+        self.frame_size = frame_size  # (width, height) of the camera frames
+        self.chunk_frames = chunk_frames
+        self.frames = 0
+        self._allocate(chunk_frames)
+
+    def _allocate(self, capacity):
+        landmarks = np.full((capacity, self.max_hands, NUM_LANDMARKS, 3), np.nan, dtype=np.float32)
+        timestamps = np.zeros(capacity, dtype=np.float64)
+        handedness = np.full((capacity, self.max_hands), -1, dtype=np.int8)
+        scores = np.zeros((capacity, self.max_hands), dtype=np.float32)
+        if self.frames:
+            landmarks[:self.frames] = self.landmarks[:self.frames]
+            timestamps[:self.frames] = self.timestamps[:self.frames]
+            handedness[:self.frames] = self.handedness[:self.frames]
+            scores[:self.frames] = self.scores[:self.frames]
+        self.landmarks, self.timestamps = landmarks, timestamps
+        self.handedness, self.scores = handedness, scores
+
+    def add(self, timestamp, results, frame_shape=None):
+        """Append one frame of results"""
+        if self.frame_size is None and frame_shape is not None:
+            self.frame_size = (frame_shape[1], frame_shape[0])
+        if self.frames == len(self.timestamps):
+            self._allocate(len(self.timestamps) + self.chunk_frames)
+
+        frame = self.frames
+        self.timestamps[frame] = timestamp
+        if results is not None and results.multi_hand_landmarks:
+            hands = zip(results.multi_hand_landmarks, results.multi_handedness)
+            for slot, (hand_landmarks, handedness) in enumerate(hands):
+                if slot >= self.max_hands:
+                    break
+                self.landmarks[frame, slot] = hand_points(hand_landmarks)
+                category = handedness.classification[0]
+                self.handedness[frame, slot] = HANDEDNESS_LABELS.index(category.label)
+                self.scores[frame, slot] = category.score
+        self.frames += 1
+
+    def close(self):
+        """Write the recorded frames to disk"""
+        os.makedirs(self.path, exist_ok=True)
+        np.save(os.path.join(self.path, "landmarks.npy"), self.landmarks[:self.frames])
+        np.save(os.path.join(self.path, "timestamps.npy"), self.timestamps[:self.frames])
+        np.save(os.path.join(self.path, "handedness.npy"), self.handedness[:self.frames])
+        np.save(os.path.join(self.path, "scores.npy"), self.scores[:self.frames])
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump({"frame_size": self.frame_size}, f)
+
+
+class LandmarkRecording:
+    """Memory-mapped view of a binary landmark recording"""
+
+    def __init__(self, path):
+        self.path = path
+        self.landmarks = np.load(os.path.join(path, "landmarks.npy"), mmap_mode="r")
+        self.timestamps = np.load(os.path.join(path, "timestamps.npy"), mmap_mode="r")
+        self.handedness = np.load(os.path.join(path, "handedness.npy"), mmap_mode="r")
+        self.scores = np.load(os.path.join(path, "scores.npy"), mmap_mode="r")
+        self.frame_size = None
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.isfile(meta_path):
+            with open(meta_path) as f:
+                frame_size = json.load(f).get("frame_size")
+            self.frame_size = tuple(frame_size) if frame_size else None
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def results(self, frame):
+        """Build a results object for one frame, as Hands.process would return it"""
+        present = np.flatnonzero(self.handedness[frame] >= 0)
+        if len(present) == 0:
+            return ReplayResults()
+        return ReplayResults(
+            [ReplayHandLandmarks(self.landmarks[frame, slot]) for slot in present],
+            [ReplayHandedness(HANDEDNESS_LABELS[self.handedness[frame, slot]], float(self.scores[frame, slot]))
+             for slot in present],
+        )
+
+    def __iter__(self):
+        """Yield (timestamp, results) for every frame"""
+        for frame in range(len(self)):
+            yield float(self.timestamps[frame]), self.results(frame)
+
+
+def is_landmark_recording(path):
+    return os.path.isfile(os.path.join(path, "landmarks.npy"))
+
+
+def replay_gestures(frames, mouse, keyboard, camera_img, keyboard_img, tracker=None):
+    """Feed recorded frames straight into the gesture handlers
+
+    Hands are assigned the same way as in MouseAndKeyboard: a
+    HandIdentityTracker follows them and the (voted) right hand drives the
+    mouse, the left hand the keyboard. Pass the same tracker to successive
+    calls on one stream. The scratch images are reused for every frame.
+    Returns the number of frames replayed.
+    """
+    if tracker is None:
+        tracker = HandIdentityTracker()
+    count = 0
+    for timestamp, results in frames:
+        hands = tracker.update(results)
+        mouse_hand = hands.get(MOUSE)
+        if mouse_hand is not None:
+            mouse.handle_hand_gestures(results, mouse_hand.index, camera_img, timestamp, mouse_hand.id,
+                                   mouse_hand.label == HANDEDNESS_LABELS[0])
+        else:
+            mouse.hand_lost(timestamp)
+        keyboard_hand = hands.get(KEYBOARD)
+        if keyboard_hand is not None:
+            keyboard.handle_hand_gestures(results, keyboard_hand.index, keyboard_img, timestamp, keyboard_hand.id)
+        count += 1
+    return count
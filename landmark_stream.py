@@ -0,0 +1,103 @@
+import json
+
+import numpy as np
+
+
+class ReplayLandmark:
+    """Stand-in for a MediaPipe NormalizedLandmark"""
+
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def HasField(self, name):
+        # Recorded landmarks carry no visibility/presence, same as MediaPipe Hands
+        return False
+
+
+class ReplayHandLandmarks:
+    """Stand-in for a MediaPipe NormalizedLandmarkList
+
+    The points are kept as a (21, 3) array which LandmarkArray.fill copies
+    directly; per-landmark objects are only built when something (such as
+    MediaPipe's drawing utils) asks for them.
+    """
+
+    def __init__(self, points):
+        self.array = np.asarray(points, dtype=np.float32)
+        self._landmark = None
+
+    @property
+    def landmark(self):
+        if self._landmark is None:
+            self._landmark = [ReplayLandmark(*point) for point in self.array.tolist()]
+        return self._landmark
+
+
+class ReplayCategory:
+    def __init__(self, label, score):
+        self.label = label
+        self.score = score
+
+
+class ReplayHandedness:
+    """Stand-in for a MediaPipe ClassificationList"""
+
+    def __init__(self, label, score=1.0):
+        self.classification = [ReplayCategory(label, score)]
+
+
+class ReplayResults:
+    """Stand-in for the results returned by Hands.process
+
+    predicted marks landmarks that were extrapolated rather than detected.
+    """
+
+    def __init__(self, multi_hand_landmarks=None, multi_handedness=None, predicted=False):
+        self.multi_hand_landmarks = multi_hand_landmarks
+        self.multi_handedness = multi_handedness
+        self.predicted = predicted
+
+
+def results_to_record(results, timestamp):
+    """Convert Hands.process results into a JSON serializable frame record"""
+    hands = []
+    if results.multi_hand_landmarks:
+        for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+            category = handedness.classification[0]
+            hands.append({
+                "label": category.label,
+                "score": round(float(category.score), 4),
+                "landmarks": [[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark],
+            })
+    return {"t": timestamp, "hands": hands}
+
+
+def record_to_results(record):
+    """Convert a frame record back into a results object"""
+    if not record["hands"]:
+        return ReplayResults()
+    return ReplayResults(
+        [ReplayHandLandmarks(hand["landmarks"]) for hand in record["hands"]],
+        [ReplayHandedness(hand["label"], hand.get("score", 1.0)) for hand in record["hands"]],
+    )
+
+
+def write_landmark_stream(path, records):
+    """Write frame records as JSON lines"""
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def read_landmark_stream(path):
+    """Yield (timestamp, results) for every frame of a JSON lines landmark stream"""
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                yield record["t"], record_to_results(record)
@@ -1,9 +1,25 @@
+import argparse
+import time
+from startup import LazyModule, StartupTimeline, preload
 import cv2
 import numpy as np
-import mediapipe as mp
-import pyautogui
 from virtual_mouse import VirtualMouse
 from virtual_keyboard import VirtualKeyboard
+from pipeline import BufferPool, FramePacket, StageLatency, ThreadedPipeline, draw_latency
+from frame_sources import CameraSource, open_source
+from output_sinks import AsyncOutputSink, OSOutputSink
+from landmark_recording import LandmarkRecorder
+from roi_tracking import RoiHandTracker
+from inference_scheduler import AdaptiveInferenceScheduler
+from idle_mode import IdleController
+from hand_tracking import KEYBOARD, MOUSE, HandIdentityTracker
+from gesture_classifier import GestureClassifier
+from cursor_filters import FILTERS, create_filter
+from profiling import StageProfiler
+from event_latency import EventLatencyTracer, TracingOutputSink
+from event_service import start_service
+from shared_ring import SharedFrameRing
+from landmark_backends import BACKENDS, DeferredBackend, create_backend
 
 class MouseAndKeyboard:
     HANDS_LABELS = {
@@ -11,104 +27,493 @@ class MouseAndKeyboard:
         "Right": "Right",
     }
 
-    def __init__(self):
-         # Initialize MediaPipe Hand tracking
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=2,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.7
-        )
-        self.mp_draw = mp.solutions.drawing_utils
+    WINDOW_NAME = "Virtual Mouse and Keyboard"
+
+    # Pipeline modes
+    MODE_THREADED = "threaded"  # capture, inference and render run in separate stages
+    MODE_SYNC = "sync"  # original single loop, kept for A/B comparison
+    MODES = (MODE_THREADED, MODE_SYNC)
+
+    def __init__(self, source=None, output=None, backend=None):
+        # Hand landmark detector (MediaPipe Hands by default, see landmark_backends);
+        # the MediaPipe modules are still used to draw the landmarks, imported
+        # on first use since they pull in most of MediaPipe
+        self.hands = backend if backend is not None else create_backend("mediapipe_full")
+        self.mp_hands = LazyModule("mediapipe.python.solutions.hands")
+        self.mp_draw = LazyModule("mediapipe.python.solutions.drawing_utils")
+
+        # Time to the window, first frame, model and first landmarks
+        self.startup = StartupTimeline()
 
         # Window properties
         self.window_width = 1000
         self.window_height = 400
 
-        self.mouse = VirtualMouse(self.mp_hands, self.hands, self.mp_draw, self.window_width, self.window_height)
-        self.keyboard = VirtualKeyboard(self.mp_hands, self.hands, self.mp_draw, self.window_width, self.window_height)
+        # Frame source (the webcam unless a recording is given) and output sink
+        # (the OS by default, from a dedicated output thread)
+        self.source = source
+        self.output = output if output is not None else AsyncOutputSink(OSOutputSink())
+
+        self.mouse = VirtualMouse(self.mp_hands, self.hands, self.mp_draw, self.window_width, self.window_height, self.output)
+        self.keyboard = VirtualKeyboard(self.mp_hands, self.hands, self.mp_draw, self.window_width, self.window_height, self.output)
+
+        # Follows the hands across frames so a flipped handedness label does not swap mouse and keyboard
+        self.hand_tracker = HandIdentityTracker(roles={
+            self.HANDS_LABELS['Right']: MOUSE,
+            self.HANDS_LABELS['Left']: KEYBOARD,
+        })
+
+        # Reused frame buffers: captured frames are recycled through the pool,
+        # the RGB copy belongs to the inference stage, and the combined display
+        # holds the camera and keyboard regions as views (see prepare_display)
+        self.frame_pool = BufferPool()
+        self.rgb_img = None
+        self.combined_img = None
+        self.camera_view = None
+        self.keyboard_img = None
+
+        # Per-stage latency readout
+        self.latency = StageLatency()
+        self.show_latency = True
+
+        # Fine-grained stage profiling and HUD, see enable_profiling
+        self.profiler = StageProfiler()
+        self.mouse.profiler = self.profiler
+        self.keyboard.profiler = self.profiler
+        self.show_hud = False
+
+        # Headless mode: no window and no display rendering, see start
+        self.headless = False
+
+        # Optional capture to OS event latency tracing, see enable_event_tracing
+        self.event_tracer = None
+
+        # Optional shared-memory ring of frames and landmarks for other processes,
+        # created on the first frame, see enable_shared_ring
+        self.frame_ring = None
+        self.frame_ring_settings = None
+
+        # Optional binary landmark recorder, fed from the inference stage
+        self.recorder = None
+
+        # Optional region-of-interest tracking, see enable_roi_tracking
+        self.roi_tracker = None
+
+        # Optional adaptive frame skipping, see enable_adaptive_skipping
+        self.scheduler = None
+
+        # Optional low-power mode while no hands are seen, see enable_idle_mode
+        self.idle = None
+
+    def enable_adaptive_skipping(self, target_fps=30.0, **settings):
+        """Only run hand detection as often as the frame budget allows"""
+        self.scheduler = AdaptiveInferenceScheduler(target_fps, **settings)
+        return self.scheduler
 
-    def start(self):
-        cap = cv2.VideoCapture(0)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.window_width)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.window_height)
-        
+    def enable_profiling(self, show_hud=True, trace_capacity=None):
+        """Time every stage, optionally keeping a trace of up to trace_capacity events"""
+        self.profiler = StageProfiler(enabled=True, trace_capacity=trace_capacity)
+        self.mouse.profiler = self.profiler
+        self.keyboard.profiler = self.profiler
+        self.show_hud = show_hud
+        return self.profiler
+
+    def enable_idle_mode(self, idle_after=10.0, **settings):
+        """Drop to a motion-gated, low-rate detection probe after idle_after seconds without hands"""
+        self.idle = IdleController(idle_after, **settings)
+        return self.idle
+
+    def frame_interval(self):
+        """Minimum time between two captured frames, non-zero while idle"""
+        return self.idle.frame_interval() if self.idle is not None else 0.0
+
+    def enable_gesture_classifier(self, path):
+        """Read the mouse finger states with a trained GestureClassifier instead of the rules"""
+        self.mouse.classifier = GestureClassifier.load(path)
+        return self.mouse.classifier
+
+    def enable_event_tracing(self, tracer=None):
+        """Record the latency from frame capture to OS event for every gesture"""
+        self.event_tracer = tracer if tracer is not None else EventLatencyTracer()
+        if isinstance(self.output, AsyncOutputSink):
+            self.output.tracer = self.event_tracer
+        else:
+            self.output = TracingOutputSink(self.output, self.event_tracer)
+            self.mouse.output = self.output
+            self.keyboard.output = self.output
+        return self.event_tracer
+
+    def enable_shared_ring(self, name, slots=4):
+        """Publish every mirrored frame and its landmarks in a SharedFrameRing called name"""
+        self.frame_ring_settings = {"name": name, "slots": slots}
+
+    def enable_roi_tracking(self, **settings):
+        """Run hand detection on a crop around the previously tracked hands"""
+        self.roi_tracker = RoiHandTracker(max_hands=2, **settings)
+        return self.roi_tracker
+
+    def open_source(self):
+        """Return the configured frame source, opening the webcam by default"""
+        if self.source is None:
+            self.source = CameraSource(0, self.window_width, self.window_height)
+        return self.source
+
+    def create_window(self):
+        """Create the always on top control window near the bottom of the screen"""
         # Get screen resolution and calculate window position
-        screen_width = pyautogui.size()[0]
-        screen_height = pyautogui.size()[1]
+        screen_width, screen_height = self.output.screen_size()
         window_x = (screen_width - self.window_width) // 2
         window_y = screen_height - self.window_height - 40  # 40 pixels from bottom
-        
-        WINDOW_NAME = "Virtual Mouse and Keyboard"
 
         # Create and position control window with always on top property
-        cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL | cv2.WINDOW_KEEPRATIO | cv2.WINDOW_GUI_EXPANDED)
-        cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_TOPMOST, 1)
-        cv2.moveWindow(WINDOW_NAME, window_x, window_y)
+        cv2.namedWindow(self.WINDOW_NAME, cv2.WINDOW_NORMAL | cv2.WINDOW_KEEPRATIO | cv2.WINDOW_GUI_EXPANDED)
+        cv2.setWindowProperty(self.WINDOW_NAME, cv2.WND_PROP_TOPMOST, 1)
+        cv2.moveWindow(self.WINDOW_NAME, window_x, window_y)
 
-        while True:
-            success, camera_img = cap.read()
-            if not success:
-                continue
+    def process_frame(self, packet):
+        """Inference stage: mirror the camera frame and detect hands"""
+        # Replayed landmark streams already carry their (mirrored) results
+        if packet.results is None:
+            # Flip image horizontally for mirror effect, in place
+            cv2.flip(packet.image, 1, dst=packet.image)  # Mirror image
+
+            if self.idle is not None and self.idle.idle:
+                # Nobody around: cheap motion check, low resolution detection on motion
+                with self.profiler.measure("idle.probe"):
+                    packet.results = self.idle.probe(self.hands, packet.image, packet.timestamp)
+                return self.publish_frame(packet)
+
+            if self.scheduler is not None and not self.scheduler.should_infer():
+                # Skip detection on this frame and extrapolate the landmarks;
+                # not published, recordings and the shared ring only hold
+                # detected landmarks
+                packet.results = self.scheduler.predict(packet.timestamp)
+                return packet
 
-            # Flip image horizontally for mirror effect
-            camera_img = cv2.flip(camera_img, 1)  # Mirror image
-            
             # Process the camera image for hand detection
-            rgb_camera_img = cv2.cvtColor(camera_img, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(rgb_camera_img)
-            
-            # Create a black background for keyboard visualization
-            img = np.zeros((self.window_height, self.window_width, 3), dtype=np.uint8)
-            
-            # Draw the keyboard layout
-            self.keyboard.draw_keyboard(img)
-
-            # Initialize hand indices
-            right_hand_index = None
-            left_hand_index = None
-
-            if results.multi_hand_landmarks:
-                for idx, hand_landmarks in enumerate(results.multi_hand_landmarks):
-                    # Draw hand landmarks on camera image
+            start = time.perf_counter()
+            packet.results = self.detect_hands(packet.image)
+            if self.scheduler is not None:
+                self.scheduler.observe(packet.results, packet.timestamp, time.perf_counter() - start)
+            if self.idle is not None:
+                self.idle.observe(packet.results, packet.timestamp)
+
+        return self.publish_frame(packet)
+
+    def publish_frame(self, packet):
+        """Hand the frame and its results to the recorder and the shared ring
+
+        Only frames that went through detection (or an idle probe) are
+        published, never the ones extrapolated by adaptive skipping.
+        """
+        if self.recorder is not None:
+            self.recorder.add(packet.timestamp, packet.results, packet.image.shape)
+        if self.frame_ring_settings is not None:
+            if self.frame_ring is None:
+                # The slot size follows the first frame, later frames are resized to it
+                self.frame_ring = SharedFrameRing.create(frame_shape=packet.image.shape, max_hands=2,
+                                                         **self.frame_ring_settings)
+            self.frame_ring.publish(packet.image, packet.results, packet.timestamp)
+        return packet
+
+    def detect_hands(self, camera_img):
+        """Run hand detection on a mirrored BGR camera frame"""
+        if self.rgb_img is None or self.rgb_img.shape != camera_img.shape:
+            self.rgb_img = np.empty_like(camera_img)
+        with self.profiler.measure("cvt_color"):
+            cv2.cvtColor(camera_img, cv2.COLOR_BGR2RGB, dst=self.rgb_img)
+        with self.profiler.measure("hands.process"):
+            if self.roi_tracker is not None:
+                return self.roi_tracker.process(self.hands, self.rgb_img)
+            return self.hands.process(self.rgb_img)
+
+    def prepare_display(self, camera_shape):
+        """(Re)allocate the combined display when the camera frame size changes"""
+        # Resize camera image to match keyboard window height
+        camera_width = int(self.window_height * camera_shape[1] / camera_shape[0])
+        shape = (self.window_height, self.window_width + camera_width, 3)
+        if self.combined_img is not None and self.combined_img.shape == shape:
+            return
+
+        self.combined_img = np.zeros(shape, dtype=np.uint8)
+        self.camera_view = self.combined_img[:, :camera_width]
+        self.keyboard_img = self.combined_img[:, camera_width:]
+
+    def render_frame(self, packet):
+        """Render/output stage: handle gestures and build the combined display
+
+        The returned image is reused for the next frame. In headless mode only
+        the gestures are handled and None is returned.
+        """
+        camera_img = packet.image
+        results = packet.results
+
+        # Events sent by the gesture handlers below belong to this frame
+        if self.event_tracer is not None:
+            self.event_tracer.begin_frame(packet.captured_at)
+
+        if results.multi_hand_landmarks:
+            self.startup.mark("first_landmark")
+        loading = not getattr(self.hands, "ready", True)
+        if not loading:
+            self.startup.mark("model_ready")
+
+        if self.headless:
+            self.startup.mark("first_frame")
+            if self.keyboard_img is None:
+                # Scratch image for the keyboard handler's cursor feedback
+                self.keyboard_img = np.zeros((self.window_height, self.window_width, 3), dtype=np.uint8)
+            self.handle_gestures(results, camera_img, self.keyboard_img, packet.timestamp)
+            return None
+
+        self.prepare_display(camera_img.shape)
+
+        # Copy the cached keyboard image for the current modifier state
+        # straight into its region of the combined display
+        img = self.keyboard_img
+        with self.profiler.measure("keyboard.render"):
+            self.keyboard.render_keyboard(img)
+
+        if results.multi_hand_landmarks:
+            for hand_landmarks in results.multi_hand_landmarks:
+                # Draw hand landmarks on camera image
+                with self.profiler.measure("draw_landmarks"):
                     self.mp_draw.draw_landmarks(
-                        camera_img, 
-                        hand_landmarks, 
+                        camera_img,
+                        hand_landmarks,
                         self.mp_hands.HAND_CONNECTIONS
                     )
-                    
-                    # Determine hand type (left or right)
-                    if results.multi_handedness[idx].classification[0].label == self.HANDS_LABELS['Right']:
-                        right_hand_index = idx
-                    elif results.multi_handedness[idx].classification[0].label == self.HANDS_LABELS['Left']:
-                        left_hand_index = idx
-
-            # Handle mouse gestures with right hand
-            if right_hand_index is not None:
-                self.mouse.handle_hand_gestures(results, right_hand_index, camera_img)
-
-            # Handle keyboard gestures with left hand
-            if left_hand_index is not None:
-                self.keyboard.handle_hand_gestures(results, left_hand_index, img)
-
-            # Show both camera feed and keyboard interface
-            # Resize camera image to match keyboard window height
-            camera_img = cv2.resize(camera_img, (int(self.window_height * camera_img.shape[1] / camera_img.shape[0]), self.window_height))
-            
-            # Create combined display
-            combined_img = np.zeros((self.window_height, self.window_width + camera_img.shape[1], 3), dtype=np.uint8)
-            combined_img[:, :camera_img.shape[1]] = camera_img
-            combined_img[:, camera_img.shape[1]:] = img
-
-            cv2.imshow(WINDOW_NAME, combined_img)
-            
+
+        self.handle_gestures(results, camera_img, img, packet.timestamp)
+
+        # Show both camera feed and keyboard interface
+        # Resize camera image straight into its region of the combined display
+        with self.profiler.measure("resize"):
+            cv2.resize(camera_img, (self.camera_view.shape[1], self.window_height), dst=self.camera_view)
+        if loading:
+            # Frames are shown while the hand model loads in the background
+            cv2.putText(self.camera_view, "Loading hand model...", (10, 30), cv2.FONT_HERSHEY_PLAIN, 1.5, (0, 255, 255), 2)
+        elif self.idle is not None and self.idle.idle:
+            cv2.putText(self.camera_view, "Idle - show a hand", (10, 30), cv2.FONT_HERSHEY_PLAIN, 1.5, (0, 255, 255), 2)
+        self.startup.mark("first_frame")
+        return self.combined_img
+
+    def handle_gestures(self, results, camera_img, keyboard_img, timestamp):
+        """Send the right hand to the mouse and the left hand to the keyboard
+
+        Handedness is voted over the last frames for each tracked hand, see
+        hand_tracking.
+        """
+        with self.profiler.measure("hand_tracking"):
+            hands = self.hand_tracker.update(results)
+
+        # Handle mouse gestures with right hand
+        mouse_hand = hands.get(MOUSE)
+        if mouse_hand is not None:
+            self.mouse.handle_hand_gestures(results, mouse_hand.index, camera_img, timestamp, mouse_hand.id,
+                                           mouse_hand.label == self.HANDS_LABELS["Left"])
+        else:
+            self.mouse.hand_lost(timestamp)
+
+        # Handle keyboard gestures with left hand
+        keyboard_hand = hands.get(KEYBOARD)
+        if keyboard_hand is not None:
+            self.keyboard.handle_hand_gestures(results, keyboard_hand.index, keyboard_img, timestamp, keyboard_hand.id)
+
+    def show_frame(self, combined_img, dropped_frames=None):
+        """Display the combined image, returns False once the user wants to quit"""
+        if self.show_latency:
+            draw_latency(combined_img, self.latency, dropped_frames)
+        if self.show_hud:
+            self.profiler.draw_hud(combined_img, dropped_frames)
+
+        with self.profiler.measure("imshow"):
+            cv2.imshow(self.WINDOW_NAME, combined_img)
             key = cv2.waitKey(1)
-            if key == ord('q') or cv2.getWindowProperty(WINDOW_NAME, cv2.WND_PROP_VISIBLE) < 1:
+        return not (key == ord('q') or cv2.getWindowProperty(self.WINDOW_NAME, cv2.WND_PROP_VISIBLE) < 1)
+
+    def run_sync(self, source, display=True, max_frames=None):
+        """Run every stage one after another in a single loop"""
+        index = 0
+        while max_frames is None or index < max_frames:
+            frame_start = time.perf_counter()
+            buffer = self.frame_pool.acquire()
+            with self.latency.measure("capture"), self.profiler.measure("capture"):
+                success, camera_img = source.read(buffer)
+            if not success:
+                self.frame_pool.release(buffer)
+                if source.finite:
+                    break
+                continue
+
+            packet = FramePacket.from_source(index, source, camera_img, time.perf_counter(), self.frame_pool)
+            index += 1
+
+            with self.latency.measure("inference"):
+                self.process_frame(packet)
+
+            with self.latency.measure("render"):
+                combined_img = self.render_frame(packet)
+            self.latency.record("total", time.perf_counter() - packet.captured_at)
+            self.profiler.frame_done()
+            packet.release()
+
+            if display and not self.show_frame(combined_img):
                 break
-                
+            # Lower frame rate while idle
+            delay = self.frame_interval() - (time.perf_counter() - frame_start)
+            if delay > 0:
+                time.sleep(delay)
+        return index
+
+    def run_threaded(self, source, display=True, max_frames=None):
+        """Run capture and inference in worker threads and render the newest result"""
+        rendered = 0
+        pipeline = ThreadedPipeline(source, self.process_frame, self.latency, self.frame_pool, self.profiler,
+                                    self.frame_interval)
+        pipeline.start()
+        try:
+            for packet in pipeline.frames():
+                with self.latency.measure("render"):
+                    combined_img = self.render_frame(packet)
+                self.latency.record("total", time.perf_counter() - packet.captured_at)
+                self.profiler.frame_done()
+                packet.release()
+                rendered += 1
+
+                if display and not self.show_frame(combined_img, pipeline.dropped_frames):
+                    break
+                if max_frames is not None and rendered >= max_frames:
+                    break
+        finally:
+            pipeline.stop()
+        return rendered
+
+    def start(self, mode=MODE_THREADED):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown pipeline mode: {mode}")
+
+        source = self.open_source()
+        self.startup.mark("source_open")
+        if not self.headless:
+            self.create_window()
+            self.startup.mark("window")
+
+        try:
+            if mode == self.MODE_SYNC:
+                self.run_sync(source, display=not self.headless)
+            else:
+                self.run_threaded(source, display=not self.headless)
+        except KeyboardInterrupt:
+            # The way to stop a headless service
+            pass
+        finally:
+            source.release()
+            self.hands.close()
+            cv2.destroyAllWindows()
+            if self.recorder is not None:
+                self.recorder.close()
+            if self.frame_ring is not None:
+                self.frame_ring.close()
+            self.output.close()
+
+        print(f"Startup: {self.startup.summary_text()}")
+        print(f"Average stage latency ({mode}): {self.latency.summary_text()}")
+        if self.roi_tracker is not None:
+            print(f"ROI tracking: {self.roi_tracker.summary_text()}")
+        if self.scheduler is not None:
+            print(f"Adaptive skipping: {self.scheduler.summary_text()}")
+        if self.idle is not None:
+            print(f"Idle mode: {self.idle.summary_text()}")
+        if isinstance(self.output, AsyncOutputSink):
+            print(f"Output: {self.output.summary_text()}")
+        if self.profiler.enabled:
+            print(f"Stage profile:\n{self.profiler.summary_text()}")
+        if self.event_tracer is not None:
+            print(f"Capture to OS event latency (ms):\n{self.event_tracer.summary_text()}")
 
-        cap.release()
-        cv2.destroyAllWindows()
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hand gesture virtual mouse and keyboard")
+    parser.add_argument("--mode", choices=MouseAndKeyboard.MODES, default=MouseAndKeyboard.MODE_THREADED,
+                        help="Pipeline mode, 'sync' runs the original single loop for comparison")
+    parser.add_argument("--hide-latency", action="store_true",
+                        help="Hide the per-stage latency readout")
+    parser.add_argument("--source", default=None,
+                        help="Camera index, recorded video file, .jsonl landmark stream or landmark recording (default: camera 0)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="mediapipe_full",
+                        help="Hand landmark model (default: %(default)s), see benchmarks/backend_benchmark.py")
+    parser.add_argument("--task-model", default="hand_landmarker.task", metavar="PATH",
+                        help="Model bundle of the 'tasks' backend")
+    parser.add_argument("--roi", action="store_true",
+                        help="Track hands on a crop around their previous position instead of the full frame")
+    parser.add_argument("--adaptive-skip", type=float, default=None, metavar="TARGET_FPS",
+                        help="Skip hand detection on some frames to keep up with TARGET_FPS, extrapolating landmarks in between")
+    parser.add_argument("--idle-after", type=float, default=None, metavar="SECONDS",
+                        help="After SECONDS without hands, only run a low-rate, motion-gated, low resolution detection probe")
+    parser.add_argument("--cursor-filter", choices=sorted(FILTERS), default="exponential",
+                        help="Cursor smoothing filter (default: %(default)s)")
+    parser.add_argument("--gesture-model", default=None, metavar="PATH",
+                        help="Classifier weights from benchmarks.train_gesture_classifier for the mouse gestures")
+    parser.add_argument("--monitor-zones", action="store_true",
+                        help="Give every monitor its own zone of the hand range instead of spanning the whole desktop")
+    parser.add_argument("--sync-output", action="store_true",
+                        help="Send mouse and keyboard events from the vision loop instead of an output thread")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time every stage and show fps, per-stage p50/p95 and dropped frames in a HUD")
+    parser.add_argument("--trace", default=None, metavar="PATH",
+                        help="Profile every stage and write the trace to PATH on exit (.csv, or .json for chrome://tracing)")
+    parser.add_argument("--event-trace", default=None, metavar="PATH",
+                        help="Record capture to OS event latency per gesture and write the records to a CSV file on exit")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run without a window, only handling gestures")
+    parser.add_argument("--serve", default=None, metavar="SOCKET",
+                        help="Headless service: publish gesture events to subscribers of a Unix socket instead of the OS")
+    parser.add_argument("--inject", action="store_true",
+                        help="With --serve, also send the events to the OS")
+    parser.add_argument("--shared-ring", default=None, metavar="NAME",
+                        help="Publish frames and landmarks in a shared-memory ring buffer for other processes")
+    parser.add_argument("--record", default=None, metavar="DIR",
+                        help="Record detected hand landmarks into a binary landmark recording")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    MouseAndKeyboard().start()
+    args = parse_args()
+    # Load the hand model in the background while the OS event modules are
+    # imported and the camera opens, frames are shown before it is ready
+    backend_settings = {"model_path": args.task_model} if args.backend == "tasks" else {}
+    backend = DeferredBackend(lambda: create_backend(args.backend, **backend_settings))
+    if not args.serve or args.inject:
+        preload("pyautogui", "pynput.keyboard")
+    source = open_source(args.source, 1000, 400, realtime=True)
+    output = OSOutputSink() if args.sync_output else None
+    server = None
+    if args.serve:
+        output, server = start_service(args.serve, inject=args.inject)
+    app = MouseAndKeyboard(source=source, output=output, backend=backend)
+    app.headless = args.headless or server is not None
+    app.show_latency = not args.hide_latency
+    app.mouse.cursor_filter = create_filter(args.cursor_filter)
+    app.mouse.monitor_zones = args.monitor_zones
+    if args.gesture_model:
+        app.enable_gesture_classifier(args.gesture_model)
+    if args.profile or args.trace:
+        app.enable_profiling(show_hud=args.profile, trace_capacity=100000 if args.trace else None)
+    if args.event_trace:
+        app.enable_event_tracing()
+    if args.shared_ring:
+        app.enable_shared_ring(args.shared_ring)
+    if args.record:
+        app.recorder = LandmarkRecorder(args.record)
+    if args.roi:
+        app.enable_roi_tracking()
+    if args.adaptive_skip:
+        app.enable_adaptive_skipping(args.adaptive_skip)
+    if args.idle_after is not None:
+        app.enable_idle_mode(args.idle_after)
+    app.start(args.mode)
+    if server is not None:
+        server.close()
+    if args.event_trace:
+        print(f"Wrote {app.event_tracer.export_csv(args.event_trace)} event latency records to {args.event_trace}")
+    if args.trace:
+        print(f"Wrote {app.profiler.export_trace(args.trace)} trace events to {args.trace}")
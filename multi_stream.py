@@ -0,0 +1,262 @@
+"""Multi-camera mode: one inference process per stream
+
+Every source gets a worker process that opens the source, mirrors the
+frames and runs its own MediaPipe Hands model, pinned to one core. Only the
+landmarks travel back to the coordinator (a few hundred bytes per frame),
+which feeds them to a VirtualMouse / VirtualKeyboard pair per stream.
+
+    python multi_stream.py 0 1 2                        # three cameras, events counted only
+    python multi_stream.py 0 1 --serve-prefix /tmp/station   # publish stream i on /tmp/station<i>.sock
+    python multi_stream.py 0 --inject                   # send the events to the OS
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import time
+
+import numpy as np
+
+from hand_tracking import HandIdentityTracker
+from landmark_backends import BACKENDS
+from landmark_recording import replay_gestures
+from landmark_stream import ReplayHandedness, ReplayHandLandmarks, ReplayResults
+from output_sinks import AsyncOutputSink, CountingOutputSink
+from virtual_keyboard import VirtualKeyboard
+from virtual_mouse import VirtualMouse
+
+WINDOW_WIDTH = 1000
+WINDOW_HEIGHT = 400
+
+
+def _pin_to_core(core):
+    """Pin the calling process to one core where the OS allows it"""
+    if core is not None and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, {core})
+        except OSError:
+            pass
+
+
+def inference_worker(stream_id, spec, core, results, stop_event, realtime=True, max_frames=None,
+                     backend="mediapipe_full"):
+    """Worker process: read one source, detect hands, send compact results
+
+    Each result is (stream_id, index, timestamp, frame_size, points, labels)
+    where points is a float32 (hands, 21, 3) array; (stream_id, None, ...)
+    marks the end of the stream.
+    """
+    _pin_to_core(core)
+    # Imported here so the coordinator never loads MediaPipe or OpenCV threads it does not use
+    import cv2
+    from frame_sources import open_source
+    from landmark_array import hand_points
+    from landmark_backends import create_backend
+
+    # One model per process, same settings as MouseAndKeyboard; keep OpenCV to this core
+    cv2.setNumThreads(1)
+    hands = None
+    source = None
+    rgb_img = None
+    index = 0
+    try:
+        # Inside the try so a model or source that fails to open still ends the stream
+        hands = create_backend(backend)
+        source = open_source(spec, WINDOW_WIDTH, WINDOW_HEIGHT, realtime=realtime)
+        while not stop_event.is_set() and (max_frames is None or index < max_frames):
+            success, image = source.read()
+            if not success:
+                if source.finite:
+                    break
+                continue
+
+            detected = source.frame_results()
+            if detected is None:
+                cv2.flip(image, 1, dst=image)
+                if rgb_img is None or rgb_img.shape != image.shape:
+                    rgb_img = np.empty_like(image)
+                cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=rgb_img)
+                detected = hands.process(rgb_img)
+
+            points = np.zeros((0, 21, 3), dtype=np.float32)
+            labels = []
+            if detected.multi_hand_landmarks:
+                points = np.stack([hand_points(landmarks) for landmarks in detected.multi_hand_landmarks])
+                labels = [(h.classification[0].label, float(h.classification[0].score))
+                          for h in detected.multi_handedness]
+
+            timestamp = source.frame_timestamp()
+            results.put((stream_id, index, timestamp, (image.shape[1], image.shape[0]), points, labels))
+            index += 1
+    finally:
+        if source is not None:
+            source.release()
+        if hands is not None:
+            hands.close()
+        results.put((stream_id, None, None, None, None, None))
+
+
+class StreamState:
+    """Gesture state machines and counters of one stream"""
+
+    def __init__(self, stream_id, output):
+        self.stream_id = stream_id
+        self.output = output
+        self.mouse = VirtualMouse(None, None, None, WINDOW_WIDTH, WINDOW_HEIGHT, output)
+        self.keyboard = VirtualKeyboard(None, None, None, WINDOW_WIDTH, WINDOW_HEIGHT, output)
+        self.hand_tracker = HandIdentityTracker()
+        self.camera_img = None
+        self.keyboard_img = np.zeros((WINDOW_HEIGHT, WINDOW_WIDTH, 3), dtype=np.uint8)
+        self.frames = 0
+        self.finished = False
+
+
+class MultiStreamCoordinator:
+    """Runs one inference process per source and routes their results
+
+    output_factory(stream_id) returns the output sink of a stream (by
+    default a CountingOutputSink, which keeps no events so long runs do not
+    grow). cores lists the core of each worker,
+    by default stream i uses core i modulo the number of cores. backend names
+    the landmark model of every worker (see landmark_backends).
+    """
+
+    def __init__(self, sources, output_factory=None, cores=None, realtime=True, max_frames=None,
+                 backend="mediapipe_full"):
+        self.sources = list(sources)
+        output_factory = output_factory or (lambda stream_id: CountingOutputSink())
+        cpu_count = os.cpu_count() or 1
+        self.cores = list(cores) if cores is not None else [i % cpu_count for i in range(len(self.sources))]
+        self.realtime = realtime
+        self.max_frames = max_frames
+        self.streams = [StreamState(i, output_factory(i)) for i in range(len(self.sources))]
+
+        # Spawned, not forked: MediaPipe and OpenCV are not fork safe
+        context = multiprocessing.get_context("spawn")
+        self.results = context.Queue(maxsize=64 * len(self.sources))
+        self.stop_event = context.Event()
+        self.workers = [
+            context.Process(target=inference_worker, name=f"inference-{i}",
+                            args=(i, spec, self.cores[i], self.results, self.stop_event, realtime, max_frames, backend),
+                            daemon=True)
+            for i, spec in enumerate(self.sources)
+        ]
+        self.started_at = None
+        self.elapsed = 0.0
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+
+    def handle(self, stream_id, timestamp, frame_size, points, labels):
+        """Feed one frame of results to the stream's mouse and keyboard"""
+        stream = self.streams[stream_id]
+        if stream.camera_img is None or stream.camera_img.shape[:2] != (frame_size[1], frame_size[0]):
+            stream.camera_img = np.zeros((frame_size[1], frame_size[0], 3), dtype=np.uint8)
+        results = ReplayResults()
+        if len(points):
+            results = ReplayResults([ReplayHandLandmarks(hand) for hand in points],
+                                    [ReplayHandedness(label, score) for label, score in labels])
+        replay_gestures([(timestamp, results)], stream.mouse, stream.keyboard, stream.camera_img, stream.keyboard_img,
+                        stream.hand_tracker)
+        stream.frames += 1
+
+    def run(self, timeout=None):
+        """Route results until every stream has ended (or timeout seconds)
+
+        Throughput is timed from the first result, so process start-up and
+        model loading are not counted.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        try:
+            while not all(stream.finished for stream in self.streams):
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+                try:
+                    stream_id, index, timestamp, frame_size, points, labels = self.results.get(timeout=0.1)
+                except queue.Empty:
+                    if not any(worker.is_alive() for worker in self.workers):
+                        break
+                    continue
+                if self.started_at is None:
+                    self.started_at = time.perf_counter()
+                if index is None:
+                    self.streams[stream_id].finished = True
+                    continue
+                self.handle(stream_id, timestamp, frame_size, points, labels)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self.started_at is not None:
+                self.elapsed = time.perf_counter() - self.started_at
+            self.stop()
+
+    def stop(self):
+        self.stop_event.set()
+        # Drain so workers blocked on a full queue can exit
+        while any(worker.is_alive() for worker in self.workers):
+            try:
+                self.results.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for worker in self.workers:
+            worker.join(timeout=1)
+        for stream in self.streams:
+            stream.output.close()
+
+    @property
+    def total_frames(self):
+        return sum(stream.frames for stream in self.streams)
+
+    def summary_text(self):
+        lines = []
+        for stream in self.streams:
+            fps = stream.frames / self.elapsed if self.elapsed else 0.0
+            line = (f"stream {stream.stream_id} ({self.sources[stream.stream_id]}, core {self.cores[stream.stream_id]}): "
+                    f"{stream.frames} frames, {fps:.1f} fps")
+            if hasattr(stream.output, "event_counts"):
+                line += f", {sum(stream.output.event_counts().values())} events"
+            lines.append(line)
+        total_fps = self.total_frames / self.elapsed if self.elapsed else 0.0
+        lines.append(f"total: {self.total_frames} frames in {self.elapsed:.1f}s, {total_fps:.1f} fps")
+        return "\n".join(lines)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hand gesture control for several camera streams")
+    parser.add_argument("sources", nargs="+",
+                        help="Camera indexes, video files, .jsonl landmark streams or landmark recordings")
+    parser.add_argument("--cores", type=int, nargs="+", default=None,
+                        help="Core to pin each stream's inference process to")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="mediapipe_full",
+                        help="Hand landmark model of every stream (default: %(default)s)")
+    parser.add_argument("--serve-prefix", default=None, metavar="PREFIX",
+                        help="Publish the events of stream i on the Unix socket PREFIX<i>.sock")
+    parser.add_argument("--inject", action="store_true",
+                        help="Send the events to the OS (by default they are only counted)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    servers = []
+    output_factory = None
+    if args.serve_prefix:
+        from event_service import start_service
+
+        def output_factory(stream_id):
+            broadcast, server = start_service(f"{args.serve_prefix}{stream_id}.sock", inject=args.inject)
+            servers.append(server)
+            return broadcast
+    elif args.inject:
+        from output_sinks import OSOutputSink
+
+        def output_factory(stream_id):
+            return AsyncOutputSink(OSOutputSink())
+
+    coordinator = MultiStreamCoordinator(args.sources, output_factory, args.cores, backend=args.backend)
+    coordinator.start()
+    coordinator.run()
+    for server in servers:
+        server.close()
+    print(coordinator.summary_text())
@@ -0,0 +1,376 @@
+import threading
+import time
+from collections import Counter, deque
+
+from pipeline import StageLatency
+from screen_topology import Monitor, enumerate_system_monitors
+
+
+class OSOutputSink:
+    """Sends mouse and keyboard events to the operating system
+
+    pyautogui and pynput are imported here rather than at module level so the
+    rest of the project can be imported on machines without a desktop.
+    """
+
+    def __init__(self):
+        import pyautogui
+        from pynput.keyboard import Controller, Key
+
+        self.pyautogui = pyautogui
+        self.keys = Key
+        self.keyboard = Controller()
+
+        # Initialize PyAutoGUI settings
+        pyautogui.FAILSAFE = False
+        pyautogui.PAUSE = 0.01  # Reduced from 0.1 for faster response
+
+    def screen_size(self):
+        return tuple(self.pyautogui.size())
+
+    def monitors(self):
+        """Monitors of the virtual desktop, primary first (see screen_topology)"""
+        return enumerate_system_monitors(self.screen_size())
+
+    def move_to(self, x, y):
+        self.pyautogui.moveTo(x, y)
+
+    def click(self):
+        self.pyautogui.click()
+
+    def double_click(self):
+        self.pyautogui.doubleClick()
+
+    def right_click(self):
+        self.pyautogui.rightClick()
+
+    def mouse_down(self):
+        self.pyautogui.mouseDown()
+
+    def mouse_up(self):
+        self.pyautogui.mouseUp()
+
+    def scroll(self, dx, dy):
+        """Turn the wheel by whole clicks, dy > 0 up and dx > 0 right"""
+        if dy:
+            self.pyautogui.scroll(dy)
+        if dx:
+            self.pyautogui.hscroll(dx)
+
+    def hotkey(self, *keys):
+        self.pyautogui.hotkey(*keys)
+
+    def tap_key(self, char):
+        """Press and release a printable character"""
+        self.keyboard.press(char)
+        self.keyboard.release(char)
+
+    def tap_special_key(self, name):
+        """Press and release a special key by its pynput Key name (e.g. 'enter')"""
+        special_key = getattr(self.keys, name)
+        self.keyboard.press(special_key)
+        self.keyboard.release(special_key)
+
+    def close(self):
+        pass
+
+
+class RecordingOutputSink:
+    """Stub sink that records the events it would have sent to the OS"""
+
+    def __init__(self, screen_size=(1920, 1080), monitors=None):
+        self._screen_size = tuple(screen_size)
+        # A single primary monitor of screen_size unless a layout is given
+        self._monitors = list(monitors) if monitors else [Monitor(0, 0, *self._screen_size)]
+        self.events = []
+
+    def _record(self, name, *args):
+        self.events.append((name, args))
+
+    def screen_size(self):
+        return self._screen_size
+
+    def monitors(self):
+        return list(self._monitors)
+
+    def move_to(self, x, y):
+        self._record("move_to", x, y)
+
+    def click(self):
+        self._record("click")
+
+    def double_click(self):
+        self._record("double_click")
+
+    def right_click(self):
+        self._record("right_click")
+
+    def mouse_down(self):
+        self._record("mouse_down")
+
+    def mouse_up(self):
+        self._record("mouse_up")
+
+    def scroll(self, dx, dy):
+        self._record("scroll", dx, dy)
+
+    def hotkey(self, *keys):
+        self._record("hotkey", *keys)
+
+    def tap_key(self, char):
+        self._record("tap_key", char)
+
+    def tap_special_key(self, name):
+        self._record("tap_special_key", name)
+
+    def event_counts(self):
+        """Return the number of recorded events per event name"""
+        return Counter(name for name, _ in self.events)
+
+    def reset(self):
+        self.events.clear()
+
+    def close(self):
+        pass
+
+
+class CountingOutputSink(RecordingOutputSink):
+    """Stub sink that only counts the events per name, in constant memory"""
+
+    def __init__(self, screen_size=(1920, 1080), monitors=None):
+        super().__init__(screen_size, monitors)
+        self.counts = Counter()
+
+    def _record(self, name, *args):
+        self.counts[name] += 1
+
+    def event_counts(self):
+        return Counter(self.counts)
+
+    def reset(self):
+        self.counts.clear()
+
+
+# Events that end something the user started (a held button). They are
+# queued even when the queue is full, so a dropped event never leaves the
+# button stuck down. Key taps and hotkeys press and release in one event.
+RELEASE_EVENTS = frozenset({"mouse_up"})
+# Events that do not depend on the cursor position
+KEYBOARD_EVENTS = frozenset({"hotkey", "tap_key", "tap_special_key"})
+
+
+class AsyncOutputSink:
+    """Sends events to another sink from a dedicated output thread
+
+    Calls return immediately and never stall the vision loop for long.
+    Consecutive cursor moves are coalesced so only the latest position is
+    sent, while clicks, holds and key presses keep their order. The queue is
+    bounded: when it is full, a queued cursor move that a later move
+    supersedes (with only key presses in between) is coalesced away first,
+    then the caller waits up to put_timeout seconds for room, and only then
+    is the new event dropped. Releases (RELEASE_EVENTS) are never dropped.
+    Dropped events are counted per event name. The output thread also ticks
+    the scrollers given to drive_scroller and sends their wheel batches like
+    any other event, timed and traced. A sink with a send_at(timestamp,
+    name, *args) method is given the wall-clock time each event was queued.
+    """
+
+    def __init__(self, sink, max_queue=256, tracer=None, put_timeout=0.005):
+        self.sink = sink
+        self.max_queue = max_queue
+        self.put_timeout = put_timeout
+        # Optional EventLatencyTracer, events are recorded once they have been sent
+        self.tracer = tracer
+        self._send_at = getattr(sink, "send_at", None)
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        # Driven scrollers and the trace context of their latest drag, not yet sent
+        self._scrollers = {}
+
+        # Metrics
+        self.latency = StageLatency()  # enqueue to dispatch, per event name
+        self.max_depth = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.drop_counts = Counter()  # per event name
+
+        self._thread = threading.Thread(target=self._run, name="output", daemon=True)
+        self._thread.start()
+
+    def _put(self, name, *args):
+        context = self.tracer.context(name) if self.tracer is not None else None
+        with self._condition:
+            if self._closed:
+                self._drop(name)
+                return
+            if name == "move_to" and self._queue and self._queue[-1][0] == "move_to":
+                # Replace the pending move instead of queueing another one
+                self._queue[-1] = (name, args, self._queue[-1][2], context)
+                self.coalesced += 1
+                return
+            if len(self._queue) >= self.max_queue and not self._make_room(name):
+                self._drop(name)
+                return
+            self._queue.append((name, args, time.perf_counter(), context))
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._condition.notify()
+
+    def _make_room(self, name):
+        """Free a queue slot for name, called with the condition held when the queue is full"""
+        # A move followed by key presses only, then another move (or the new
+        # one), is never seen by a click and can go
+        pending_move = None
+        for i, queued in enumerate(self._queue):
+            if queued[0] == "move_to":
+                if pending_move is not None:
+                    break
+                pending_move = i
+            elif queued[0] not in KEYBOARD_EVENTS:
+                pending_move = None
+        else:
+            if name != "move_to":
+                pending_move = None
+        if pending_move is not None:
+            del self._queue[pending_move]
+            self.coalesced += 1
+            return True
+        if name in RELEASE_EVENTS:
+            # Over the bound rather than leave a button held down
+            return True
+        if name == "move_to":
+            return False
+        self._condition.wait_for(lambda: len(self._queue) < self.max_queue or self._closed, self.put_timeout)
+        return len(self._queue) < self.max_queue and not self._closed
+
+    def _drop(self, name):
+        self.dropped += 1
+        self.drop_counts[name] += 1
+
+    def drive_scroller(self, scroller):
+        """Tick a scrolling.InertialScroller from the output thread while it is active
+
+        Called on every frame that drags it; the first wheel batch sent after
+        a drag is traced from that frame.
+        """
+        context = self.tracer.context("scroll") if self.tracer is not None else None
+        with self._condition:
+            if context is not None or scroller not in self._scrollers:
+                self._scrollers[scroller] = context
+            self._condition.notify()
+
+    def _scroll_delay(self):
+        """Seconds until a scroller is due, None when none is active"""
+        now = time.perf_counter()
+        delays = [delay for delay in (scroller.next_tick(now) for scroller in self._scrollers) if delay is not None]
+        return min(delays) if delays else None
+
+    def _due_scrolls(self):
+        """Wheel batches of the scrollers that are due, as queued events"""
+        now = time.perf_counter()
+        due = []
+        for scroller, context in self._scrollers.items():
+            clicks = scroller.tick(now)
+            if clicks is not None:
+                due.append(("scroll", clicks, now, context))
+                self._scrollers[scroller] = None
+        return due
+
+    def _dispatch(self, name, args, queued_at, context):
+        if self._send_at is not None:
+            # The event's own time, not the time the output thread got to it
+            self._send_at(time.time() - (time.perf_counter() - queued_at), name, *args)
+        else:
+            getattr(self.sink, name)(*args)
+        sent_at = time.perf_counter()
+        self.latency.record(name, sent_at - queued_at)
+        if context is not None:
+            self.tracer.record(context, sent_at)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    delay = self._scroll_delay()
+                    if delay == 0:
+                        break
+                    self._condition.wait(delay)
+                if self._closed and not self._queue:
+                    return
+                event = self._queue.popleft() if self._queue else None
+                scrolls = self._due_scrolls() if self._scrollers else ()
+                self._condition.notify_all()
+            for scroll in scrolls:
+                self._dispatch(*scroll)
+            if event is not None:
+                self._dispatch(*event)
+
+    @property
+    def closed(self):
+        """Whether this sink, or the sink it sends to, has been closed"""
+        return self._closed or getattr(self.sink, "closed", False)
+
+    @property
+    def depth(self):
+        """Number of events waiting to be sent"""
+        return len(self._queue)
+
+    def flush(self, timeout=1.0):
+        """Wait until every queued event has been taken by the output thread"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue, timeout)
+
+    def close(self, timeout=1.0, discard=False):
+        """Send what is still queued (drop it with discard), then stop the output thread"""
+        with self._condition:
+            self._closed = True
+            if discard:
+                for name, *_ in self._queue:
+                    self._drop(name)
+                self._queue.clear()
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        self.sink.close()
+
+    def summary_text(self):
+        dropped = f"dropped {self.dropped}"
+        if self.drop_counts:
+            dropped += " (" + ", ".join(f"{name} {count}" for name, count in self.drop_counts.most_common()) + ")"
+        return (f"queue max {self.max_depth} | coalesced {self.coalesced} | {dropped} | "
+                f"dispatch {self.latency.summary_text()}")
+
+    def screen_size(self):
+        return self.sink.screen_size()
+
+    def monitors(self):
+        return self.sink.monitors()
+
+    def move_to(self, x, y):
+        self._put("move_to", x, y)
+
+    def click(self):
+        self._put("click")
+
+    def double_click(self):
+        self._put("double_click")
+
+    def right_click(self):
+        self._put("right_click")
+
+    def mouse_down(self):
+        self._put("mouse_down")
+
+    def mouse_up(self):
+        self._put("mouse_up")
+
+    def scroll(self, dx, dy):
+        self._put("scroll", dx, dy)
+
+    def hotkey(self, *keys):
+        self._put("hotkey", *keys)
+
+    def tap_key(self, char):
+        self._put("tap_key", char)
+
+    def tap_special_key(self, name):
+        self._put("tap_special_key", name)
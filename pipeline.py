@@ -0,0 +1,269 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import cv2
+
+
+class BufferPool:
+    """Recycles frame buffers so steady-state capture allocates nothing"""
+
+    def __init__(self, max_free=8):
+        self.max_free = max_free
+        self._free = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Return a free buffer, or None when the pool is empty (the source then allocates)"""
+        with self._lock:
+            return self._free.pop() if self._free else None
+
+    def release(self, buffer):
+        with self._lock:
+            if buffer is not None and len(self._free) < self.max_free:
+                self._free.append(buffer)
+
+
+class FramePacket:
+    """A camera frame travelling through the pipeline stages"""
+
+    def __init__(self, index, image, captured_at, timestamp=None, results=None, pool=None):
+        self.index = index
+        self.image = image
+        self.captured_at = captured_at  # perf_counter time, used for latency
+        self.timestamp = timestamp  # source time, used by the gesture handlers
+        self.results = results  # precomputed results skip the inference stage
+        self.pool = pool  # where the image buffer goes back once the frame is done
+
+    @classmethod
+    def from_source(cls, index, source, image, captured_at, pool=None):
+        """Build a packet for the frame a source has just read"""
+        return cls(index, image, captured_at, source.frame_timestamp(), source.frame_results(), pool)
+
+    def release(self):
+        """Hand the image buffer back to its pool, the packet must not be used afterwards"""
+        if self.pool is not None:
+            self.pool.release(self.image)
+            self.pool = None
+        self.image = None
+
+
+class LatestSlot:
+    """Bounded single-slot queue that keeps only the newest item
+
+    on_drop is called with every item replaced before it was consumed.
+    """
+
+    def __init__(self, on_drop=None):
+        self.on_drop = on_drop
+        self._condition = threading.Condition()
+        self._item = None
+        self._has_item = False
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        """Store an item, replacing (and dropping) any item not yet consumed"""
+        with self._condition:
+            if self._has_item:
+                self.dropped += 1
+                if self.on_drop is not None:
+                    self.on_drop(self._item)
+            self._item = item
+            self._has_item = True
+            self._condition.notify_all()
+
+    def get(self, timeout=None):
+        """Wait for the newest item, returns None on timeout or once closed"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._has_item or self._closed, timeout)
+            if not self._has_item:
+                return None
+            item = self._item
+            self._item = None
+            self._has_item = False
+            return item
+
+    def close(self):
+        """Wake up any waiting consumer and refuse to block again"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class StageLatency:
+    """Rolling per-stage latency readout in milliseconds
+
+    window=None keeps every sample, which benchmarks use for percentiles.
+    """
+
+    def __init__(self, window=60):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        """Record one latency sample for a stage"""
+        with self._lock:
+            if stage not in self._samples:
+                self._samples[stage] = deque(maxlen=self.window)
+            self._samples[stage].append(seconds)
+
+    @contextmanager
+    def measure(self, stage):
+        """Time the wrapped block and record it for the stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def averages(self):
+        """Return the rolling average of each stage in milliseconds"""
+        with self._lock:
+            return {
+                stage: 1000 * sum(samples) / len(samples)
+                for stage, samples in self._samples.items()
+                if samples
+            }
+
+    def percentiles(self, percents=(50, 95, 99)):
+        """Return {stage: {percent: ms}} over the kept samples"""
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self._samples.items() if samples}
+        report = {}
+        for stage, samples in snapshot.items():
+            report[stage] = {
+                percent: 1000 * samples[min(len(samples) - 1, int(round(percent / 100 * (len(samples) - 1))))]
+                for percent in percents
+            }
+        return report
+
+    def summary_text(self):
+        """Format the averages as a single readout line"""
+        return " | ".join(f"{stage} {ms:.1f}ms" for stage, ms in self.averages().items())
+
+
+class CaptureWorker(threading.Thread):
+    """Reads the source as fast as it delivers and publishes only the newest frame
+
+    frame_interval, when given, returns the minimum time between two reads
+    (used to lower the frame rate while idle).
+    """
+
+    def __init__(self, source, output_slot, latency, stop_event, pool=None, profiler=None, frame_interval=None):
+        super().__init__(name="capture", daemon=True)
+        self.source = source
+        self.pool = pool
+        self.output_slot = output_slot
+        self.latency = latency
+        self.stop_event = stop_event
+        self.profiler = profiler
+        self.frame_interval = frame_interval
+
+    def run(self):
+        index = 0
+        while not self.stop_event.is_set():
+            start = time.perf_counter()
+            buffer = self.pool.acquire() if self.pool is not None else None
+            success, image = self.source.read(buffer)
+            if not success:
+                if self.pool is not None:
+                    self.pool.release(buffer)
+                if self.source.finite:
+                    break
+                continue
+            captured_at = time.perf_counter()
+            self.latency.record("capture", captured_at - start)
+            if self.profiler is not None:
+                self.profiler.record("capture", captured_at - start, start)
+            self.output_slot.put(FramePacket.from_source(index, self.source, image, captured_at, self.pool))
+            index += 1
+            if self.frame_interval is not None:
+                delay = self.frame_interval() - (time.perf_counter() - start)
+                if delay > 0:
+                    self.stop_event.wait(delay)
+        self.output_slot.close()
+
+
+class InferenceWorker(threading.Thread):
+    """Runs hand detection on the newest captured frame"""
+
+    def __init__(self, process_fn, input_slot, output_slot, latency, stop_event):
+        super().__init__(name="inference", daemon=True)
+        self.process_fn = process_fn
+        self.input_slot = input_slot
+        self.output_slot = output_slot
+        self.latency = latency
+        self.stop_event = stop_event
+
+    def run(self):
+        while not self.stop_event.is_set():
+            packet = self.input_slot.get(timeout=0.1)
+            if packet is None:
+                if self.input_slot.closed:
+                    break
+                continue
+            with self.latency.measure("inference"):
+                self.process_fn(packet)
+            self.output_slot.put(packet)
+        self.output_slot.close()
+
+
+class ThreadedPipeline:
+    """Capture -> inference -> render pipeline joined by single-slot queues
+
+    The render/output stage runs in the calling thread because OpenCV
+    windows have to be driven from the main thread.
+    """
+
+    def __init__(self, source, process_fn, latency, pool=None, profiler=None, frame_interval=None):
+        self.latency = latency
+        self.stop_event = threading.Event()
+        # Dropped frames give their buffers back to the pool
+        self.captured = LatestSlot(on_drop=FramePacket.release)
+        self.inferred = LatestSlot(on_drop=FramePacket.release)
+        self.capture_worker = CaptureWorker(source, self.captured, latency, self.stop_event, pool, profiler,
+                                            frame_interval)
+        self.inference_worker = InferenceWorker(
+            process_fn, self.captured, self.inferred, latency, self.stop_event
+        )
+
+    def start(self):
+        self.capture_worker.start()
+        self.inference_worker.start()
+
+    def frames(self):
+        """Yield inferred packets until the pipeline is stopped"""
+        while not self.stop_event.is_set():
+            packet = self.inferred.get(timeout=0.1)
+            if packet is None:
+                if self.inferred.closed:
+                    return
+                continue
+            yield packet
+
+    @property
+    def dropped_frames(self):
+        return self.captured.dropped + self.inferred.dropped
+
+    def stop(self):
+        self.stop_event.set()
+        self.captured.close()
+        self.inferred.close()
+        self.capture_worker.join(timeout=1)
+        self.inference_worker.join(timeout=1)
+
+
+def draw_latency(img, latency, dropped_frames=None):
+    """Overlay the per-stage latency readout at the bottom of an image"""
+    text = latency.summary_text()
+    if dropped_frames is not None:
+        text += f" | dropped {dropped_frames}"
+    cv2.putText(img, text, (10, img.shape[0] - 10),
+                cv2.FONT_HERSHEY_PLAIN, 1, (0, 255, 255), 1)
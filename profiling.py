@@ -0,0 +1,178 @@
+"""Fine-grained stage profiling with an on-screen HUD and trace export
+
+A StageProfiler is shared by MouseAndKeyboard, VirtualMouse and
+VirtualKeyboard. Each named stage keeps its most recent durations in a
+fixed-size NumPy ring buffer, from which averages, percentiles and
+histograms are computed on demand. When the profiler is disabled measure()
+returns a shared no-op context manager, so instrumented code costs a method
+call and nothing else.
+"""
+import csv
+import json
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import cv2
+import numpy as np
+
+_NO_TIMING = nullcontext()
+
+
+class RingBuffer:
+    """Fixed-size float64 buffer keeping the last capacity values"""
+
+    def __init__(self, capacity):
+        self.data = np.zeros(capacity)
+        self.count = 0
+
+    def append(self, value):
+        self.data[self.count % len(self.data)] = value
+        self.count += 1
+
+    def values(self):
+        """Kept values, oldest first"""
+        capacity = len(self.data)
+        if self.count <= capacity:
+            return self.data[:self.count].copy()
+        split = self.count % capacity
+        return np.concatenate((self.data[split:], self.data[:split]))
+
+
+class _StageTimer:
+    """Reusable timer for one stage; a stage must not be nested in itself"""
+
+    __slots__ = ("profiler", "stage", "start")
+
+    def __init__(self, profiler, stage):
+        self.profiler = profiler
+        self.stage = stage
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.stage, time.perf_counter() - self.start, self.start)
+        return False
+
+
+class StageProfiler:
+    """Per-stage timings in ring buffers, plus an optional bounded event trace
+
+    capacity samples are kept per stage for the HUD and the summary. When
+    trace_capacity is set, every measured block is also kept as a trace event
+    (up to trace_capacity of the most recent ones) for export_trace.
+    """
+
+    def __init__(self, enabled=False, capacity=256, trace_capacity=None):
+        self.enabled = enabled
+        self.capacity = capacity
+        self._stages = {}
+        self._timers = {}
+        self._frames = RingBuffer(capacity)
+        self._lock = threading.Lock()
+        self.trace = deque(maxlen=trace_capacity) if trace_capacity else None
+
+    def measure(self, stage):
+        """Context manager timing the wrapped block as the given stage"""
+        if not self.enabled:
+            return _NO_TIMING
+        timer = self._timers.get(stage)
+        if timer is None:
+            timer = self._timers.setdefault(stage, _StageTimer(self, stage))
+        return timer
+
+    def record(self, stage, seconds, start=None):
+        """Record one duration for a stage"""
+        if not self.enabled:
+            return
+        samples = self._stages.get(stage)
+        if samples is None:
+            with self._lock:
+                samples = self._stages.setdefault(stage, RingBuffer(self.capacity))
+        samples.append(seconds)
+        if self.trace is not None:
+            if start is None:
+                start = time.perf_counter() - seconds
+            self.trace.append((stage, start, seconds, threading.current_thread().name))
+
+    def frame_done(self):
+        """Mark the end of a displayed frame, used for the fps readout"""
+        if self.enabled:
+            self._frames.append(time.perf_counter())
+
+    def fps(self):
+        frames = self._frames.values()
+        if len(frames) < 2 or frames[-1] <= frames[0]:
+            return 0.0
+        return (len(frames) - 1) / (frames[-1] - frames[0])
+
+    def stages(self):
+        with self._lock:
+            return dict(self._stages)
+
+    def percentiles(self, percents=(50, 95, 99)):
+        """Return {stage: {percent: ms}} over the kept samples"""
+        report = {}
+        for stage, samples in self.stages().items():
+            values = samples.values()
+            if len(values):
+                report[stage] = dict(zip(percents, 1000 * np.percentile(values, percents)))
+        return report
+
+    def averages(self):
+        """Return the average of each stage in milliseconds"""
+        return {stage: 1000 * float(samples.values().mean())
+                for stage, samples in self.stages().items() if samples.count}
+
+    def histogram(self, stage, bins=20):
+        """Return (counts, edges in ms) of the kept samples of a stage"""
+        samples = self.stages().get(stage)
+        values = samples.values() if samples is not None else np.zeros(0)
+        counts, edges = np.histogram(1000 * values, bins=bins)
+        return counts, edges
+
+    def summary_text(self):
+        """One line per stage: median (p50), p95 and max in milliseconds"""
+        lines = []
+        for stage, p in sorted(self.percentiles((50, 95, 100)).items()):
+            lines.append(f"{stage:<24} p50 {p[50]:7.2f}ms  p95 {p[95]:7.2f}ms  max {p[100]:7.2f}ms")
+        return "\n".join(lines)
+
+    def draw_hud(self, img, dropped_frames=None):
+        """Overlay fps, dropped frames and per-stage p50/p95 in the top right corner"""
+        lines = [f"{self.fps():5.1f} fps"]
+        if dropped_frames is not None:
+            lines[0] += f" | dropped {dropped_frames}"
+        for stage, p in sorted(self.percentiles((50, 95)).items()):
+            lines.append(f"{stage} {p[50]:.1f}/{p[95]:.1f}ms")
+
+        x = img.shape[1] - 260
+        for i, line in enumerate(lines):
+            y = 15 + 14 * i
+            cv2.putText(img, line, (x, y), cv2.FONT_HERSHEY_PLAIN, 0.9, (0, 0, 0), 3)
+            cv2.putText(img, line, (x, y), cv2.FONT_HERSHEY_PLAIN, 0.9, (255, 255, 0), 1)
+
+    def export_trace(self, path):
+        """Write the trace to a .csv file, or to .json in Chrome trace format
+
+        The JSON file opens in chrome://tracing or Perfetto, one track per thread.
+        """
+        events = list(self.trace or ())
+        if path.endswith(".json"):
+            trace_events = [
+                {"name": stage, "ph": "X", "ts": 1e6 * start, "dur": 1e6 * seconds, "pid": 0, "tid": thread}
+                for stage, start, seconds, thread in events
+            ]
+            with open(path, "w") as f:
+                json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["stage", "start_s", "duration_ms", "thread"])
+                for stage, start, seconds, thread in events:
+                    writer.writerow([stage, f"{start:.6f}", f"{1000 * seconds:.3f}", thread])
+        return len(events)
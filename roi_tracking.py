@@ -0,0 +1,193 @@
+import time
+
+import cv2
+import numpy as np
+
+from landmark_array import hand_points
+
+
+class RegionOfInterest:
+    """Pixel rectangle of the frame that is sent to hand detection"""
+
+    __slots__ = ("x0", "y0", "x1", "y1")
+
+    def __init__(self, x0, y0, x1, y1):
+        self.x0, self.y0, self.x1, self.y1 = x0, y0, x1, y1
+
+    @property
+    def width(self):
+        return self.x1 - self.x0
+
+    @property
+    def height(self):
+        return self.y1 - self.y0
+
+    def contains(self, other):
+        return (self.x0 <= other.x0 and self.y0 <= other.y0
+                and other.x1 <= self.x1 and other.y1 <= self.y1)
+
+
+class RoiHandTracker:
+    """Runs hand detection on a crop around the hands seen in the previous frame
+
+    The crop is the previous landmark bounding box grown by a margin and by
+    how far the hands moved since the frame before, then downsampled so its
+    longest side is at most max_side pixels. Landmarks are mapped back to
+    full-frame coordinates, so VirtualMouse and VirtualKeyboard see no
+    difference. The crop is kept as long as the hands stay inside it, which
+    also keeps MediaPipe's own frame-to-frame tracking valid.
+
+    The full frame is used when nothing is tracked, when the crop loses the
+    hands (the same frame is then re-run on the full frame), and every
+    refresh_interval frames while fewer than max_hands are tracked so new
+    hands can be found.
+    """
+
+    def __init__(self, max_hands=2, margin=0.25, velocity_gain=2.0, max_side=256,
+                 min_area_ratio=0.6, refresh_interval=15):
+        self.max_hands = max_hands
+        self.margin = margin  # fraction of the box size added on every side
+        self.velocity_gain = velocity_gain  # frames of motion added in the direction of travel
+        self.max_side = max_side
+        self.min_area_ratio = min_area_ratio  # ROIs covering more of the frame run full frame
+        self.refresh_interval = refresh_interval
+
+        self.roi = None
+        self.prev_box = None
+        self.tracked_hands = 0
+        self.frames_since_full = 0
+
+        # Counters
+        self.frames = 0
+        self.roi_frames = 0
+        self.roi_hits = 0
+        self.fallbacks = 0
+        self.full_frame_time = None  # running average of full-frame inference time
+        self.roi_time = 0.0
+        # Net inference time saved: full-frame time minus ROI time on hits,
+        # minus the wasted ROI time on fallbacks
+        self.saved_time = 0.0
+
+    def reset(self):
+        self.roi = None
+        self.prev_box = None
+        self.tracked_hands = 0
+
+    def process(self, hands, rgb_img):
+        """Detect hands on the ROI when possible, returns full-frame results"""
+        self.frames += 1
+        h, w = rgb_img.shape[:2]
+
+        use_roi = self.roi is not None and not (
+            self.tracked_hands < self.max_hands and self.frames_since_full >= self.refresh_interval
+        )
+        if use_roi:
+            self.roi_frames += 1
+            start = time.perf_counter()
+            results = self._process_roi(hands, rgb_img, self.roi)
+            elapsed = time.perf_counter() - start
+            self.roi_time += elapsed
+
+            if results.multi_hand_landmarks and len(results.multi_hand_landmarks) >= self.tracked_hands:
+                self.roi_hits += 1
+                self.frames_since_full += 1
+                if self.full_frame_time is not None:
+                    self.saved_time += self.full_frame_time - elapsed
+                self._update(results, w, h)
+                return results
+
+            # Tracking lost in the crop, run this frame again on the full frame
+            self.fallbacks += 1
+            self.saved_time -= elapsed
+
+        start = time.perf_counter()
+        results = hands.process(rgb_img)
+        elapsed = time.perf_counter() - start
+        if self.full_frame_time is None:
+            self.full_frame_time = elapsed
+        else:
+            self.full_frame_time += 0.1 * (elapsed - self.full_frame_time)
+        self.frames_since_full = 0
+        self._update(results, w, h)
+        return results
+
+    def _process_roi(self, hands, rgb_img, roi):
+        crop = rgb_img[roi.y0:roi.y1, roi.x0:roi.x1]
+        scale = min(1.0, self.max_side / max(roi.width, roi.height))
+        if scale < 1.0:
+            crop = cv2.resize(crop, (max(1, int(roi.width * scale)), max(1, int(roi.height * scale))),
+                              interpolation=cv2.INTER_AREA)
+        else:
+            crop = np.ascontiguousarray(crop)
+
+        results = hands.process(crop)
+        if results.multi_hand_landmarks:
+            # Map crop-normalized landmarks back to full-frame normalized coordinates
+            h, w = rgb_img.shape[:2]
+            sx, sy = roi.width / w, roi.height / h
+            ox, oy = roi.x0 / w, roi.y0 / h
+            for hand_landmarks in results.multi_hand_landmarks:
+                points = getattr(hand_landmarks, "array", None)
+                if points is not None:
+                    # Landmark backends return arrays, map them in place
+                    points *= (sx, sy, sx)
+                    points[:, :2] += (ox, oy)
+                    continue
+                for landmark in hand_landmarks.landmark:
+                    landmark.x = ox + landmark.x * sx
+                    landmark.y = oy + landmark.y * sy
+                    landmark.z = landmark.z * sx
+        return results
+
+    def _update(self, results, w, h):
+        """Choose the ROI for the next frame from this frame's landmarks"""
+        if not results.multi_hand_landmarks:
+            self.reset()
+            return
+
+        self.tracked_hands = len(results.multi_hand_landmarks)
+        points = np.concatenate([hand_points(hand) for hand in results.multi_hand_landmarks])
+        low, high = points[:, :2].min(axis=0), points[:, :2].max(axis=0)
+        box = (float(low[0]) * w, float(low[1]) * h, float(high[0]) * w, float(high[1]) * h)
+
+        # Grow by the margin and by the motion since the previous box
+        bw, bh = box[2] - box[0], box[3] - box[1]
+        dx = dy = 0.0
+        if self.prev_box is not None:
+            dx = (box[0] + box[2] - self.prev_box[0] - self.prev_box[2]) / 2
+            dy = (box[1] + box[3] - self.prev_box[1] - self.prev_box[3]) / 2
+        self.prev_box = box
+
+        grow_x, grow_y = self.margin * bw, self.margin * bh
+        needed = RegionOfInterest(
+            max(0, int(box[0] - grow_x + min(0.0, dx) * self.velocity_gain)),
+            max(0, int(box[1] - grow_y + min(0.0, dy) * self.velocity_gain)),
+            min(w, int(box[2] + grow_x + max(0.0, dx) * self.velocity_gain)),
+            min(h, int(box[3] + grow_y + max(0.0, dy) * self.velocity_gain)),
+        )
+
+        if needed.width * needed.height > self.min_area_ratio * w * h:
+            # Hardly smaller than the frame, not worth cropping
+            self.roi = None
+        elif self.roi is None or not self.roi.contains(needed):
+            # Leave room to move so the crop does not change every frame
+            pad_x, pad_y = needed.width // 4, needed.height // 4
+            self.roi = RegionOfInterest(
+                max(0, needed.x0 - pad_x), max(0, needed.y0 - pad_y),
+                min(w, needed.x1 + pad_x), min(h, needed.y1 + pad_y),
+            )
+
+    def stats(self):
+        """Return the ROI hit rate and net inference time saved"""
+        return {
+            "frames": self.frames,
+            "roi_frames": self.roi_frames,
+            "roi_hit_rate": self.roi_hits / self.frames if self.frames else 0.0,
+            "fallbacks": self.fallbacks,
+            "saved_ms": 1000 * self.saved_time,
+        }
+
+    def summary_text(self):
+        stats = self.stats()
+        return (f"ROI hits {100 * stats['roi_hit_rate']:.0f}% | fallbacks {stats['fallbacks']}"
+                f" | net saved {stats['saved_ms']:.0f}ms")
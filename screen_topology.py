@@ -0,0 +1,196 @@
+"""Monitor layout of the desktop the cursor moves on
+
+Monitor geometry is in the coordinates the output sink's move_to uses, with
+the virtual desktop spanning every monitor (secondary monitors may sit at
+negative coordinates). ScreenTopologyProvider enumerates the monitors once
+and then again every refresh_interval seconds on a background thread, so it
+can be asked for the topology on every frame without the vision thread ever
+waiting for the system.
+"""
+import threading
+import time
+
+
+class Monitor:
+    """Rectangle of one monitor on the virtual desktop"""
+
+    __slots__ = ("x", "y", "width", "height", "scale", "name")
+
+    def __init__(self, x, y, width, height, scale=1.0, name=""):
+        self.x, self.y = int(x), int(y)
+        self.width, self.height = int(width), int(height)
+        self.scale = scale  # DPI scale factor reported by the system
+        self.name = name
+
+    @property
+    def right(self):
+        return self.x + self.width
+
+    @property
+    def bottom(self):
+        return self.y + self.height
+
+    def key(self):
+        return (self.x, self.y, self.width, self.height, self.scale, self.name)
+
+    def __eq__(self, other):
+        return isinstance(other, Monitor) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return f"Monitor({self.x}, {self.y}, {self.width}, {self.height}, scale={self.scale}, name={self.name!r})"
+
+
+class ScreenTopology:
+    """Immutable set of monitors, the first one being the primary monitor"""
+
+    def __init__(self, monitors):
+        if not monitors:
+            raise ValueError("A screen topology needs at least one monitor")
+        self.monitors = tuple(monitors)
+
+        # Bounding box of the virtual desktop
+        x0 = min(m.x for m in self.monitors)
+        y0 = min(m.y for m in self.monitors)
+        x1 = max(m.right for m in self.monitors)
+        y1 = max(m.bottom for m in self.monitors)
+        self.bounds = (x0, y0, x1 - x0, y1 - y0)
+
+    @property
+    def primary(self):
+        return self.monitors[0]
+
+    def monitor_at(self, x, y):
+        """Return the monitor containing the point, or None"""
+        for monitor in self.monitors:
+            if monitor.x <= x < monitor.right and monitor.y <= y < monitor.bottom:
+                return monitor
+        return None
+
+    def covers_bounds(self):
+        """Whether the monitors fill their bounding box, leaving no dead corners
+
+        Overlapping (mirrored) monitors count once: the box is cut into cells
+        along every monitor edge and each cell must lie on a monitor.
+        """
+        xs = sorted({m.x for m in self.monitors} | {m.right for m in self.monitors})
+        ys = sorted({m.y for m in self.monitors} | {m.bottom for m in self.monitors})
+        for x in xs[:-1]:
+            for y in ys[:-1]:
+                # A monitor covers either all of a cell or none of it
+                if self.monitor_at(x, y) is None:
+                    return False
+        return True
+
+    def clamp(self, x, y):
+        """The point itself when it is on a monitor, else the nearest point on a monitor"""
+        best = None
+        best_distance = float("inf")
+        for monitor in self.monitors:
+            nearest_x = min(max(x, monitor.x), monitor.right - 1)
+            nearest_y = min(max(y, monitor.y), monitor.bottom - 1)
+            distance = (nearest_x - x) ** 2 + (nearest_y - y) ** 2
+            if distance < best_distance:
+                best = (nearest_x, nearest_y)
+                best_distance = distance
+        return best
+
+    def __eq__(self, other):
+        return isinstance(other, ScreenTopology) and self.monitors == other.monitors
+
+    def __hash__(self):
+        return hash(self.monitors)
+
+
+def enumerate_system_monitors(screen_size):
+    """List the monitors of this machine, primary first
+
+    Uses the optional screeninfo package. Without it, or when it finds no
+    monitor (e.g. on a headless box), only the primary screen of the given
+    size is returned. screeninfo reports physical pixels; when the cursor
+    space of the output sink is scaled (high-DPI displays on macOS, or a
+    process that is not DPI aware on Windows), the primary monitor does not
+    match screen_size and every monitor is scaled by the same ratio.
+    """
+    width, height = screen_size
+    try:
+        import screeninfo
+        found = screeninfo.get_monitors()
+    except Exception:
+        found = []
+    if not found:
+        return [Monitor(0, 0, width, height)]
+
+    found = sorted(found, key=lambda m: not getattr(m, "is_primary", False))
+    ratio = width / found[0].width if found[0].width else 1.0
+    return [
+        Monitor(m.x * ratio, m.y * ratio, m.width * ratio, m.height * ratio,
+                scale=1.0 / ratio, name=m.name or "")
+        for m in found
+    ]
+
+
+class ScreenTopologyProvider:
+    """Cached screen topology, enumerated again every refresh_interval seconds
+
+    enumerate_monitors is called without arguments and returns the list of
+    Monitor objects. version is increased every time the topology changes.
+    Only the first call of topology() enumerates on the calling thread; later
+    refreshes run on a background thread (unless background is False) and
+    topology() keeps returning the cached layout until one has finished.
+    """
+
+    def __init__(self, enumerate_monitors, refresh_interval=2.0, background=True):
+        self.enumerate_monitors = enumerate_monitors
+        self.refresh_interval = refresh_interval
+        self.background = background
+        self.version = 0
+        self._topology = None
+        self._checked_at = float('-inf')
+        self._lock = threading.Lock()
+        self._refreshing = None
+
+    def topology(self):
+        """Return the current topology, starting a refresh when it is due"""
+        if time.monotonic() - self._checked_at >= self.refresh_interval:
+            if self._topology is None or not self.background:
+                self.refresh()
+            elif self._refreshing is None or not self._refreshing.is_alive():
+                self._checked_at = time.monotonic()
+                self._refreshing = threading.Thread(target=self.refresh, name="screen-topology", daemon=True)
+                self._refreshing.start()
+        return self._topology
+
+    def refresh(self):
+        """Enumerate the monitors now, returns True when the topology changed"""
+        self._checked_at = time.monotonic()
+        try:
+            topology = ScreenTopology(self.enumerate_monitors())
+        except ValueError:
+            # No monitor listed, keep the last layout when there is one
+            if self._topology is None:
+                raise
+            return False
+        with self._lock:
+            if topology == self._topology:
+                return False
+            self._topology = topology
+            self.version += 1
+        return True
+
+
+class FakeScreenTopology(ScreenTopologyProvider):
+    """Topology with a fixed list of monitors, for headless runs and tests
+
+    Refreshed synchronously on every call, so a change is seen at once.
+    """
+
+    def __init__(self, monitors):
+        self.monitors = list(monitors)
+        super().__init__(lambda: self.monitors, refresh_interval=0.0, background=False)
+
+    def set_monitors(self, monitors):
+        """Simulate monitors being plugged, unplugged or changing resolution"""
+        self.monitors = list(monitors)
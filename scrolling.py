@@ -0,0 +1,123 @@
+"""Inertial scrolling with batched wheel events
+
+Sending one wheel event per frame floods the OS event queue, and a hand
+moving slowly produces less than one wheel click per frame. InertialScroller
+integrates a scroll velocity into a fractional accumulator and hands out the
+whole clicks in batches, at most max_rate times a second. After release the
+velocity decays exponentially, so a flick keeps scrolling for a moment.
+
+The scroller is ticked by AsyncOutputSink's output thread when the mouse
+sends through one (see AsyncOutputSink.drive_scroller), so the decay goes
+on between frames and after the hand is gone. With a synchronous sink
+VirtualMouse ticks it with the frame timestamps instead, which keeps
+replays deterministic.
+"""
+import math
+import threading
+
+IDLE = "idle"
+DRAGGING = "dragging"
+COASTING = "coasting"
+
+
+class InertialScroller:
+    """Turns a scroll velocity into batched wheel events
+
+    drag() sets the velocity in wheel clicks per second (x right, y up)
+    while the scroll gesture is held; release() lets it coast, decaying
+    with a time constant of decay seconds until it falls below min_speed.
+    drag and release come from the gesture thread, tick from the output
+    thread.
+    """
+
+    def __init__(self, max_rate=20.0, decay=0.35, min_speed=2.0):
+        self.max_rate = max_rate
+        self.decay = decay
+        self.min_speed = min_speed
+
+        self.state = IDLE
+        self.velocity = (0.0, 0.0)
+        self._remainder = [0.0, 0.0]
+        self._last_tick = None
+        self._last_emit = None
+        self._lock = threading.Lock()
+
+        # Counters
+        self.batches = 0
+        self.clicks = 0
+
+    @property
+    def active(self):
+        return self.state != IDLE
+
+    def drag(self, vx, vy):
+        with self._lock:
+            self.velocity = (vx, vy)
+            self.state = DRAGGING
+
+    def release(self, velocity=None):
+        """Let a drag coast, from velocity when given (e.g. a flick's peak)"""
+        with self._lock:
+            if self.state == DRAGGING:
+                self.state = COASTING
+                if velocity is not None:
+                    self.velocity = velocity
+
+    def stop(self):
+        """Stop at once, dropping the fractional clicks"""
+        with self._lock:
+            self._stop()
+
+    def _stop(self):
+        self.state = IDLE
+        self.velocity = (0.0, 0.0)
+        self._remainder = [0.0, 0.0]
+        self._last_tick = None
+        self._last_emit = None
+
+    def next_tick(self, now):
+        """Seconds until the next batch can be sent, None while idle"""
+        if self.state == IDLE:
+            return None
+        if self._last_emit is None:
+            return 0.0
+        return max(0.0, self._last_emit + 1.0 / self.max_rate - now)
+
+    def tick(self, now):
+        """Advance to time now, returns (dx, dy) whole wheel clicks to send or None"""
+        with self._lock:
+            if self.state == IDLE:
+                return None
+            if self._last_tick is None:
+                self._last_tick = self._last_emit = now
+                return None
+            dt = now - self._last_tick
+            if dt <= 0:
+                return None
+            self._last_tick = now
+
+            vx, vy = self.velocity
+            if self.state == COASTING:
+                # Exact integral of the exponential decay over dt
+                factor = math.exp(-dt / self.decay)
+                travel = self.decay * (1.0 - factor)
+                self.velocity = (vx * factor, vy * factor)
+            else:
+                travel = dt
+            self._remainder[0] += vx * travel
+            self._remainder[1] += vy * travel
+
+            if now - self._last_emit < 1.0 / self.max_rate:
+                return None
+            self._last_emit = now
+            dx = int(self._remainder[0])
+            dy = int(self._remainder[1])
+            self._remainder[0] -= dx
+            self._remainder[1] -= dy
+            if self.state == COASTING and math.hypot(*self.velocity) < self.min_speed:
+                self._stop()
+            if not dx and not dy:
+                return None
+            self.batches += 1
+            self.clicks += abs(dx) + abs(dy)
+            return dx, dy
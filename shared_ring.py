@@ -0,0 +1,214 @@
+"""Shared-memory ring buffer of camera frames and hand landmarks
+
+One producer (the vision loop) publishes every frame with its landmarks into
+a multiprocessing.shared_memory block; any number of consumer processes read
+the newest entry as zero-copy NumPy views, without pickling or locks.
+
+Layout of the block (all arrays are views of the same buffer):
+
+    header      int64   (8,)                     magic, slots, height, width, channels, max_hands, latest seq, -
+    seqs        int64   (slots,)                 sequence number held by each slot, -1 while being written
+    timestamps  float64 (slots,)
+    handedness  int8    (slots, max_hands)       -1 none, 0 Left, 1 Right
+    landmarks   float32 (slots, max_hands, 21, 3)
+    frames      uint8   (slots, height, width, channels)
+
+Protocol: entry n goes into slot n % slots. The producer marks the slot -1,
+writes the data, stores n in the slot and finally publishes n as the latest
+sequence. A consumer reads the latest sequence, checks the slot holds it,
+and uses the views; the data stays valid until the producer wraps around to
+the same slot, which still_valid(seq) tells. Readers that need the data for
+longer copy it (read_latest(copy=True)). On weakly ordered CPUs (ARM) the
+ordering of plain stores is not guaranteed, so consumers there should
+always check still_valid after use.
+
+    python shared_ring.py NAME   # show the frames of a running producer
+"""
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import cv2
+import numpy as np
+
+from landmark_array import LandmarkArray
+from landmark_recording import HANDEDNESS_LABELS, NUM_LANDMARKS
+
+MAGIC = 0x48414E44  # "HAND"
+HEADER_FIELDS = 8
+LATEST = 6  # header index of the latest published sequence
+
+
+def _layout(slots, frame_shape, max_hands):
+    """Byte offsets and shapes of every array in the block"""
+    arrays = [
+        ("header", np.int64, (HEADER_FIELDS,)),
+        ("seqs", np.int64, (slots,)),
+        ("timestamps", np.float64, (slots,)),
+        ("handedness", np.int8, (slots, max_hands)),
+        ("landmarks", np.float32, (slots, max_hands, NUM_LANDMARKS, 3)),
+        ("frames", np.uint8, (slots,) + tuple(frame_shape)),
+    ]
+    layout = []
+    offset = 0
+    for name, dtype, shape in arrays:
+        # Keep every array 64-byte aligned
+        offset = (offset + 63) // 64 * 64
+        layout.append((name, dtype, shape, offset))
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return layout, offset
+
+
+class SharedFrameRing:
+    """Ring buffer of frames and landmarks in shared memory
+
+    Create it in the producer with SharedFrameRing.create(...) and attach to
+    it from consumers with SharedFrameRing.attach(name).
+    """
+
+    def __init__(self, shm, slots, frame_shape, max_hands, owner):
+        self.shm = shm
+        self.slots = slots
+        self.frame_shape = tuple(frame_shape)
+        self.max_hands = max_hands
+        self.owner = owner
+
+        layout, _ = _layout(slots, frame_shape, max_hands)
+        for name, dtype, shape, offset in layout:
+            setattr(self, name, np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset))
+
+        self.next_seq = 0
+        self._hand = LandmarkArray()
+
+    @classmethod
+    def create(cls, name=None, slots=4, frame_shape=(480, 640, 3), max_hands=2):
+        _, size = _layout(slots, frame_shape, max_hands)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        ring = cls(shm, slots, frame_shape, max_hands, owner=True)
+        ring.seqs[:] = -1
+        ring.handedness[:] = -1
+        ring.header[:] = (MAGIC, slots, *frame_shape, max_hands, -1, 0)
+        return ring
+
+    @classmethod
+    def attach(cls, name, untrack=True):
+        """Attach to an existing ring
+
+        Python's resource tracker would unlink the block when the consumer
+        exits; untrack prevents that. Pass untrack=False in processes started
+        by the producer through multiprocessing, which share its tracker.
+        """
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            if untrack:
+                resource_tracker.unregister(shm._name, "shared_memory")
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        if header[0] != MAGIC:
+            shm.close()
+            raise ValueError(f"{name} is not a frame ring")
+        slots, height, width, channels, max_hands = (int(v) for v in header[1:6])
+        return cls(shm, slots, (height, width, channels), max_hands, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish(self, image, results=None, timestamp=None):
+        """Producer: write one frame and its hand results, returns its sequence number
+
+        Frames of another size are resized into the slot.
+        """
+        seq = self.next_seq
+        slot = seq % self.slots
+        self.seqs[slot] = -1
+
+        frame = self.frames[slot]
+        if image.shape == self.frame_shape:
+            np.copyto(frame, image)
+        else:
+            cv2.resize(image, (self.frame_shape[1], self.frame_shape[0]), dst=frame)
+        self.timestamps[slot] = time.time() if timestamp is None else timestamp
+
+        handedness = self.handedness[slot]
+        handedness[:] = -1
+        if results is not None and results.multi_hand_landmarks:
+            hands = zip(results.multi_hand_landmarks, results.multi_handedness)
+            for i, (hand_landmarks, hand_handedness) in enumerate(hands):
+                if i >= self.max_hands:
+                    break
+                self.landmarks[slot, i] = self._hand.fill(hand_landmarks).points
+                handedness[i] = HANDEDNESS_LABELS.index(hand_handedness.classification[0].label)
+
+        self.seqs[slot] = seq
+        self.header[LATEST] = seq
+        self.next_seq = seq + 1
+        return seq
+
+    def latest_seq(self):
+        return int(self.header[LATEST])
+
+    def read_latest(self, copy=False):
+        """Consumer: return (seq, timestamp, frame, landmarks, handedness) or None
+
+        frame, landmarks and handedness are views into shared memory unless
+        copy is set; check still_valid(seq) after using them.
+        """
+        for _ in range(100):
+            seq = self.latest_seq()
+            if seq < 0:
+                return None
+            slot = seq % self.slots
+            if self.seqs[slot] != seq:
+                continue  # overwritten between the two reads, take the newer one
+            frame, landmarks, handedness = self.frames[slot], self.landmarks[slot], self.handedness[slot]
+            timestamp = float(self.timestamps[slot])
+            if copy:
+                frame, landmarks, handedness = frame.copy(), landmarks.copy(), handedness.copy()
+                if not self.still_valid(seq):
+                    continue
+            return seq, timestamp, frame, landmarks, handedness
+        # The producer keeps overwriting the slot under us (or died while writing it)
+        return None
+
+    def still_valid(self, seq):
+        """Whether the slot of seq has not been overwritten since it was read"""
+        return self.seqs[seq % self.slots] == seq
+
+    def wait_for(self, after_seq, timeout=1.0, poll=0.001):
+        """Consumer: wait until an entry newer than after_seq is published"""
+        deadline = time.monotonic() + timeout
+        while self.latest_seq() <= after_seq:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+        return True
+
+    def close(self):
+        """Detach; the producer also frees the shared memory"""
+        # Drop the views before closing the buffer they point into
+        for name in ("header", "seqs", "timestamps", "handedness", "landmarks", "frames"):
+            setattr(self, name, None)
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+if __name__ == "__main__":
+    ring = SharedFrameRing.attach(sys.argv[1])
+    seq = -1
+    try:
+        while ring.wait_for(seq, timeout=5.0):
+            entry = ring.read_latest(copy=True)
+            if entry is None:
+                continue
+            seq, timestamp, frame, landmarks, handedness = entry
+            hands = ", ".join(HANDEDNESS_LABELS[h] for h in handedness if h >= 0) or "no hands"
+            cv2.putText(frame, f"#{seq} {hands}", (10, 20), cv2.FONT_HERSHEY_PLAIN, 1, (0, 255, 255), 1)
+            cv2.imshow(f"Frame ring {sys.argv[1]}", frame)
+            if cv2.waitKey(1) == ord('q'):
+                break
+    finally:
+        ring.close()
+        cv2.destroyAllWindows()
@@ -1,3 +1,4 @@
+import argparse
 import cv2
 import mediapipe as mp
 import numpy as np
@@ -11,11 +12,12 @@ class VirtualMouse:
         "Right": "Right",
     }
 
-    def __init__(self):
+    def __init__(self, model_complexity=1):
         # Initialize MediaPipe Hand tracking
         self.mp_hands = mp.solutions.hands
         self.hands = self.mp_hands.Hands(
             max_num_hands=1,
+            model_complexity=model_complexity,  # 0 is the lighter, faster model
             min_detection_confidence=0.7,
             min_tracking_confidence=0.7
         )
@@ -225,5 +227,8 @@ class VirtualMouse:
         cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    virtual_mouse = VirtualMouse()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-complexity", type=int, choices=(0, 1), default=1,
+                        help="MediaPipe Hands model, 0 is faster and less accurate (default: 1)")
+    virtual_mouse = VirtualMouse(parser.parse_args().model_complexity)
     virtual_mouse.run()
@@ -0,0 +1,83 @@
+"""Fast startup helpers: lazy modules, background tasks and a startup timeline
+
+Import this module first in an entry point so PROCESS_START is close to the
+interpreter start.
+"""
+import importlib
+import threading
+import time
+
+PROCESS_START = time.monotonic()
+
+
+class LazyModule:
+    """Stand-in for a module that is only imported on first attribute access
+
+    Unlike importlib.util.LazyLoader this does not import the parent
+    packages up front, which for mediapipe submodules is most of the cost.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+class BackgroundTask:
+    """Runs target() in a daemon thread and keeps its result or exception"""
+
+    def __init__(self, target, name="startup"):
+        self._target = target
+        self._result = None
+        self._error = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self._result = self._target()
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._done.set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """Wait for the task, re-raising its exception"""
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"{self._thread.name} still running")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+def preload(*names):
+    """Import modules in the background so a later import finds them loaded"""
+    return BackgroundTask(lambda: [importlib.import_module(name) for name in names], name="preload")
+
+
+class StartupTimeline:
+    """Time of the first occurrence of each startup milestone, in seconds since origin"""
+
+    def __init__(self, origin=None):
+        self.origin = PROCESS_START if origin is None else origin
+        self.marks = {}
+
+    def mark(self, name):
+        """Record a milestone, only its first occurrence counts"""
+        if name not in self.marks:
+            self.marks[name] = time.monotonic() - self.origin
+
+    def summary_text(self):
+        return ", ".join(f"{name} {seconds:.2f}s" for name, seconds in sorted(self.marks.items(), key=lambda m: m[1]))
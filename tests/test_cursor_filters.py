@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from cursor_filters import FILTERS, ExponentialFilter, KalmanFilter, OneEuroFilter, create_filter
+
+
+def run(cursor_filter, positions, fps=30.0):
+    return np.array([cursor_filter(p, i / fps).copy() for i, p in enumerate(positions)])
+
+
+def jittery_still(frames=120, seed=0):
+    """A cursor held at (500, 300) with 3 pixels of landmark jitter"""
+    return np.array([500.0, 300.0]) + np.random.default_rng(seed).normal(0, 3, (frames, 2))
+
+
+def ramp(frames=90, speed=1500.0, fps=30.0):
+    """A cursor moving right at speed pixels per second"""
+    return np.array([[100.0 + speed * i / fps, 300.0] for i in range(frames)])
+
+
+@pytest.mark.parametrize("name", sorted(FILTERS))
+def test_first_position_passes_through_and_reset_forgets(name):
+    cursor_filter = create_filter(name)
+    assert list(cursor_filter((10, 20), 0.0)) == [10, 20]
+    cursor_filter((500, 500), 1 / 30)
+    cursor_filter.reset()
+    assert list(cursor_filter((7, 8), 5.0)) == [7, 8]
+
+
+@pytest.mark.parametrize("name", sorted(FILTERS))
+def test_filters_reduce_jitter_and_settle(name):
+    positions = jittery_still()
+    smoothed = run(create_filter(name), positions)
+    assert smoothed[30:].std(axis=0).max() < positions[30:].std(axis=0).max() * 0.8
+    np.testing.assert_allclose(smoothed[30:].mean(axis=0), (500, 300), atol=2)
+
+
+def test_unknown_filter():
+    with pytest.raises(ValueError):
+        create_filter("median")
+
+
+def test_exponential_matches_the_fixed_divisor():
+    """At the reference frame rate, or without timestamps, it is the old prev + (target - prev) / 2"""
+    positions = ramp(10)
+    for timestamps in (True, False):
+        cursor_filter = ExponentialFilter(smoothening=2)
+        previous = positions[0]
+        for i, position in enumerate(positions):
+            value = cursor_filter(position, i / 30 if timestamps else None)
+            if i:
+                previous = previous + (position - previous) / 2
+            np.testing.assert_allclose(value, previous)
+
+
+def test_exponential_decays_the_same_per_second():
+    slow = ExponentialFilter()
+    fast = ExponentialFilter()
+    slow((0, 0), 0.0)
+    fast((0, 0), 0.0)
+    slow((100, 0), 1 / 30)
+    fast((100, 0), 1 / 60)
+    fast((100, 0), 2 / 60)
+    np.testing.assert_allclose(slow.value, fast.value)
+
+
+def test_one_euro_lags_less_when_moving_fast():
+    positions = ramp()
+    adaptive = run(OneEuroFilter(beta=0.01), positions)
+    fixed = run(OneEuroFilter(beta=0.0), positions)
+    assert abs(positions[-1, 0] - adaptive[-1, 0]) < abs(positions[-1, 0] - fixed[-1, 0]) / 3
+
+
+def test_one_euro_smooths_more_than_exponential_at_rest():
+    positions = jittery_still()
+    one_euro = run(OneEuroFilter(), positions)
+    exponential = run(ExponentialFilter(), positions)
+    assert one_euro[30:].std(axis=0).max() < exponential[30:].std(axis=0).max()
+
+
+def test_kalman_tracks_constant_velocity_without_lag():
+    positions = ramp()
+    kalman = KalmanFilter()
+    smoothed = run(kalman, positions)
+    exponential = run(ExponentialFilter(), positions)
+    assert abs(positions[-1, 0] - smoothed[-1, 0]) < 1
+    assert abs(positions[-1, 0] - exponential[-1, 0]) > 20
+    np.testing.assert_allclose(kalman.velocity, (1500, 0), atol=5)
+
+
+def test_kalman_uses_the_real_frame_interval():
+    """The same motion sampled at 60 fps is followed as closely, at the same speed"""
+    for fps in (30.0, 60.0):
+        kalman = KalmanFilter()
+        positions = ramp(int(2 * fps), fps=fps)
+        run(kalman, positions, fps=fps)
+        np.testing.assert_allclose(kalman.value, positions[-1], atol=1)
+        np.testing.assert_allclose(kalman.velocity, (1500, 0), atol=5)
@@ -0,0 +1,29 @@
+import numpy as np
+
+from cursor_mapping import CursorCalibration
+from screen_topology import Monitor, ScreenTopology
+
+SCREEN = ScreenTopology([Monitor(0, 0, 1920, 1080)])
+
+
+def interp(point, frame_size=(640, 480), screen=(1920, 1080), frame_reduction=50):
+    """The mapping move_mouse used before the calibration, kept on the last screen pixel"""
+    return (min(np.interp(point[0], (frame_reduction, frame_size[0] - frame_reduction), (0, screen[0])), screen[0] - 1),
+            min(np.interp(point[1], (frame_reduction, frame_size[1] - frame_reduction), (0, screen[1])), screen[1] - 1))
+
+
+def test_calibration_matches_the_interp_mapping():
+    """Same points as np.interp on a 640x480 frame, inside, on and past the edges"""
+    calibration = CursorCalibration((640, 480), SCREEN)
+    xs = [0, 49, 50, 51, 123.4, 320, 589, 590, 591, 640]
+    ys = [0, 49, 50, 51, 77.7, 240, 429, 430, 431, 480]
+    for x in xs:
+        for y in ys:
+            np.testing.assert_allclose(calibration.apply((x, y)), interp((x, y)), atol=1e-9)
+
+
+def test_calibration_follows_the_frame_size():
+    calibration = CursorCalibration((1000, 400), SCREEN, frame_reduction=20)
+    for point in [(20, 20), (500, 200), (980, 380), (700.5, 33.25)]:
+        np.testing.assert_allclose(calibration.apply(point),
+                                   interp(point, (1000, 400), frame_reduction=20), atol=1e-9)
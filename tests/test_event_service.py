@@ -0,0 +1,107 @@
+import socket
+import time
+
+import pytest
+
+from event_service import BroadcastOutputSink, EventServer, EventSubscriber, SocketEventSink, decode_events, encode_event
+from output_sinks import AsyncOutputSink, RecordingOutputSink
+
+EVENTS = [
+    ("move_to", (640.5, 360.25)),
+    ("click", ()),
+    ("mouse_down", ()),
+    ("mouse_up", ()),
+    ("scroll", (0, -3)),
+    ("hotkey", ("ctrl", "shift", "esc")),
+    ("tap_key", ("é",)),
+    ("tap_special_key", ("backspace",)),
+]
+
+
+def test_frames_round_trip():
+    buffer = bytearray(b"".join(encode_event(name, args, timestamp=100.0 + i) for i, (name, args) in enumerate(EVENTS)))
+    decoded = decode_events(buffer)
+    assert [(name, args) for _, name, args in decoded] == EVENTS
+    assert [timestamp for timestamp, _, _ in decoded] == [100.0 + i for i in range(len(EVENTS))]
+    assert buffer == bytearray()
+
+
+def test_partial_frames_stay_in_the_buffer():
+    """Feeding the stream a byte at a time decodes every event exactly once"""
+    stream = b"".join(encode_event(name, args, timestamp=1.0) for name, args in EVENTS)
+    buffer = bytearray()
+    decoded = []
+    for i in range(len(stream)):
+        buffer += stream[i:i + 1]
+        decoded += decode_events(buffer)
+        # Never more than one incomplete frame is left over
+        assert len(buffer) < len(encode_event("hotkey", ("ctrl", "shift", "esc")))
+    assert [(name, args) for _, name, args in decoded] == EVENTS
+    assert buffer == bytearray()
+
+
+class SlowSocketEventSink(SocketEventSink):
+    """Socket sink taking 0.2s to send a click, so the events after it are sent late"""
+
+    def send_at(self, timestamp, name, *args):
+        if name == "click":
+            time.sleep(0.2)
+        super().send_at(timestamp, name, *args)
+
+
+def test_frames_carry_the_time_the_event_was_queued():
+    """A subscriber that is sent a move late still sees when it happened"""
+    server_end, client_end = socket.socketpair()
+    output = AsyncOutputSink(SlowSocketEventSink(server_end))
+    output.click()
+    queued_at = time.time()
+    output.move_to(1, 2)
+    output.close()
+    buffer = bytearray(client_end.recv(4096))
+    client_end.close()
+    (_, click, _), (timestamp, move, _) = decode_events(buffer)
+    assert (click, move) == ("click", "move_to")
+    assert abs(timestamp - queued_at) < 0.05
+
+
+def test_server_refuses_to_replace_a_regular_file(tmp_path):
+    path = tmp_path / "gestures.sock"
+    path.write_text("not a socket")
+    with pytest.raises(FileExistsError):
+        EventServer(str(path), BroadcastOutputSink())
+    assert path.read_text() == "not a socket"
+
+
+def test_server_replaces_a_stale_socket(tmp_path):
+    path = str(tmp_path / "gestures.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    server = EventServer(path, BroadcastOutputSink())
+    server.close()
+
+
+def test_subscriber_receives_broadcast_events(tmp_path):
+    path = str(tmp_path / "gestures.sock")
+    broadcast = BroadcastOutputSink()
+    server = EventServer(path, broadcast)
+    subscriber = EventSubscriber(path)
+    deadline = time.monotonic() + 5
+    while not broadcast.subscribers and time.monotonic() < deadline:
+        time.sleep(0.01)
+    broadcast.hotkey("ctrl", "c")
+    broadcast.scroll(0, 2)
+    server.close()
+    broadcast.close()
+    events = [(name, args) for _, name, args in subscriber]
+    subscriber.close()
+    assert events == [("hotkey", ("ctrl", "c")), ("scroll", (0, 2))]
+
+
+def test_closed_broadcast_refuses_subscribers():
+    broadcast = BroadcastOutputSink()
+    broadcast.close()
+    sink = AsyncOutputSink(RecordingOutputSink())
+    assert not broadcast.subscribe(sink)
+    assert broadcast.subscribers == []
+    assert sink.closed
@@ -0,0 +1,41 @@
+import numpy as np
+
+from benchmarks.train_gesture_classifier import synthetic_samples
+from gesture_classifier import NUM_FEATURES, GestureClassifier, landmark_features, train_classifier
+from landmark_array import LandmarkArray
+from landmark_stream import ReplayHandLandmarks
+
+
+def random_classifier(states, hidden=16, seed=0):
+    """Untrained classifier with random weights, every class gets picked sometimes"""
+    rng = np.random.default_rng(seed)
+    layers = [(rng.normal(0, 1, (NUM_FEATURES, hidden)), rng.normal(0, 1, hidden)),
+              (rng.normal(0, 1, (hidden, len(states))), rng.normal(0, 1, len(states)))]
+    return GestureClassifier(states, rng.normal(0, 0.1, NUM_FEATURES), rng.uniform(0.5, 2, NUM_FEATURES), layers)
+
+
+def test_single_hand_features_match_the_batched_features():
+    """finger_state normalizes a hand exactly like landmark_features, left hands included"""
+    points, left, states = synthetic_samples(20, tilt=90.0)
+    classifier = random_classifier(sorted(set(states)))
+    hand = LandmarkArray()
+    for hand_points, is_left in zip(points, left):
+        classifier.finger_state(hand.fill(ReplayHandLandmarks(hand_points)), left=is_left)
+        np.testing.assert_allclose(classifier._features, landmark_features(hand_points, [is_left]), atol=1e-5)
+
+
+def test_finger_state_agrees_with_predict():
+    points, left, states = synthetic_samples(40, tilt=90.0)
+    hand = LandmarkArray()
+    for classifier in (random_classifier(sorted(set(states))),
+                       train_classifier(landmark_features(points, left), states, hidden=8, epochs=50)):
+        single = [classifier.finger_state(hand.fill(ReplayHandLandmarks(p)), left=l) for p, l in zip(points, left)]
+        assert single == list(classifier.predict(points, left))
+
+
+def test_saved_model_predicts_the_same(tmp_path):
+    points, left, states = synthetic_samples(10)
+    classifier = random_classifier(sorted(set(states)))
+    path = str(tmp_path / "gestures.npz")
+    classifier.save(path)
+    assert list(GestureClassifier.load(path).predict(points, left)) == list(classifier.predict(points, left))
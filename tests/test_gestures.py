@@ -0,0 +1,86 @@
+from gestures import Gesture, GestureRecognizer
+from landmark_array import INDEX_TIP, THUMB_TIP, LandmarkArray
+from virtual_keyboard import VirtualKeyboard
+from virtual_mouse import VirtualMouse
+
+LEFT_CLICK = VirtualMouse.LEFT_CLICK_STATE
+POINT = 2  # index only
+
+
+def run(recognizer, states, hand=None):
+    """Feed finger states frame by frame, returns the active sets"""
+    hand = hand if hand is not None else LandmarkArray()
+    return [set(recognizer.update(hand, state)) for state in states]
+
+
+def pinch_hand(distance):
+    hand = LandmarkArray()
+    hand.points[THUMB_TIP, :2] = (0.5, 0.5)
+    hand.points[INDEX_TIP, :2] = (0.5 + distance, 0.5)
+    return hand
+
+
+def test_gesture_turns_on_after_hold_frames():
+    recognizer = GestureRecognizer([Gesture("click", LEFT_CLICK, hold_frames=2, release_frames=2)])
+    active = run(recognizer, [POINT, LEFT_CLICK, LEFT_CLICK, LEFT_CLICK])
+    assert active == [set(), set(), {"click"}, {"click"}]
+
+
+def test_single_frame_flicker_neither_starts_nor_ends_a_gesture():
+    recognizer = GestureRecognizer([Gesture("click", LEFT_CLICK, hold_frames=2, release_frames=2)])
+    # A one-frame flicker into the gesture does not click
+    assert run(recognizer, [LEFT_CLICK, POINT, LEFT_CLICK, POINT]) == [set()] * 4
+
+    recognizer.reset(block=False)
+    run(recognizer, [LEFT_CLICK, LEFT_CLICK])
+    # Nor does a one-frame dropout release it
+    assert run(recognizer, [POINT, LEFT_CLICK, POINT, POINT]) == [{"click"}, {"click"}, {"click"}, set()]
+    assert recognizer.ended == {"click"}
+
+
+def test_started_and_ended_fire_once():
+    recognizer = GestureRecognizer([Gesture("click", LEFT_CLICK, hold_frames=2, release_frames=2)])
+    starts = []
+    for state in [LEFT_CLICK] * 5 + [POINT] * 5:
+        recognizer.update(LandmarkArray(), state)
+        starts.append((set(recognizer.started), set(recognizer.ended)))
+    assert [s for s, _ in starts].count({"click"}) == 1
+    assert [e for _, e in starts].count({"click"}) == 1
+
+
+def test_reset_with_block_waits_for_a_release():
+    recognizer = GestureRecognizer([Gesture("click", LEFT_CLICK, hold_frames=1, release_frames=1)])
+    recognizer.reset(block=True)
+    # The gesture held while another hand took over never fires
+    assert run(recognizer, [LEFT_CLICK] * 3) == [set()] * 3
+    # Once let go, making it again does
+    assert run(recognizer, [POINT, LEFT_CLICK]) == [set(), {"click"}]
+
+
+def test_pinch_releases_at_the_looser_threshold():
+    pinch = [gesture for gesture in VirtualKeyboard.GESTURES if gesture.name == "pinch"][0]
+    recognizer = GestureRecognizer([pinch])
+    threshold, release = pinch.threshold, pinch.release_threshold
+    assert release > threshold
+    between = (threshold + release) / 2
+
+    # Between the thresholds does not start a pinch
+    assert not recognizer.update(pinch_hand(between), 0)
+    assert recognizer.update(pinch_hand(threshold / 2), 0) == {"pinch"}
+    # but keeps one going, however long it stays there
+    for _ in range(5):
+        assert recognizer.update(pinch_hand(between), 0) == {"pinch"}
+    # Apart past the release threshold for release_frames frames ends it
+    apart = [set(recognizer.update(pinch_hand(release * 2), 0)) for _ in range(pinch.release_frames)]
+    assert apart[-1] == set()
+    assert all(active == {"pinch"} for active in apart[:-1])
+
+
+def test_configure_changes_one_gesture():
+    recognizer = GestureRecognizer(VirtualMouse.GESTURES)
+    recognizer.configure("left_click", hold_frames=4)
+    assert recognizer.setting("left_click", "hold_frames") == 4
+    assert recognizer.setting("right_click", "hold_frames") == 2
+    # The class-level definitions are left alone
+    assert VirtualMouse.GESTURES[0].hold_frames == 2
+
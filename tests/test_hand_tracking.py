@@ -0,0 +1,80 @@
+import numpy as np
+
+from hand_tracking import KEYBOARD, MOUSE, HandIdentityTracker
+from landmark_stream import ReplayHandedness, ReplayHandLandmarks, ReplayResults
+
+
+def hand_at(x, y=0.5):
+    """Landmarks of a hand centred on (x, y)"""
+    points = np.full((21, 3), 0.0, dtype=np.float32)
+    points[:, 0] = x
+    points[:, 1] = y
+    return ReplayHandLandmarks(points)
+
+
+def frame(hands, predicted=False):
+    """Results for a list of (x, label, score) hands"""
+    return ReplayResults([hand_at(x) for x, _, _ in hands],
+                         [ReplayHandedness(label, score) for _, label, score in hands], predicted)
+
+
+def test_single_frame_flip_keeps_the_roles():
+    """Both labels swapped for one frame: the same hands keep mouse and keyboard"""
+    tracker = HandIdentityTracker()
+    steady = [(0.3, "Right", 0.9), (0.7, "Left", 0.9)]
+    for _ in range(10):
+        hands = tracker.update(frame(steady))
+    mouse_id, keyboard_id = hands[MOUSE].id, hands[KEYBOARD].id
+
+    hands = tracker.update(frame([(0.3, "Left", 0.95), (0.7, "Right", 0.95)]))
+    assert (hands[MOUSE].id, hands[KEYBOARD].id) == (mouse_id, keyboard_id)
+    # The indices follow the detections, not the labels
+    assert (hands[MOUSE].index, hands[KEYBOARD].index) == (0, 1)
+    assert hands[MOUSE].label == "Right"
+
+    hands = tracker.update(frame(steady))
+    assert (hands[MOUSE].id, hands[KEYBOARD].id) == (mouse_id, keyboard_id)
+
+
+def test_single_hand_flip_does_not_reach_the_keyboard():
+    tracker = HandIdentityTracker()
+    for _ in range(10):
+        tracker.update(frame([(0.3, "Right", 0.9)]))
+    hands = tracker.update(frame([(0.31, "Left", 0.99)]))
+    assert list(hands) == [MOUSE]
+
+
+def test_sustained_change_moves_the_role():
+    """The vote still follows a label that stays changed"""
+    tracker = HandIdentityTracker(vote_window=5)
+    for _ in range(5):
+        tracker.update(frame([(0.3, "Right", 0.9)]))
+    for _ in range(5):
+        hands = tracker.update(frame([(0.3, "Left", 0.9)]))
+    assert list(hands) == [KEYBOARD]
+
+
+def test_hands_that_swap_places_are_told_apart_by_distance():
+    tracker = HandIdentityTracker()
+    hands = tracker.update(frame([(0.3, "Right", 0.9), (0.7, "Left", 0.9)]))
+    mouse_id = hands[MOUSE].id
+    # The hands arrive in the other order, the mouse hand is the one nearby
+    hands = tracker.update(frame([(0.7, "Left", 0.9), (0.32, "Right", 0.9)]))
+    assert hands[MOUSE].id == mouse_id
+    assert hands[MOUSE].index == 1
+
+
+def test_predicted_frames_do_not_vote():
+    """Extrapolated frames repeat the last label, they cannot outvote detections"""
+    tracker = HandIdentityTracker(vote_window=15)
+    for _ in range(2):
+        tracker.update(frame([(0.3, "Right", 0.6)]))
+    for _ in range(3):
+        tracker.update(frame([(0.3, "Left", 0.9)]))
+    # Without the predicted flag these would be further Left votes
+    for _ in range(10):
+        hands = tracker.update(frame([(0.3, "Left", 0.9)], predicted=True))
+    assert hands[KEYBOARD].label == "Left"
+    hands = tracker.update(frame([(0.3, "Right", 0.95)]))
+    hands = tracker.update(frame([(0.3, "Right", 0.95)]))
+    assert list(hands) == [MOUSE]
@@ -0,0 +1,92 @@
+import numpy as np
+
+from idle_mode import ACTIVE, IDLE, IdleController
+from landmark_stream import ReplayHandedness, ReplayHandLandmarks, ReplayResults
+
+
+def with_hand():
+    return ReplayResults([ReplayHandLandmarks(np.full((21, 3), 0.5, dtype=np.float32))], [ReplayHandedness("Right")])
+
+
+class FakeHands:
+    """Detector recording the size of each image and answering from a list"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.shapes = []
+
+    def process(self, rgb_img):
+        self.shapes.append(rgb_img.shape)
+        return self.answers.pop(0) if self.answers else ReplayResults()
+
+
+def still(value=80):
+    return np.full((480, 640, 3), value, dtype=np.uint8)
+
+
+def idle_controller(**settings):
+    """A controller that has gone idle after 1s without hands"""
+    idle = IdleController(idle_after=1.0, **settings)
+    idle.observe(with_hand(), 0.0)
+    idle.observe(ReplayResults(), 0.5)
+    assert not idle.idle
+    idle.observe(ReplayResults(), 1.0)
+    assert idle.idle and idle.frame_interval() == idle.probe_interval
+    return idle
+
+
+def test_goes_idle_only_after_idle_after_seconds_without_hands():
+    idle = IdleController(idle_after=1.0)
+    for t in (0.0, 0.4, 0.8):
+        idle.observe(ReplayResults(), t)
+    idle.observe(with_hand(), 1.2)
+    idle.observe(ReplayResults(), 2.1)
+    assert idle.state == ACTIVE and idle.frame_interval() == 0.0
+    idle.observe(ReplayResults(), 2.2)
+    assert idle.state == IDLE
+
+
+def test_still_frames_are_not_inferred():
+    idle = idle_controller()
+    hands = FakeHands()
+    # The first idle frame is always probed, then only frames that moved
+    for t in (1.25, 1.5, 1.75):
+        assert not idle.probe(hands, still(), t).multi_hand_landmarks
+    assert idle.probes == 1 and idle.idle_frames == 3
+    # Probes run on a frame downscaled to probe_size
+    assert hands.shapes == [(240, 320, 3)]
+
+
+def test_small_changes_are_not_motion():
+    idle = idle_controller()
+    hands = FakeHands()
+    idle.probe(hands, still(), 1.25)
+    # Sensor noise below the pixel threshold, and a change too small to count
+    idle.probe(hands, still(90), 1.5)
+    spot = still()
+    spot[:4, :4] = 255
+    idle.probe(hands, spot, 1.75)
+    assert idle.probes == 1
+
+
+def test_motion_with_a_hand_wakes_up():
+    idle = idle_controller()
+    hands = FakeHands(ReplayResults(), with_hand())
+    idle.probe(hands, still(), 1.25)
+    moved = still()
+    moved[100:300, 200:400] = 255
+    results = idle.probe(hands, moved, 1.5)
+    assert results.multi_hand_landmarks
+    assert idle.state == ACTIVE and idle.wakeups == 1
+
+    stats = idle.stats(2.0)
+    assert (stats["active_seconds"], stats["idle_seconds"]) == (1.5, 0.5)
+    assert "1 wakeups" in idle.summary_text(2.0)
+
+
+def test_motion_without_a_hand_stays_idle():
+    idle = idle_controller()
+    hands = FakeHands()
+    idle.probe(hands, still(), 1.25)
+    idle.probe(hands, still(200), 1.5)
+    assert idle.probes == 2 and idle.idle
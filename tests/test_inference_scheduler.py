@@ -0,0 +1,40 @@
+import numpy as np
+
+from inference_scheduler import AdaptiveInferenceScheduler
+from landmark_stream import ReplayHandedness, ReplayHandLandmarks, ReplayResults
+
+
+def detected(x, label="Right", score=0.7):
+    points = np.full((21, 3), 0.5, dtype=np.float32)
+    points[:, 0] = x
+    return ReplayResults([ReplayHandLandmarks(points)], [ReplayHandedness(label, score)])
+
+
+def test_slow_inference_skips_frames():
+    scheduler = AdaptiveInferenceScheduler(target_fps=30.0, max_skip=4)
+    assert scheduler.should_infer()
+    scheduler.observe(detected(0.3), 0.0, 0.07)
+    assert scheduler.interval == 3
+    assert not scheduler.should_infer()
+    scheduler.predict(1 / 30)
+    assert not scheduler.should_infer()
+    scheduler.predict(2 / 30)
+    assert scheduler.should_infer()
+
+
+def test_predicted_hands_move_on_and_keep_the_measured_score():
+    scheduler = AdaptiveInferenceScheduler()
+    scheduler.observe(detected(0.3, score=0.7), 0.0, 0.01)
+    scheduler.observe(detected(0.4, score=0.6), 0.1, 0.01)
+    results = scheduler.predict(0.15)
+    assert results.predicted
+    np.testing.assert_allclose(results.multi_hand_landmarks[0].array[:, 0], 0.45, atol=1e-6)
+    category = results.multi_handedness[0].classification[0]
+    assert (category.label, category.score) == ("Right", 0.6)
+
+
+def test_no_hands_predicts_no_hands():
+    scheduler = AdaptiveInferenceScheduler()
+    scheduler.observe(ReplayResults(), 0.0, 0.01)
+    results = scheduler.predict(0.03)
+    assert results.predicted and not results.multi_hand_landmarks
@@ -0,0 +1,51 @@
+from keyboard_layout import CompiledLayout
+from output_sinks import RecordingOutputSink
+from virtual_keyboard import VirtualKeyboard
+
+
+def linear_hit_test(keyboard, layout, x, y):
+    """The row-by-row walk get_clicked_key did before the compiled layouts"""
+    current_y = keyboard.keyboard_start_y
+    for row in keyboard.keys[layout]:
+        current_x = keyboard.keyboard_start_x
+        for key in row:
+            width = keyboard.get_key_width(key)
+            if current_x < x < current_x + width and current_y < y < current_y + keyboard.button_height:
+                return key
+            current_x += width + keyboard.button_margin
+        current_y += keyboard.button_height + keyboard.button_margin
+    return None
+
+
+def probes(edges):
+    """Coordinates on, just inside and just outside every key edge"""
+    return sorted({edge + offset for edge in edges for offset in (-1, -0.5, 0, 0.5, 1)})
+
+
+def test_bisect_hit_test_matches_the_linear_walk():
+    keyboard = VirtualKeyboard(None, None, None, 1000, 400, RecordingOutputSink())
+    for name, layout in keyboard.layouts.items():
+        xs = probes({edge for rect in layout.rects for edge in (rect.x, rect.x + rect.width)} | {-5, 2000})
+        ys = probes({edge for rect in layout.rects for edge in (rect.y, rect.y + rect.height)} | {-5, 2000})
+        for x in xs:
+            for y in ys:
+                rect = layout.hit_test(x, y)
+                assert (rect.key if rect is not None else None) == linear_hit_test(keyboard, name, x, y), (name, x, y)
+
+
+def test_get_clicked_key_follows_the_modifiers():
+    keyboard = VirtualKeyboard(None, None, None, 1000, 400, RecordingOutputSink())
+    rect = keyboard.layouts['normal'].rects[0]
+    center = (rect.x + rect.width / 2, rect.y + rect.height / 2)
+    assert keyboard.get_clicked_key(center) == keyboard.keys['normal'][0][0]
+    keyboard.shift_pressed = True
+    assert keyboard.get_clicked_key(center) == keyboard.keys['shift'][0][0]
+
+
+def test_rows_of_different_widths():
+    layout = CompiledLayout([["a", "wide"], ["b"]], 10, 10, lambda key: 100 if key == "wide" else 40, 30, 5)
+    assert layout.hit_test(100, 20).key == "wide"
+    # Right of the short second row, and in the margin between the rows
+    assert layout.hit_test(100, 60) is None
+    assert layout.hit_test(30, 42) is None
+    assert layout.hit_test(30, 60).key == "b"
@@ -0,0 +1,98 @@
+import numpy as np
+
+from hand_tracking import HandIdentityTracker
+from landmark_array import hand_points
+from landmark_recording import LandmarkRecorder, LandmarkRecording, is_landmark_recording, replay_gestures
+from landmark_stream import ReplayHandedness, ReplayHandLandmarks, ReplayResults
+from output_sinks import RecordingOutputSink
+from virtual_keyboard import VirtualKeyboard
+from virtual_mouse import VirtualMouse
+
+WINDOW_WIDTH = 1000
+WINDOW_HEIGHT = 400
+
+
+def right_hand(up, x=0.3):
+    """Landmarks of a right hand with the (thumb, index, middle, ring) fingers up as given"""
+    points = np.full((21, 3), 0.5, dtype=np.float32)
+    points[:, 0] += x - 0.3
+    points[4, 0] = x + (0.3 if up[0] else 0.1)
+    points[3, 0] = x + 0.2
+    for tip, pip, finger_up in ((8, 6, up[1]), (12, 10, up[2]), (16, 14, up[3])):
+        points[tip, 1] = 0.3 if finger_up else 0.7
+    return points
+
+
+def session():
+    """Point, then left click, with an empty frame in between and a second hand on some frames"""
+    frames = []
+    for i in range(12):
+        up = (0, 1, 0, 0) if i < 6 else (1, 1, 0, 0)
+        if i == 4:
+            frames.append((i / 30, ReplayResults()))
+            continue
+        hands = [ReplayHandLandmarks(right_hand(up))]
+        handedness = [ReplayHandedness("Right", 0.9)]
+        if i % 3 == 0:
+            hands.append(ReplayHandLandmarks(right_hand((0, 0, 0, 0), x=0.8)))
+            handedness.append(ReplayHandedness("Left", 0.8))
+        frames.append((i / 30, ReplayResults(hands, handedness)))
+    return frames
+
+
+def record(path, frames, chunk_frames=4):
+    recorder = LandmarkRecorder(path, chunk_frames=chunk_frames, frame_size=(640, 480))
+    for timestamp, results in frames:
+        recorder.add(timestamp, results)
+    recorder.close()
+    return LandmarkRecording(path)
+
+
+def replay(frames):
+    output = RecordingOutputSink()
+    mouse = VirtualMouse(None, None, None, WINDOW_WIDTH, WINDOW_HEIGHT, output)
+    keyboard = VirtualKeyboard(None, None, None, WINDOW_WIDTH, WINDOW_HEIGHT, output)
+    camera_img = np.zeros((480, 640, 3), dtype=np.uint8)
+    keyboard_img = np.zeros((WINDOW_HEIGHT, WINDOW_WIDTH, 3), dtype=np.uint8)
+    replay_gestures(frames, mouse, keyboard, camera_img, keyboard_img, HandIdentityTracker())
+    return output.events
+
+
+def test_recording_round_trip(tmp_path):
+    path = str(tmp_path / "session.landmarks")
+    frames = session()
+    recording = record(path, frames)
+
+    assert is_landmark_recording(path)
+    assert len(recording) == len(frames)
+    assert recording.frame_size == (640, 480)
+    assert recording.landmarks.shape == (len(frames), 2, 21, 3)
+    # Slots without a hand are NaN with handedness -1
+    assert np.isnan(recording.landmarks[4]).all()
+    assert list(recording.handedness[4]) == [-1, -1]
+    assert list(recording.handedness[3]) == [1, 0]
+    np.testing.assert_array_equal(recording.landmarks[0, 0], hand_points(frames[0][1].multi_hand_landmarks[0]))
+
+    for (timestamp, results), (recorded_at, replayed) in zip(frames, recording):
+        assert recorded_at == timestamp
+        assert bool(replayed.multi_hand_landmarks) == bool(results.multi_hand_landmarks)
+        if results.multi_hand_landmarks:
+            labels = [h.classification[0].label for h in replayed.multi_handedness]
+            assert labels == [h.classification[0].label for h in results.multi_handedness]
+
+
+def test_replayed_recording_fires_the_same_events(tmp_path):
+    frames = session()
+    recording = record(str(tmp_path / "session.landmarks"), frames)
+    events = replay(list(recording))
+    assert events == replay(frames)
+    assert [name for name, _ in events if name != "move_to"] == ["click"]
+
+
+def test_single_frame_handedness_flip_does_not_swap_the_hands():
+    """A right hand labelled Left for one frame still drives the mouse"""
+    frames = session()
+    timestamp, results = frames[7]
+    flipped = [ReplayHandedness("Left", 0.95)] + results.multi_handedness[1:]
+    frames[7] = (timestamp, ReplayResults(results.multi_hand_landmarks, flipped))
+    assert replay(frames) == replay(session())
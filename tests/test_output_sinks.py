@@ -0,0 +1,83 @@
+import threading
+
+from output_sinks import AsyncOutputSink, RecordingOutputSink
+
+
+class GatedSink(RecordingOutputSink):
+    """Recording sink whose output thread blocks until the gate opens"""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.entered = threading.Event()
+
+    def _record(self, name, *args):
+        self.entered.set()
+        self.gate.wait(5)
+        super()._record(name, *args)
+
+
+def stalled_sink(max_queue=256):
+    """AsyncOutputSink whose output thread is stuck sending a first click"""
+    recorder = GatedSink()
+    output = AsyncOutputSink(recorder, max_queue=max_queue, put_timeout=0.001)
+    output.click()
+    assert recorder.entered.wait(5)
+    return recorder, output
+
+
+def drain(recorder, output):
+    recorder.gate.set()
+    output.close()
+    return recorder.events
+
+
+def test_consecutive_moves_are_coalesced_to_the_latest():
+    recorder, output = stalled_sink()
+    for x in range(10):
+        output.move_to(x, 0)
+    output.mouse_down()
+    output.move_to(20, 0)
+    output.move_to(30, 0)
+    output.mouse_up()
+    assert output.coalesced == 10
+    assert drain(recorder, output) == [("click", ()), ("move_to", (9, 0)), ("mouse_down", ()),
+                                       ("move_to", (30, 0)), ("mouse_up", ())]
+
+
+def test_full_queue_coalesces_a_superseded_move_before_dropping():
+    recorder, output = stalled_sink(max_queue=4)
+    output.move_to(1, 1)
+    output.tap_key("a")
+    output.move_to(2, 2)
+    output.mouse_down()
+    # Full: the first move is only followed by a key press, then another move
+    output.right_click()
+    assert output.dropped == 0
+    events = drain(recorder, output)
+    assert ("move_to", (1, 1)) not in events
+    assert events[-1] == ("right_click", ())
+
+
+def test_full_queue_drops_and_counts_but_keeps_releases():
+    recorder, output = stalled_sink(max_queue=3)
+    output.mouse_down()
+    output.click()
+    output.right_click()
+    # Nothing left to coalesce: the click is dropped, the release is not
+    output.double_click()
+    output.mouse_up()
+    assert output.dropped == 1
+    assert output.drop_counts == {"double_click": 1}
+    assert "double_click 1" in output.summary_text()
+    events = drain(recorder, output)
+    assert events[-1] == ("mouse_up", ())
+    assert ("double_click", ()) not in events
+
+
+def test_events_after_close_are_counted_as_dropped():
+    output = AsyncOutputSink(RecordingOutputSink())
+    output.close()
+    output.click()
+    assert output.drop_counts == {"click": 1}
+
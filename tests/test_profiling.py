@@ -0,0 +1,75 @@
+import csv
+import json
+import threading
+
+import numpy as np
+
+from profiling import RingBuffer, StageProfiler
+
+
+def test_ring_buffer_keeps_the_latest_values_oldest_first():
+    ring = RingBuffer(4)
+    for value in range(6):
+        ring.append(value)
+    assert list(ring.values()) == [2, 3, 4, 5]
+    assert ring.count == 6
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = StageProfiler()
+    with profiler.measure("inference"):
+        pass
+    profiler.record("inference", 0.01)
+    profiler.frame_done()
+    assert profiler.measure("a") is profiler.measure("b")
+    assert profiler.stages() == {}
+    assert profiler.summary_text() == ""
+
+
+def test_percentiles_and_averages_over_the_kept_samples():
+    profiler = StageProfiler(enabled=True, capacity=100)
+    # Older samples fall out of the ring
+    for _ in range(50):
+        profiler.record("inference", 1.0)
+    for ms in range(1, 101):
+        profiler.record("inference", ms / 1000)
+    p = profiler.percentiles((50, 100))["inference"]
+    assert np.isclose(p[50], 50.5) and np.isclose(p[100], 100)
+    assert np.isclose(profiler.averages()["inference"], 50.5)
+    counts, edges = profiler.histogram("inference", bins=10)
+    assert counts.sum() == 100 and np.isclose(edges[-1], 100)
+    assert profiler.summary_text().startswith("inference")
+
+
+def test_measure_times_the_block():
+    profiler = StageProfiler(enabled=True)
+    with profiler.measure("sleep"):
+        threading.Event().wait(0.02)
+    assert 15 < profiler.averages()["sleep"] < 200
+
+
+def test_trace_is_bounded_and_exported(tmp_path):
+    profiler = StageProfiler(enabled=True, trace_capacity=3)
+    for i in range(5):
+        profiler.record(f"stage{i}", 0.001 * (i + 1), start=float(i))
+    thread = threading.Thread(target=profiler.record, args=("worker", 0.002, 10.0), name="inference")
+    thread.start()
+    thread.join()
+
+    assert profiler.export_trace(str(tmp_path / "trace.csv")) == 3
+    with open(tmp_path / "trace.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    assert [row[0] for row in rows[1:]] == ["stage3", "stage4", "worker"]
+    assert rows[-1][3] == "inference"
+
+    assert profiler.export_trace(str(tmp_path / "trace.json")) == 3
+    with open(tmp_path / "trace.json") as f:
+        events = json.load(f)["traceEvents"]
+    assert events[0] == {"name": "stage3", "ph": "X", "ts": 3e6, "dur": 4e3, "pid": 0, "tid": "MainThread"}
+
+
+def test_hud_draws_without_samples():
+    profiler = StageProfiler(enabled=True)
+    img = np.zeros((100, 400, 3), dtype=np.uint8)
+    profiler.draw_hud(img, dropped_frames=0)
+    assert img.any()
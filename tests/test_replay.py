@@ -0,0 +1,80 @@
+import numpy as np
+
+from frame_sources import LandmarkStreamSource, open_source
+from landmark_stream import (ReplayHandedness, ReplayHandLandmarks, ReplayResults, read_landmark_stream,
+                             results_to_record, write_landmark_stream)
+from output_sinks import RecordingOutputSink
+from virtual_keyboard import VirtualKeyboard
+from virtual_mouse import VirtualMouse
+
+WINDOW_WIDTH = 1000
+WINDOW_HEIGHT = 400
+
+
+def hand(up, index_tip=(0.3, 0.2)):
+    """Right hand landmarks with the (thumb, index, middle, ring) fingers up as given"""
+    points = np.full((21, 3), 0.5)
+    points[4, 0] = 0.6 if up[0] else 0.4
+    for tip, pip, finger_up in ((8, 6, up[1]), (12, 10, up[2]), (16, 14, up[3])):
+        points[tip, 1] = 0.3 if finger_up else 0.7
+    if up[1]:
+        points[8, :2] = index_tip
+    return points.tolist()
+
+
+def session():
+    """Point, left click, move, right click; three frames each"""
+    poses = [(0, 1, 0, 0)] * 3 + [(1, 1, 0, 0)] * 3 + [(0, 1, 0, 0)] * 3 + [(0, 1, 1, 0)] * 3
+    frames = []
+    for i, up in enumerate(poses):
+        results = ReplayResults([ReplayHandLandmarks(hand(up, (0.3 + 0.01 * i, 0.2)))], [ReplayHandedness("Right")])
+        frames.append((i / 30, results))
+    frames.append((len(poses) / 30, ReplayResults()))
+    return frames
+
+
+def replay(frames):
+    output = RecordingOutputSink()
+    mouse = VirtualMouse(None, None, None, WINDOW_WIDTH, WINDOW_HEIGHT, output)
+    keyboard = VirtualKeyboard(None, None, None, WINDOW_WIDTH, WINDOW_HEIGHT, output)
+    img = np.zeros((480, 640, 3), dtype=np.uint8)
+    for timestamp, results in frames:
+        mouse.handle_hand_gestures(results, 0 if results.multi_hand_landmarks else None, img, timestamp)
+    return output.events
+
+
+def test_replay_is_deterministic_and_fires_the_gestures():
+    events = replay(session())
+    assert events == replay(session())
+    assert [name for name, _ in events if name != "move_to"] == ["click", "right_click"]
+
+
+def test_landmark_stream_round_trip(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    frames = session()
+    write_landmark_stream(path, [results_to_record(results, t) for t, results in frames])
+
+    read = list(read_landmark_stream(path))
+    assert [t for t, _ in read] == [t for t, _ in frames]
+    assert read[-1][1].multi_hand_landmarks is None
+    assert replay(read) == replay(frames)
+
+
+def test_landmark_stream_source_yields_blank_frames_with_results(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    frames = session()
+    write_landmark_stream(path, [results_to_record(results, t) for t, results in frames])
+
+    source = open_source(path, 320, 240)
+    assert isinstance(source, LandmarkStreamSource)
+    replayed = []
+    image = None
+    while True:
+        success, image = source.read(image)
+        if not success:
+            break
+        assert image.shape == (240, 320, 3) and not image.any()
+        replayed.append((source.frame_timestamp(), source.frame_results()))
+    source.release()
+    assert len(replayed) == len(frames)
+    assert replay(replayed) == replay(frames)
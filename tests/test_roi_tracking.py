@@ -0,0 +1,115 @@
+import cv2
+import numpy as np
+
+from landmark_array import hand_points
+from landmark_stream import ReplayHandedness, ReplayHandLandmarks, ReplayLandmark, ReplayResults
+from roi_tracking import RegionOfInterest, RoiHandTracker
+
+FRAME_SIZE = (640, 480)
+
+
+class ObjectHandLandmarks:
+    """Landmarks as objects only, like a MediaPipe protobuf"""
+
+    def __init__(self, points):
+        self.landmark = [ReplayLandmark(*point) for point in points.tolist()]
+
+
+class BlobHands:
+    """Detector finding every white square, landmarks spread over its box
+
+    Landmarks are normalized to the image it is given, like MediaPipe.
+    """
+
+    def __init__(self, as_objects=False):
+        self.as_objects = as_objects
+        self.shapes = []
+
+    def process(self, rgb_img):
+        self.shapes.append(rgb_img.shape[:2])
+        h, w = rgb_img.shape[:2]
+        mask = (rgb_img[..., 0] > 128).astype(np.uint8)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+        hands = []
+        for x, y, bw, bh, _ in sorted(stats[1:].tolist()):
+            grid = np.linspace(0, 1, 21)
+            points = np.stack([(x + grid * bw) / w, (y + grid[::-1] * bh) / h, np.full(21, 0.1 * bw / w)], axis=1)
+            hands.append(ObjectHandLandmarks(points) if self.as_objects else ReplayHandLandmarks(points))
+        if not hands:
+            return ReplayResults()
+        return ReplayResults(hands, [ReplayHandedness("Right")] * len(hands))
+
+
+def scene(*squares):
+    """RGB frame with a white square at each (x, y, size) in pixels"""
+    img = np.zeros((FRAME_SIZE[1], FRAME_SIZE[0], 3), dtype=np.uint8)
+    for x, y, size in squares:
+        img[y:y + size, x:x + size] = 255
+    return img
+
+
+def pixel_box(results):
+    points = np.concatenate([hand_points(hand) for hand in results.multi_hand_landmarks])
+    return (points[:, 0].min() * FRAME_SIZE[0], points[:, 1].min() * FRAME_SIZE[1],
+            points[:, 0].max() * FRAME_SIZE[0], points[:, 1].max() * FRAME_SIZE[1])
+
+
+def test_roi_landmarks_map_back_to_the_full_frame():
+    for as_objects in (False, True):
+        tracker = RoiHandTracker(max_hands=1)
+        hands = BlobHands(as_objects)
+        full = tracker.process(hands, scene((300, 200, 60)))
+        assert tracker.roi is not None
+        cropped = tracker.process(hands, scene((305, 204, 60)))
+        # The second frame ran on a crop, not the whole frame
+        assert hands.shapes[1] == (tracker.roi.height, tracker.roi.width)
+        np.testing.assert_allclose(pixel_box(full), (300, 200, 360, 260), atol=0.5)
+        np.testing.assert_allclose(pixel_box(cropped), (305, 204, 365, 264), atol=0.5)
+        z = hand_points(cropped.multi_hand_landmarks[0])[:, 2]
+        np.testing.assert_allclose(z, 0.1 * 60 / FRAME_SIZE[0], atol=1e-4)
+
+
+def test_large_crops_are_downscaled_and_still_map_back():
+    tracker = RoiHandTracker(max_hands=1, max_side=64, min_area_ratio=0.9)
+    hands = BlobHands()
+    tracker.process(hands, scene((200, 150, 120)))
+    results = tracker.process(hands, scene((200, 150, 120)))
+    assert max(hands.shapes[1]) <= 64
+    # A pixel of the downscaled crop is several frame pixels wide
+    np.testing.assert_allclose(pixel_box(results), (200, 150, 320, 270), atol=6)
+
+
+def test_lost_hand_falls_back_to_the_full_frame_on_the_same_frame():
+    tracker = RoiHandTracker(max_hands=1)
+    hands = BlobHands()
+    tracker.process(hands, scene((100, 100, 40)))
+    # The hand jumped out of the crop
+    results = tracker.process(hands, scene((500, 350, 40)))
+    assert hands.shapes[1] != FRAME_SIZE[::-1]
+    assert hands.shapes[2:] == [FRAME_SIZE[::-1]]
+    np.testing.assert_allclose(pixel_box(results), (500, 350, 540, 390), atol=0.5)
+    assert tracker.fallbacks == 1
+    assert tracker.roi.contains(RegionOfInterest(500, 350, 540, 390))
+
+
+def test_full_frame_refresh_finds_a_second_hand():
+    tracker = RoiHandTracker(max_hands=2, refresh_interval=3)
+    hands = BlobHands()
+    frames = [scene((100, 100, 40), (450, 300, 40))] * 6
+    tracker.process(hands, scene((100, 100, 40)))
+    counts = [len(tracker.process(hands, frame).multi_hand_landmarks) for frame in frames]
+    # The crop around the first hand misses the second until the refresh
+    assert counts[:3] == [1, 1, 1]
+    assert hands.shapes[4] == FRAME_SIZE[::-1]
+    assert counts[3] == 2 and tracker.tracked_hands == 2
+    assert tracker.stats()["frames"] == 7
+
+
+def test_no_hands_resets_the_roi():
+    tracker = RoiHandTracker()
+    hands = BlobHands()
+    tracker.process(hands, scene((100, 100, 40)))
+    tracker.process(hands, scene())
+    assert tracker.roi is None
+    tracker.process(hands, scene())
+    assert hands.shapes[-1] == FRAME_SIZE[::-1]
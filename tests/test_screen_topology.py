@@ -0,0 +1,98 @@
+import threading
+
+import numpy as np
+
+from cursor_mapping import CursorCalibration, ZonedCursorCalibration
+from screen_topology import FakeScreenTopology, Monitor, ScreenTopology, ScreenTopologyProvider
+
+FRAME_SIZE = (740, 580)  # 640 x 480 active region with the default frame reduction
+
+# A 1920x1080 primary monitor with a shorter 1280x1024 one on its right: the
+# bounding box has a dead strip below the right monitor
+PRIMARY = Monitor(0, 0, 1920, 1080)
+RIGHT = Monitor(1920, 0, 1280, 1024)
+
+
+def test_single_monitor_covers_its_bounds():
+    topology = FakeScreenTopology([PRIMARY]).topology()
+    assert topology.covers_bounds()
+    calibration = CursorCalibration(FRAME_SIZE, topology)
+    assert list(calibration.apply((50, 50))) == [0, 0]
+    assert list(calibration.apply((690, 530))) == [1919, 1079]
+
+
+def test_overlapping_monitors_are_counted_once():
+    # A mirrored monitor adds area without covering more of the box
+    mirrored = ScreenTopology([PRIMARY, Monitor(0, 0, 1920, 1080, name="mirror"), RIGHT])
+    assert not mirrored.covers_bounds()
+    # Overlapping monitors that do fill the box
+    overlapping = ScreenTopology([Monitor(0, 0, 1200, 1080), Monitor(800, 0, 1120, 1080)])
+    assert overlapping.covers_bounds()
+    assert ScreenTopology([PRIMARY, Monitor(1920, 0, 1280, 1080)]).covers_bounds()
+
+
+def test_point_in_dead_corner_moves_to_nearest_monitor():
+    topology = FakeScreenTopology([PRIMARY, RIGHT]).topology()
+    assert not topology.covers_bounds()
+    calibration = CursorCalibration(FRAME_SIZE, topology)
+
+    # Bottom right of the camera range maps into the strip below the right monitor
+    x, y = calibration.apply((690, 530))
+    assert topology.monitor_at(x, y) is RIGHT
+    assert (x, y) == (RIGHT.right - 1, RIGHT.bottom - 1)
+
+    # Points on a monitor are left alone
+    x, y = calibration.apply((370, 290))
+    assert topology.monitor_at(x, y) is not None
+    assert np.allclose((x, y), (1600, 540))
+
+
+def test_clamp_picks_the_closest_monitor():
+    topology = ScreenTopology([PRIMARY, Monitor(1920, 200, 1280, 1024)])
+    # Above the lower right monitor: next to the primary one, or far from it
+    assert topology.clamp(1925, 100) == (1919, 100)
+    assert topology.clamp(3000, 150) == (3000, 200)
+    assert topology.clamp(100, 100) == (100, 100)
+
+
+def test_zones_map_onto_whole_monitors():
+    topology = FakeScreenTopology([PRIMARY, RIGHT]).topology()
+    calibration = ZonedCursorCalibration(FRAME_SIZE, topology)
+    # Bottom right of the camera range is the bottom right of the right monitor
+    assert list(calibration.apply((690, 530))) == [RIGHT.right - 1, RIGHT.bottom - 1]
+    assert list(calibration.apply((50, 530))) == [0, PRIMARY.bottom - 1]
+
+
+def test_fake_topology_follows_monitor_changes():
+    provider = FakeScreenTopology([PRIMARY])
+    first = provider.topology()
+    provider.set_monitors([PRIMARY, RIGHT])
+    second = provider.topology()
+    assert second != first
+    assert second.bounds == (0, 0, 3200, 1080)
+    assert provider.version == 2
+
+
+def test_refresh_runs_off_the_calling_thread():
+    started = threading.Event()
+    release = threading.Event()
+    monitors = [[PRIMARY], [PRIMARY, RIGHT]]
+
+    def enumerate_monitors():
+        if len(monitors) == 1:
+            # A slow system call, on the second enumeration only
+            started.set()
+            release.wait(5)
+        return monitors.pop(0) if len(monitors) > 1 else monitors[0]
+
+    provider = ScreenTopologyProvider(enumerate_monitors, refresh_interval=0.0)
+    first = provider.topology()
+    assert first.monitors == (PRIMARY,)
+
+    # Due again: the refresh starts in the background and the cached layout is returned
+    assert provider.topology() is first
+    assert started.wait(5)
+    assert provider.topology() is first
+    release.set()
+    provider._refreshing.join(5)
+    assert provider.topology().monitors == (PRIMARY, RIGHT)
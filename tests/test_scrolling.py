@@ -0,0 +1,132 @@
+import math
+import time
+
+import numpy as np
+
+from gestures import GestureRecognizer
+from landmark_stream import ReplayHandedness, ReplayHandLandmarks, ReplayResults
+from output_sinks import AsyncOutputSink, RecordingOutputSink
+from scrolling import COASTING, IDLE, InertialScroller
+from virtual_mouse import VirtualMouse
+
+
+def tick_until_idle(scroller, start, step, limit=10.0):
+    """(time, clicks) of every batch, ticking every step seconds"""
+    batches = []
+    now = start
+    while scroller.active and now < start + limit:
+        clicks = scroller.tick(now)
+        if clicks is not None:
+            batches.append((now, clicks))
+        now += step
+    return batches
+
+
+def scroll_pose_hand(y):
+    """Results of a right hand in the scroll pose (thumb, index, middle up), shifted down by y"""
+    points = np.full((21, 3), 0.5)
+    points[3, 0] = 0.5
+    points[4, 0] = 0.6  # thumb up
+    for tip, pip, up in ((8, 6, True), (12, 10, True), (16, 14, False)):
+        points[pip, 1] = 0.5
+        points[tip, 1] = 0.3 if up else 0.7
+    points[:, 1] += y
+    return ReplayResults([ReplayHandLandmarks(points.tolist())], [ReplayHandedness("Right")])
+
+
+def test_batches_never_exceed_the_rate_cap():
+    scroller = InertialScroller(max_rate=20.0)
+    scroller.drag(0.0, 200.0)
+    # Ticked at 1 kHz for a second of dragging
+    batches = [(t / 1000, scroller.tick(t / 1000)) for t in range(1000)]
+    times = [t for t, clicks in batches if clicks is not None]
+    assert len(times) <= 20
+    assert min(np.diff(times)) >= 1 / 20 - 1e-9
+    # Batched, not lost: 200 clicks a second arrive in about 20 batches
+    assert sum(clicks[1] for _, clicks in batches if clicks) >= 190
+
+
+def test_slow_drag_accumulates_fractional_clicks():
+    scroller = InertialScroller(max_rate=20.0)
+    # Half a click per frame at 30 fps, one per frame would round it away
+    scroller.drag(0.0, -15.0)
+    clicks = [scroller.tick(i / 30) for i in range(61)]
+    assert sum(c[1] for c in clicks if c) in (-30, -29)
+    assert all(c[1] < 0 for c in clicks if c)
+
+
+def test_release_decays_and_stops():
+    scroller = InertialScroller(max_rate=20.0, decay=0.35, min_speed=2.0)
+    scroller.drag(0.0, 100.0)
+    scroller.tick(0.0)
+    scroller.tick(0.05)
+    scroller.release()
+    assert scroller.state == COASTING
+
+    batches = tick_until_idle(scroller, 0.06, 0.01)
+    assert scroller.state == IDLE
+    clicks = [dy for _, (_, dy) in batches]
+    # Batches shrink as the speed decays (give or take the carried rounding)
+    assert all(later <= earlier + 1 for earlier, later in zip(clicks, clicks[1:]))
+    assert clicks[0] > clicks[-1]
+    # The coast travels the integral of the decay and ends once below min_speed
+    expected = 100.0 * 0.35 * (1 - 2.0 / 100.0)
+    assert abs(sum(clicks) - expected) <= 2
+    assert batches[-1][0] - 0.05 <= 0.35 * math.log(100.0 / 2.0) + 0.1
+
+
+def test_grab_stops_a_coast():
+    scroller = InertialScroller()
+    scroller.drag(0.0, 100.0)
+    scroller.tick(0.0)
+    scroller.release()
+    scroller.stop()
+    assert not scroller.active
+    assert scroller.tick(1.0) is None
+
+
+def test_output_thread_caps_the_rate_and_traces_through_dispatch():
+    recorder = RecordingOutputSink()
+    output = AsyncOutputSink(recorder)
+    scroller = InertialScroller(max_rate=20.0, decay=0.1)
+    scroller.drag(0.0, 100.0)
+    start = time.perf_counter()
+    output.drive_scroller(scroller)
+    time.sleep(0.5)
+    scroller.release()
+    deadline = time.perf_counter() + 5
+    while scroller.active and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    output.close()
+
+    scrolls = [args for name, args in recorder.events if name == "scroll"]
+    assert 5 <= len(scrolls) <= elapsed * 20 + 1
+    # Wheel batches are dispatched like queued events, so their latency is recorded
+    assert "scroll" in output.latency.summary_text()
+
+
+def test_open_hand_does_not_scroll():
+    open_hand = VirtualMouse.CLICK_HOLD_STATE | 1
+    assert not GestureRecognizer(VirtualMouse.GESTURES).table[open_hand]
+
+
+def test_scroll_gesture_sends_capped_batches_instead_of_one_per_frame():
+    output = RecordingOutputSink()
+    mouse = VirtualMouse(None, None, None, 1000, 400, output)
+    img = np.zeros((480, 640, 3), dtype=np.uint8)
+    # Hold the scroll pose and move the hand up a frame height in one second at 60 fps
+    for i in range(60):
+        mouse.handle_hand_gestures(scroll_pose_hand(-i / 60 * 0.4), 0, img, i / 60)
+    # Then the hand is gone and the scroll coasts
+    for i in range(60, 120):
+        mouse.hand_lost(i / 60)
+
+    scrolls = [args for name, args in output.events if name == "scroll"]
+    assert scrolls and all(dy > 0 for _, dy in scrolls)
+    # Two seconds at no more than 20 batches a second, not one per frame
+    assert len(scrolls) <= 40
+    assert not mouse.scroller.active
+    # The cursor only moved until the gesture turned on
+    moves = [name for name, _ in output.events].count("move_to")
+    assert moves < mouse.gestures.setting("scroll", "hold_frames")
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from landmark_stream import ReplayHandedness, ReplayHandLandmarks, ReplayResults
+from shared_ring import SharedFrameRing
+
+FRAME_SHAPE = (24, 32, 3)
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.create(slots=4, frame_shape=FRAME_SHAPE, max_hands=2)
+    yield ring
+    ring.close()
+
+
+@pytest.fixture
+def reader(ring):
+    reader = SharedFrameRing.attach(ring.name, untrack=False)
+    yield reader
+    reader.close()
+
+
+def frame(value):
+    return np.full(FRAME_SHAPE, value, dtype=np.uint8)
+
+
+def results(x):
+    points = np.full((21, 3), x, dtype=np.float32)
+    return ReplayResults([ReplayHandLandmarks(points)], [ReplayHandedness("Left")])
+
+
+def test_empty_ring_reads_nothing(reader):
+    assert reader.read_latest() is None
+    assert reader.latest_seq() == -1
+
+
+def test_publish_read_round_trip(ring, reader):
+    seq = ring.publish(frame(7), results(0.25), timestamp=12.5)
+    assert seq == 0
+
+    read_seq, timestamp, image, landmarks, handedness = reader.read_latest()
+    assert read_seq == seq
+    assert timestamp == 12.5
+    assert (image == 7).all()
+    assert np.allclose(landmarks[0], 0.25)
+    assert list(handedness) == [0, -1]  # one Left hand, the second slot empty
+    assert reader.still_valid(seq)
+
+
+def test_frames_of_another_size_are_resized(ring, reader):
+    ring.publish(np.full((48, 64, 3), 9, dtype=np.uint8))
+    _, _, image, _, handedness = reader.read_latest()
+    assert image.shape == FRAME_SHAPE and (image == 9).all()
+    assert list(handedness) == [-1, -1]
+
+
+def test_reader_detects_a_slot_overwritten_after_the_read(ring, reader):
+    ring.publish(frame(1))
+    seq, _, image, _, _ = reader.read_latest()
+    assert (image == 1).all()
+    # The writer laps the ring: the reader's view now shows another frame
+    for value in range(2, 2 + ring.slots):
+        ring.publish(frame(value))
+    assert not reader.still_valid(seq)
+    assert not (image == 1).all()
+
+
+def test_slot_being_written_is_not_valid(ring, reader):
+    seq = ring.publish(frame(1))
+    # publish marks the slot -1 before writing the next entry into it
+    ring.seqs[seq % ring.slots] = -1
+    assert not reader.still_valid(seq)
+
+
+def test_copies_outlive_the_slot(ring, reader):
+    ring.publish(frame(3), results(0.5))
+    seq, _, image, landmarks, _ = reader.read_latest(copy=True)
+    for value in range(4, 4 + ring.slots):
+        ring.publish(frame(value))
+    assert not reader.still_valid(seq)
+    assert (image == 3).all()
+    assert np.allclose(landmarks[0], 0.5)
+
+
+def test_wraparound_past_the_ring_size(ring, reader):
+    count = ring.slots * 3 + 1
+    for value in range(count):
+        assert ring.publish(frame(value), timestamp=float(value)) == value
+
+    seq, timestamp, image, _, _ = reader.read_latest()
+    assert seq == count - 1
+    assert timestamp == count - 1
+    assert (image == count - 1).all()
+    # Only the last ring.slots entries are still held, each in slot seq % slots
+    held = [s for s in range(count) if reader.still_valid(s)]
+    assert held == list(range(count - ring.slots, count))
+    assert sorted(int(s) % ring.slots for s in reader.seqs) == list(range(ring.slots))
+
+
+def test_attach_rejects_other_shared_memory():
+    from multiprocessing import shared_memory
+
+    block = shared_memory.SharedMemory(create=True, size=4096)
+    try:
+        with pytest.raises(ValueError):
+            SharedFrameRing.attach(block.name, untrack=False)
+    finally:
+        block.close()
+        block.unlink()
@@ -0,0 +1,96 @@
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+from landmark_backends import DeferredBackend
+from startup import BackgroundTask, LazyModule, StartupTimeline, preload
+
+
+def write_module(tmp_path, monkeypatch, name):
+    (tmp_path / f"{name}.py").write_text("VALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, name, raising=False)
+
+
+def test_lazy_module_imports_on_first_attribute(tmp_path, monkeypatch):
+    write_module(tmp_path, monkeypatch, "lazy_startup_probe")
+    module = LazyModule("lazy_startup_probe")
+    assert "lazy_startup_probe" not in sys.modules
+    assert module.VALUE == 42
+    assert "lazy_startup_probe" in sys.modules
+
+
+def test_preload_imports_in_the_background(tmp_path, monkeypatch):
+    write_module(tmp_path, monkeypatch, "preload_startup_probe")
+    preload("preload_startup_probe").result(5)
+    assert sys.modules["preload_startup_probe"].VALUE == 42
+
+
+def test_background_task_result_and_error():
+    gate = threading.Event()
+    task = BackgroundTask(lambda: gate.wait(5) and "loaded")
+    assert not task.done
+    with pytest.raises(TimeoutError):
+        task.result(timeout=0.01)
+    gate.set()
+    assert task.result(5) == "loaded"
+
+    failing = BackgroundTask(lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        failing.result(5)
+
+
+def test_timeline_keeps_the_first_mark():
+    timeline = StartupTimeline(origin=0.0)
+    timeline.mark("first_frame")
+    first = timeline.marks["first_frame"]
+    timeline.mark("first_frame")
+    assert timeline.marks["first_frame"] == first
+    assert timeline.summary_text().startswith("first_frame")
+
+
+class FakeBackend:
+    def __init__(self):
+        self.frames = []
+        self.closed = False
+
+    def process(self, rgb_img):
+        self.frames.append(rgb_img.shape)
+        return "detected"
+
+    def close(self):
+        self.closed = True
+
+
+def test_deferred_backend_reports_no_hands_until_loaded():
+    gate = threading.Event()
+    backend = FakeBackend()
+    deferred = DeferredBackend(lambda: gate.wait(5) and backend, warmup_shape=(4, 4, 3))
+    frame = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    results = deferred.process(frame)
+    assert not results.multi_hand_landmarks
+    assert not deferred.ready
+
+    gate.set()
+    assert deferred.wait(5) is backend
+    assert deferred.process(frame) == "detected"
+    # The warm-up frame went through before the first real one
+    assert backend.frames == [(4, 4, 3), (8, 8, 3)]
+    deferred.close()
+    assert backend.closed
+
+
+def test_deferred_backend_surfaces_load_errors():
+    def missing_model():
+        raise FileNotFoundError("hand_landmarker.task")
+
+    deferred = DeferredBackend(missing_model)
+    with pytest.raises(FileNotFoundError):
+        deferred.wait(5)
+    with pytest.raises(FileNotFoundError):
+        deferred.process(None)
+    # Nothing was loaded, so nothing to close
+    deferred.close()
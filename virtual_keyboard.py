@@ -1,10 +1,11 @@
 import cv2
-import mediapipe as mp
 import numpy as np
-from pynput.keyboard import Controller, Key
 import time
-import math
-import pyautogui
+from output_sinks import OSOutputSink
+from landmark_array import LandmarkArray, INDEX_TIP, THUMB_TIP
+from keyboard_layout import compile_layouts
+from gestures import Gesture, GestureRecognizer
+from profiling import StageProfiler
 
 class VirtualKeyboard:
     HANDS_LABELS = {
@@ -12,7 +13,15 @@ class VirtualKeyboard:
         "Right": "Right",
     }
 
-    def __init__(self, mp_hands, hands, mp_draw, window_width, window_height):
+    # Key press: thumb and index tips pinched together, whatever the other
+    # fingers do. It turns off once the tips are apart past the looser
+    # release threshold for two frames, so a shaky pinch types one key.
+    GESTURES = [
+        Gesture("pinch", mask=0, distance=(THUMB_TIP, INDEX_TIP), threshold=0.05, release_threshold=0.065,
+                release_frames=2),
+    ]
+
+    def __init__(self, mp_hands, hands, mp_draw, window_width, window_height, output=None):
         # Initialize MediaPipe Hand tracking
         self.mp_hands = mp_hands
         self.hands = hands
@@ -21,7 +30,11 @@ class VirtualKeyboard:
         self.window_width = window_width
         self.window_height = window_height
 
-        self.keyboard = Controller()
+        # Where key events are sent (the OS by default)
+        self.output = output if output is not None else OSOutputSink()
+
+        # Stage timings, disabled unless MouseAndKeyboard shares its profiler
+        self.profiler = StageProfiler()
 
         # Define the keyboard layout with normal and shift states
         self.keys = {
@@ -51,26 +64,26 @@ class VirtualKeyboard:
             ]
         }
         
-        # Special keys mapping
+        # Special keys mapping (pynput Key names)
         self.special_keys = {
-            'Space': Key.space,
-            'Tab': Key.tab,
-            'Enter': Key.enter,
-            'Backspace': Key.backspace,
-            'Esc': Key.esc,
-            'Win': Key.cmd,
-            'F1': Key.f1,
-            'F2': Key.f2,
-            'F3': Key.f3,
-            'F4': Key.f4,
-            'F5': Key.f5,
-            'F6': Key.f6,
-            'F7': Key.f7,
-            'F8': Key.f8,
-            'F9': Key.f9,
-            'F10': Key.f10,
-            'F11': Key.f11,
-            'F12': Key.f12
+            'Space': 'space',
+            'Tab': 'tab',
+            'Enter': 'enter',
+            'Backspace': 'backspace',
+            'Esc': 'esc',
+            'Win': 'cmd',
+            'F1': 'f1',
+            'F2': 'f2',
+            'F3': 'f3',
+            'F4': 'f4',
+            'F5': 'f5',
+            'F6': 'f6',
+            'F7': 'f7',
+            'F8': 'f8',
+            'F9': 'f9',
+            'F10': 'f10',
+            'F11': 'f11',
+            'F12': 'f12'
         }
         
         # Control key states
@@ -80,6 +93,8 @@ class VirtualKeyboard:
         self.alt_pressed = False
         
         # Button properties
+        self.keyboard_start_x = 20
+        self.keyboard_start_y = 20
         self.button_width = 40
         self.button_height = 40
         self.button_margin = 5
@@ -97,94 +112,96 @@ class VirtualKeyboard:
             'Win': 60
         }
         
+        # Key rectangles of every layout, shared by drawing and hit-testing
+        self.compile_layouts()
+        
         # Clicking properties
         self.clicked = False
         self.click_cooldown = 0.2  # seconds
-        self.last_click_time = 0
+        self.gestures = GestureRecognizer(self.GESTURES)
+        self.last_click_time = float('-inf')  # no click yet
 
         self.prev_clicked = False
+
+        # Id of the tracked hand driving the keyboard, see hand_tracking
+        self.hand_id = None
+
+        # Landmarks of the tracked hand, converted once per frame
+        self.hand = LandmarkArray()
     
     def get_key_width(self, key):
         """Get the width of a specific key"""
         return self.key_widths.get(key, self.button_width)
     
-    def draw_keyboard(self, img):
-        keyboard_start_x = 20
-        keyboard_start_y = 20
-        current_y = keyboard_start_y
+    def compile_layouts(self):
+        """Compile the key rectangles, call again after changing keys or button geometry"""
+        self.layouts = compile_layouts(
+            self.keys, self.get_key_width, self.keyboard_start_x, self.keyboard_start_y,
+            self.button_height, self.button_margin
+        )
+        # Pre-rendered keyboard images, keyed by layout and modifier state
+        self.render_cache = {}
+        self.render_cache_shape = None
+    
+    def get_render_key(self):
+        """Everything the keyboard image depends on besides layout geometry"""
+        return (self.get_layout_name(), self.shift_pressed, self.caps_lock, self.ctrl_pressed, self.alt_pressed)
+    
+    def render_keyboard(self, img):
+        """Copy the cached keyboard image for the current state into img"""
+        # A different window size invalidates every cached image
+        if self.render_cache_shape != img.shape:
+            self.render_cache = {}
+            self.render_cache_shape = img.shape
         
-        # Choose layout based on shift or ctrl state
-        layout = 'normal'
-        if self.shift_pressed:
-            layout = 'shift'
-        elif self.ctrl_pressed:
-            layout = 'ctrl'
+        render_key = self.get_render_key()
+        cached = self.render_cache.get(render_key)
+        if cached is None:
+            cached = np.zeros(img.shape, dtype=np.uint8)
+            self.draw_keyboard(cached)
+            self.render_cache[render_key] = cached
         
-        for row in self.keys[layout]:
-            current_x = keyboard_start_x
-            max_height = self.button_height
+        np.copyto(img, cached)
+    
+    def get_layout_name(self):
+        """Choose layout based on shift or ctrl state"""
+        if self.shift_pressed:
+            return 'shift'
+        if self.ctrl_pressed:
+            return 'ctrl'
+        return 'normal'
+    
+    def draw_keyboard(self, img):
+        for rect in self.layouts[self.get_layout_name()].rects:
+            key = rect.key
+            top_left = (rect.x, rect.y)
+            bottom_right = (rect.x + rect.width, rect.y + rect.height)
             
-            for key in row:
-                width = self.get_key_width(key)
-                
-                # Draw button background
-                cv2.rectangle(img, (current_x, current_y), 
-                            (current_x + width, current_y + self.button_height), 
-                            (50, 50, 50), -1)  # Filled dark gray background
-                
-                # Draw button border
-                border_color = (255, 255, 255)  # Default white
-                if (key == 'Shift' and self.shift_pressed) or (key == 'Caps' and self.caps_lock):
-                    border_color = (0, 255, 0)  # Green for shift/caps
-                elif self.ctrl_pressed and key in ['C', 'V', 'X', 'Z', 'Y']:
-                    border_color = (0, 255, 255)  # Yellow for ctrl combinations
-                elif key == 'Ctrl' and self.ctrl_pressed:
-                    border_color = (0, 255, 0)  # Green for ctrl
-                
-                cv2.rectangle(img, (current_x, current_y), 
-                            (current_x + width, current_y + self.button_height), 
-                            border_color, 2)
-                
-                # Draw text
-                text_size = cv2.getTextSize(key, cv2.FONT_HERSHEY_PLAIN, 1, 1)[0]
-                text_x = current_x + (width - text_size[0]) // 2
-                text_y = current_y + (self.button_height + text_size[1]) // 2
-                cv2.putText(img, key, (text_x, text_y), 
-                           cv2.FONT_HERSHEY_PLAIN, 1, (255, 255, 255), 1)
-                
-                current_x += width + self.button_margin
-
-            current_y += self.button_height + self.button_margin
+            # Draw button background
+            cv2.rectangle(img, top_left, bottom_right, (50, 50, 50), -1)  # Filled dark gray background
+            
+            # Draw button border
+            border_color = (255, 255, 255)  # Default white
+            if (key == 'Shift' and self.shift_pressed) or (key == 'Caps' and self.caps_lock):
+                border_color = (0, 255, 0)  # Green for shift/caps
+            elif self.ctrl_pressed and key in ['C', 'V', 'X', 'Z', 'Y']:
+                border_color = (0, 255, 255)  # Yellow for ctrl combinations
+            elif key == 'Ctrl' and self.ctrl_pressed:
+                border_color = (0, 255, 0)  # Green for ctrl
+            
+            cv2.rectangle(img, top_left, bottom_right, border_color, 2)
+            
+            # Draw text
+            text_size = cv2.getTextSize(key, cv2.FONT_HERSHEY_PLAIN, 1, 1)[0]
+            text_x = rect.x + (rect.width - text_size[0]) // 2
+            text_y = rect.y + (rect.height + text_size[1]) // 2
+            cv2.putText(img, key, (text_x, text_y), 
+                       cv2.FONT_HERSHEY_PLAIN, 1, (255, 255, 255), 1)
 
     def get_clicked_key(self, finger_pos):
-        keyboard_start_x = 20
-        keyboard_start_y = 20
-        current_y = keyboard_start_y
-        
-        # Choose layout based on shift or ctrl state
-        layout = 'normal'
-        if self.shift_pressed:
-            layout = 'shift'
-        elif self.ctrl_pressed:
-            layout = 'ctrl'
-        
         x, y = finger_pos
-        
-        for row in self.keys[layout]:
-            current_x = keyboard_start_x
-            
-            for key in row:
-                width = self.get_key_width(key)
-                
-                if (current_x < x < current_x + width and 
-                    current_y < y < current_y + self.button_height):
-                    return key
-                
-                current_x += width + self.button_margin
-            
-            current_y += self.button_height + self.button_margin
-        
-        return None
+        rect = self.layouts[self.get_layout_name()].hit_test(x, y)
+        return rect.key if rect is not None else None
     
     def handle_key_press(self, key):
         """Handle key press with special key functionality"""
@@ -200,10 +217,8 @@ class VirtualKeyboard:
         elif key == 'Alt':
             self.alt_pressed = not self.alt_pressed
         elif key in self.special_keys:
-            # Handle special keys using pynput Key enum
-            special_key = self.special_keys[key]
-            self.keyboard.press(special_key)
-            self.keyboard.release(special_key)
+            # Handle special keys using pynput Key names
+            self.output.tap_special_key(self.special_keys[key])
         else:
             # Handle regular keys
             char = key
@@ -216,40 +231,47 @@ class VirtualKeyboard:
             # Handle Ctrl combinations
             if self.ctrl_pressed:
                 if key.lower() == 'c':
-                    pyautogui.hotkey('ctrl', 'c')
+                    self.output.hotkey('ctrl', 'c')
                 elif key.lower() == 'v':
-                    pyautogui.hotkey('ctrl', 'v')
+                    self.output.hotkey('ctrl', 'v')
                 elif key.lower() == 'x':
-                    pyautogui.hotkey('ctrl', 'x')
+                    self.output.hotkey('ctrl', 'x')
                 elif key.lower() == 'z':
-                    pyautogui.hotkey('ctrl', 'z')
+                    self.output.hotkey('ctrl', 'z')
                 elif key.lower() == 'y':
-                    pyautogui.hotkey('ctrl', 'y')
+                    self.output.hotkey('ctrl', 'y')
                 return
             
             # Press the key
-            self.keyboard.press(char)
-            self.keyboard.release(char)
+            self.output.tap_key(char)
             
             # Reset shift if it was pressed
             if self.shift_pressed and key != 'Shift':
                 self.shift_pressed = False
     
-    def detect_click(self, hand_landmarks):
-        # Get index finger tip and thumb tip positions
-        index_tip = hand_landmarks.landmark[8]  # Index fingertip
-        thumb_tip = hand_landmarks.landmark[4]  # Thumb tip
-        
-        # Calculate distance between thumb and index finger
-        distance = math.sqrt(
-            (thumb_tip.x - index_tip.x) ** 2 + 
-            (thumb_tip.y - index_tip.y) ** 2
-        )
-        
-        # Return True if fingers are close enough (touching)
-        return distance < 0.05  # Adjust threshold if needed
+    @property
+    def pinch_threshold(self):
+        """Normalized thumb-index distance counted as a click"""
+        return self.gestures.setting("pinch", "threshold")
+
+    @pinch_threshold.setter
+    def pinch_threshold(self, threshold):
+        # Keep the release threshold the same ratio looser
+        ratio = self.gestures.setting("pinch", "release_threshold") / self.gestures.setting("pinch", "threshold")
+        self.gestures.configure("pinch", threshold=threshold, release_threshold=threshold * ratio)
+
+    def detect_click(self, hand):
+        """Whether the pinch gesture is on this frame (see GESTURES)"""
+        return "pinch" in self.gestures.update(hand)
     
-    def handle_hand_gestures(self, hands_processing_results, left_hand_index, img):
+    def switch_hand(self, hand_id):
+        """Drop the previous hand's state when another hand takes over the keyboard"""
+        self.hand_id = hand_id
+        # A pinch the new hand already holds only types once released and made again
+        self.gestures.reset(block=True)
+        self.prev_clicked = False
+
+    def handle_hand_gestures(self, hands_processing_results, left_hand_index, img, timestamp=None, hand_id=None):
         if (
             hands_processing_results is None
             or hands_processing_results.multi_hand_landmarks is None
@@ -262,13 +284,17 @@ class VirtualKeyboard:
                         cv2.FONT_HERSHEY_PLAIN, 1, (0, 0, 255), 1)
             return
 
-        hand_landmarks = hands_processing_results.multi_hand_landmarks[left_hand_index]
+        if hand_id is not None and hand_id != self.hand_id:
+            self.switch_hand(hand_id)
+
+        profiler = self.profiler
+        
+        # Convert the hand's landmarks once for this frame
+        with profiler.measure("keyboard.landmarks"):
+            hand = self.hand.fill(hands_processing_results.multi_hand_landmarks[left_hand_index])
     
-        # Get index fingertip position
-        index_tip = hand_landmarks.landmark[8]
-        h, w, _ = img.shape
-        finger_x = int(index_tip.x * self.window_width)  # Map to keyboard window width
-        finger_y = int(index_tip.y * self.window_height)  # Map to keyboard window height
+            # Get index fingertip position mapped to the keyboard window
+            finger_x, finger_y = hand.pixel(INDEX_TIP, self.window_width, self.window_height)
         
         # Keep cursor within window bounds
         finger_x = max(0, min(finger_x, self.window_width-1))
@@ -277,25 +303,28 @@ class VirtualKeyboard:
         # Draw cursor
         cv2.circle(img, (finger_x, finger_y), 5, (0, 255, 0), cv2.FILLED)
         
+        # Extrapolated frames only move the cursor, clicks fire on detected frames
+        if getattr(hands_processing_results, 'predicted', False):
+            return
+        
         # Check for clicking gesture (thumb-index touch)
-        is_clicked = self.detect_click(hand_landmarks)
+        with profiler.measure("keyboard.gestures"):
+            is_clicked = self.detect_click(hand)
         
         # Handle key press with cooldown
-        current_time = time.time()
+        current_time = timestamp if timestamp is not None else time.time()
         if is_clicked and not self.prev_clicked and current_time - self.last_click_time > self.click_cooldown:
-            clicked_key = self.get_clicked_key((finger_x, finger_y))
+            with profiler.measure("keyboard.keys"):
+                clicked_key = self.get_clicked_key((finger_x, finger_y))
+                if clicked_key:
+                    self.handle_key_press(clicked_key)
             if clicked_key:
-                self.handle_key_press(clicked_key)
                 self.last_click_time = current_time
                 # Visual feedback for key press
                 cv2.circle(img, (finger_x, finger_y), 10, (0, 255, 255), -1)
         
         # Update status text with current mode
-        mode = 'normal'
-        if self.shift_pressed:
-            mode = 'shift'
-        elif self.ctrl_pressed:
-            mode = 'ctrl'
+        mode = self.get_layout_name()
         
         status_text = f"Mode: {mode.upper()}"
         if is_clicked:
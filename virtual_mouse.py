@@ -1,9 +1,15 @@
 import cv2
-import mediapipe as mp
-import numpy as np
-import pyautogui
 import math
 import time
+from collections import deque
+from output_sinks import OSOutputSink
+from landmark_array import LandmarkArray, FINGER_BITS
+from gestures import Gesture, GestureRecognizer
+from scrolling import InertialScroller
+from cursor_filters import ExponentialFilter
+from cursor_mapping import CursorCalibration, ZonedCursorCalibration
+from screen_topology import ScreenTopologyProvider
+from profiling import StageProfiler
 
 class VirtualMouse:
     HANDS_LABELS = {
@@ -11,35 +17,91 @@ class VirtualMouse:
         "Right": "Right",
     }
 
-    def __init__(self, mp_hands, hands, mp_draw, window_width, window_height):
+    # Finger states (see FINGER_BITS) for each gesture
+    # Left click: thumb up and index up, others down
+    LEFT_CLICK_STATE = FINGER_BITS['thumb'] | FINGER_BITS['index']
+    # Right click: middle up and index up, others down
+    RIGHT_CLICK_STATE = FINGER_BITS['index'] | FINGER_BITS['middle']
+    # Click and hold: middle up, ring up, and index up, thumb down
+    CLICK_HOLD_STATE = FINGER_BITS['index'] | FINGER_BITS['middle'] | FINGER_BITS['ring']
+    # Scroll: thumb, index and middle up, ring down; the hand's motion scrolls.
+    # Not the open hand, which is how most people move the cursor
+    SCROLL_STATE = FINGER_BITS['thumb'] | FINGER_BITS['index'] | FINGER_BITS['middle']
+
+    # Gestures as data (see gestures.py): a state must be seen for hold_frames
+    # frames to turn on and missed for release_frames frames to turn off, so
+    # single-frame flickers of a finger no longer click
+    GESTURES = [
+        Gesture("left_click", LEFT_CLICK_STATE, hold_frames=2, release_frames=2),
+        Gesture("right_click", RIGHT_CLICK_STATE, hold_frames=2, release_frames=2),
+        Gesture("click_hold", CLICK_HOLD_STATE, hold_frames=3, release_frames=3),
+        Gesture("scroll", SCROLL_STATE, hold_frames=3, release_frames=3),
+    ]
+
+    # Palm landmark (middle finger base) whose motion drives scrolling
+    SCROLL_LANDMARK = 9
+
+    def __init__(self, mp_hands, hands, mp_draw, window_width, window_height, output=None):
         # Initialize MediaPipe Hand tracking
         self.mp_hands = mp_hands
         self.hands = hands
         self.mp_draw = mp_draw
 
-        # Screen settings
-        self.screen_width, self.screen_height = pyautogui.size()
+        # Where mouse events are sent (the OS by default)
+        self.output = output if output is not None else OSOutputSink()
+
+        # Stage timings, disabled unless MouseAndKeyboard shares its profiler
+        self.profiler = StageProfiler()
+
+        # Monitor layout, enumerated again every few seconds to follow changes
+        self.screen_topology = ScreenTopologyProvider(self.output.monitors)
+        # Split the hand range into one zone per monitor instead of spanning the whole desktop
+        self.monitor_zones = False
         
         # Mouse control settings
         self.frame_reduction = 50  # Reduced from 100 for faster movement
-        self.smoothening = 2  # Reduced from 5 for more responsive movement
-        self.prev_x, self.prev_y = 0, 0
+        # Camera to screen mapping, rebuilt when the frame or screen size changes
+        self.calibration = None
+        # Cursor smoothing, see cursor_filters (same response as the old fixed divisor of 2)
+        self.cursor_filter = ExponentialFilter(smoothening=2)
         
         # Window properties
         self.window_width = window_width
         self.window_height = window_height
         
         # Double click settings
-        self.last_click_time = 0
+        self.last_click_time = float('-inf')  # no click yet
         self.double_click_threshold = 0.3  # seconds
-        
-        # Initialize PyAutoGUI settings
-        pyautogui.FAILSAFE = False
-        pyautogui.PAUSE = 0.01  # Reduced from 0.1 for faster response
 
+        self.gestures = GestureRecognizer(self.GESTURES)
+        # Optional learned finger states (gesture_classifier.GestureClassifier)
+        # used instead of the coordinate rules
+        self.classifier = None
         self.prev_left_click = False
         self.prev_right_click = False
         self.is_holding = False
+
+        # Scrolling: wheel clicks per second for a palm speed of one frame
+        # height per second, speeds below the dead zone count as still
+        self.scroller = InertialScroller()
+        self.scroll_gain = 30.0
+        self.scroll_dead_zone = 0.05
+        self.scroll_smoothing = 0.5  # weight of the newest velocity sample
+        self.scroll_anchor = None  # (x, y, timestamp) of the palm on the previous scroll frame
+        self.scroll_velocity = (0.0, 0.0)
+        # Recent (timestamp, velocity) drags: the gesture ends release_frames
+        # after the hand stopped, so the coast starts from the fastest drag of
+        # the last fling_window seconds, like a flick on a touch screen
+        self.scroll_history = deque(maxlen=16)
+        self.fling_window = 0.15
+
+        # Id of the tracked hand driving the mouse, see hand_tracking
+        self.hand_id = None
+        # Whether that hand's voted handedness is Left, the classifier mirrors it
+        self.hand_left = False
+
+        # Landmarks of the tracked hand, converted once per frame
+        self.hand = LandmarkArray()
         
     def calculate_distance(self, p1, p2):
         """Calculate distance between two points"""
@@ -58,118 +120,208 @@ class VirtualMouse:
             self.mp_draw.DrawingSpec(color=(0,255,0), thickness=2)
         )
     
-    def get_finger_positions(self, hand_landmarks, img_shape):
-        """Get positions of relevant fingers"""
+    def get_finger_positions(self, hand, img_shape):
+        """Get positions of relevant fingers from a filled LandmarkArray"""
         h, w, _ = img_shape
         
-        # Get finger positions
-        landmarks = {
-            'thumb': (int(hand_landmarks.landmark[4].x * w), int(hand_landmarks.landmark[4].y * h)),
-            'index': (int(hand_landmarks.landmark[8].x * w), int(hand_landmarks.landmark[8].y * h)),
-            'middle': (int(hand_landmarks.landmark[12].x * w), int(hand_landmarks.landmark[12].y * h)),
-            'ring': (int(hand_landmarks.landmark[16].x * w), int(hand_landmarks.landmark[16].y * h))
-        }
-        
-        # Get finger up/down status using y-coordinates of finger tips and their base joints
-        is_finger_up = {
-            'thumb': hand_landmarks.landmark[4].x > hand_landmarks.landmark[3].x,  # For thumb, check x coordinate
-            'index': hand_landmarks.landmark[8].y < hand_landmarks.landmark[6].y,
-            'middle': hand_landmarks.landmark[12].y < hand_landmarks.landmark[10].y,
-            'ring': hand_landmarks.landmark[16].y < hand_landmarks.landmark[14].y
-        }
-        
-        return landmarks, is_finger_up
-    
-    def detect_gestures(self, hand_landmarks, img_shape):
-        """Detect different mouse gestures"""
-        # Get finger positions and states
-        landmarks, is_finger_up = self.get_finger_positions(hand_landmarks, img_shape)
-        
-        # Left click: thumb up and index up, others down
-        left_click = (is_finger_up['thumb'] and is_finger_up['index'] and 
-                     not is_finger_up['middle'] and not is_finger_up['ring'])
-        
-        # Right click: middle up and index up, others down
-        right_click = (not is_finger_up['thumb'] and is_finger_up['index'] and 
-                      is_finger_up['middle'] and not is_finger_up['ring'])
+        # Pixel positions of thumb, index, middle and ring tips, one row each
+        landmarks = hand.finger_tip_pixels(w, h)
         
-        # Click and hold: middle up, ring up, and index up, thumb down
-        click_hold = (not is_finger_up['thumb'] and is_finger_up['index'] and 
-                     is_finger_up['middle'] and is_finger_up['ring'])
+        # Finger up/down states (y-coordinates of tips against their base joints) as a bitmask
+        if self.classifier is None:
+            finger_state = hand.finger_state()
+        else:
+            finger_state = self.classifier.finger_state(hand, self.hand_left)
         
-        return left_click, right_click, click_hold
+        return landmarks, finger_state
+    
+    def detect_gestures(self, hand, finger_state=None):
+        """Active mouse gestures of this frame (see GESTURES)"""
+        active = self.gestures.update(hand, finger_state)
+        return "left_click" in active, "right_click" in active, "click_hold" in active, "scroll" in active
     
-    def move_mouse(self, finger_pos):
-        """Move mouse cursor with smoothening"""
+    def get_calibration(self, frame_size):
+        """Return the camera to screen mapping for the current frame size and monitors"""
+        topology = self.screen_topology.topology()
+        calibration_type = ZonedCursorCalibration if self.monitor_zones else CursorCalibration
+        if (type(self.calibration) is not calibration_type
+                or not self.calibration.matches(frame_size, topology, self.frame_reduction)):
+            self.calibration = calibration_type(frame_size, topology, self.frame_reduction)
+        return self.calibration
+    
+    def move_mouse(self, finger_pos, frame_size, timestamp=None):
+        """Move mouse cursor through the cursor filter
+        
+        finger_pos is in pixels of a camera frame of frame_size (width, height).
+        """
         # Convert coordinates
-        frame_x = np.interp(finger_pos[0], 
-                           (self.frame_reduction, 640 - self.frame_reduction), 
-                           (0, self.screen_width))
-        frame_y = np.interp(finger_pos[1], 
-                           (self.frame_reduction, 480 - self.frame_reduction), 
-                           (0, self.screen_height))
+        target = self.get_calibration(frame_size).apply(finger_pos)
         
         # Smoothen movement
-        current_x = self.prev_x + (frame_x - self.prev_x) / self.smoothening
-        current_y = self.prev_y + (frame_y - self.prev_y) / self.smoothening
+        current_x, current_y = self.cursor_filter(target, timestamp)
         
         # Move mouse
-        pyautogui.moveTo(current_x, current_y)
-        
-        # Update previous positions
-        self.prev_x, self.prev_y = current_x, current_y
+        self.output.move_to(current_x, current_y)
     
-    def handle_hand_gestures(self, hands_processing_results, right_hand_index, img):
-        if (
-            hands_processing_results is None
-            or hands_processing_results.multi_hand_landmarks is None
-            or img is None
-        ):
-            return
-
-        if right_hand_index is None:
-            cv2.putText(img, "No Right Hand", (70, 30), 
-                           cv2.FONT_HERSHEY_PLAIN, 1, (0,0,255), 1)
-            if self.is_holding:
-                pyautogui.mouseUp()
-                self.is_holding = False
-            return
-        
-        hand_landmarks = hands_processing_results.multi_hand_landmarks[right_hand_index]
-                
-        # Get finger positions and detect gestures
-        landmarks, _ = self.get_finger_positions(hand_landmarks, img.shape)
-        left_click, right_click, click_hold = self.detect_gestures(hand_landmarks, img.shape)
-        
-        # Move mouse based on index finger position
-        self.move_mouse(landmarks['index'])
-        
+    def handle_clicks(self, left_click, right_click, click_hold, img, timestamp=None):
+        """Send clicks and holds for newly detected gestures"""
         # Handle left click
         if left_click and not self.prev_left_click:
-            current_time = time.time()
+            current_time = timestamp if timestamp is not None else time.time()
             if current_time - self.last_click_time < self.double_click_threshold:
-                pyautogui.doubleClick()
+                self.output.double_click()
                 cv2.circle(img, (self.window_width//4, self.window_height//2), 
                             15, (0,255,255), -1)  # Yellow circle for double click
             else:
-                pyautogui.click()
+                self.output.click()
                 cv2.circle(img, (self.window_width//4, self.window_height//2), 
                             10, (0,255,0), -1)
             self.last_click_time = current_time
         
         # Handle right click
         if right_click and not self.prev_right_click:
-            pyautogui.rightClick()
+            self.output.right_click()
             cv2.circle(img, (3*self.window_width//4, self.window_height//2), 
                         10, (255,0,0), -1)
         
         # Handle click and hold
         if click_hold and not self.is_holding:
-            pyautogui.mouseDown()
+            self.output.mouse_down()
             self.is_holding = True
         elif not click_hold and self.is_holding:
-            pyautogui.mouseUp()
+            self.output.mouse_up()
             self.is_holding = False
+    
+    def handle_scroll(self, hand, scroll, timestamp=None):
+        """Drive the scroller with the palm velocity while the scroll gesture is held"""
+        if not scroll:
+            if self.scroll_anchor is not None:
+                self.release_scroll()
+            return
+
+        current_time = timestamp if timestamp is not None else time.time()
+        x = hand.points.item(self.SCROLL_LANDMARK, 0)
+        y = hand.points.item(self.SCROLL_LANDMARK, 1)
+        if self.scroll_anchor is None:
+            # Grabbing stops a scroll that is still coasting
+            self.scroller.stop()
+            self.scroll_velocity = (0.0, 0.0)
+            self.scroll_history.clear()
+        else:
+            prev_x, prev_y, prev_time = self.scroll_anchor
+            dt = current_time - prev_time
+            if dt > 0:
+                a = self.scroll_smoothing
+                vx = a * (x - prev_x) / dt + (1 - a) * self.scroll_velocity[0]
+                vy = a * (y - prev_y) / dt + (1 - a) * self.scroll_velocity[1]
+                self.scroll_velocity = (vx, vy)
+                # Hand up scrolls up; the image is mirrored, so hand right scrolls right
+                velocity = (
+                    vx * self.scroll_gain if abs(vx) > self.scroll_dead_zone else 0.0,
+                    -vy * self.scroll_gain if abs(vy) > self.scroll_dead_zone else 0.0,
+                )
+                self.scroller.drag(*velocity)
+                self.scroll_history.append((current_time, velocity))
+                drive = getattr(self.output, "drive_scroller", None)
+                if drive is not None:
+                    drive(self.scroller)
+        self.scroll_anchor = (x, y, current_time)
+
+    def release_scroll(self):
+        """Let go of the scroll, it coasts to a stop"""
+        velocity = None
+        if self.scroll_history:
+            last_time = self.scroll_history[-1][0]
+            recent = [v for t, v in self.scroll_history if last_time - t <= self.fling_window]
+            velocity = max(recent, key=lambda v: math.hypot(*v))
+        self.scroller.release(velocity)
+        self.scroll_anchor = None
+        self.scroll_history.clear()
+
+    def tick_scroll(self, timestamp=None):
+        """Send due wheel batches when no output thread ticks the scroller"""
+        if not self.scroller.active or getattr(self.output, "drive_scroller", None) is not None:
+            return
+        clicks = self.scroller.tick(timestamp if timestamp is not None else time.time())
+        if clicks is not None:
+            self.output.scroll(*clicks)
+
+    def hand_lost(self, timestamp=None):
+        """Called on frames without the mouse hand: a scroll in progress coasts"""
+        if self.scroll_anchor is not None:
+            self.release_scroll()
+        self.tick_scroll(timestamp)
+
+    def switch_hand(self, hand_id):
+        """Drop the previous hand's state when another hand takes over the mouse"""
+        self.hand_id = hand_id
+        self.cursor_filter.reset()
+        if self.is_holding:
+            self.output.mouse_up()
+            self.is_holding = False
+        # A gesture the new hand already makes only fires once released and made again
+        self.gestures.reset(block=True)
+        self.prev_left_click = False
+        self.prev_right_click = False
+        self.scroller.stop()
+        self.scroll_anchor = None
+        self.scroll_history.clear()
+        self.last_click_time = float('-inf')
+
+    def handle_hand_gestures(self, hands_processing_results, right_hand_index, img, timestamp=None, hand_id=None,
+                             left=False):
+        """left is whether the hand's voted handedness (see hand_tracking) is Left"""
+        self.tick_scroll(timestamp)
+        if (
+            hands_processing_results is None
+            or hands_processing_results.multi_hand_landmarks is None
+            or img is None
+        ):
+            return
+
+        if right_hand_index is None:
+            cv2.putText(img, "No Right Hand", (70, 30), 
+                           cv2.FONT_HERSHEY_PLAIN, 1, (0,0,255), 1)
+            if self.is_holding:
+                self.output.mouse_up()
+                self.is_holding = False
+            self.hand_lost(timestamp)
+            return
+        
+        if hand_id is not None and hand_id != self.hand_id:
+            self.switch_hand(hand_id)
+        self.hand_left = left
+
+        profiler = self.profiler
+        h, w, _ = img.shape
+        
+        # Convert the hand's landmarks once for this frame
+        with profiler.measure("mouse.landmarks"):
+            hand = self.hand.fill(hands_processing_results.multi_hand_landmarks[right_hand_index])
+        
+        # Extrapolated frames only move the cursor, gestures fire on detected frames
+        if getattr(hands_processing_results, 'predicted', False):
+            if self.scroll_anchor is not None:
+                return
+            with profiler.measure("mouse.move"):
+                self.move_mouse(hand.finger_tip_pixels(w, h)[1], (w, h), timestamp)
+            return
+                
+        # Get finger positions and detect gestures
+        with profiler.measure("mouse.gestures"):
+            landmarks, finger_state = self.get_finger_positions(hand, img.shape)
+            left_click, right_click, click_hold, scroll = self.detect_gestures(hand, finger_state)
+        
+        # Move mouse based on index finger position, the cursor stays put while scrolling
+        with profiler.measure("mouse.move"):
+            if not scroll:
+                self.move_mouse(landmarks[1], (w, h), timestamp)
+        
+        with profiler.measure("mouse.scroll"):
+            self.handle_scroll(hand, scroll, timestamp)
+        
+        with profiler.measure("mouse.clicks"):
+            self.handle_clicks(left_click, right_click, click_hold, img, timestamp)
         
         # Update status text with current gesture
         status_text = "Active: "
@@ -179,6 +331,8 @@ class VirtualMouse:
             status_text += "Right Click"
         elif click_hold:
             status_text += "Holding"
+        elif scroll:
+            status_text += "Scrolling"
         else:
             status_text += "Moving"
         